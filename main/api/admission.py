@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+from typing import Dict
+from main.utilities.metrics import REGISTRY
+
+QUEUE_DEPTH = REGISTRY.gauge("admission_queue_depth", "Requests waiting for a slot", ("endpoint_class",))
+IN_FLIGHT = REGISTRY.gauge("admission_in_flight", "Requests holding a slot", ("endpoint_class",))
+REJECTED = REGISTRY.counter("admission_rejected_total", "Requests shed by admission control", ("endpoint_class", "reason"))
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the requests of one endpoint class running at once, with a bounded wait queue.
+
+    A request that finds the queue full, or waits longer than queue_timeout, is rejected at once
+    instead of adding to the thread pool and MongoDB pool backlog.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        """
+        Args:
+            name (str): Endpoint class name, used as the metrics label.
+            max_concurrent (int): Requests allowed to run at once.
+            max_queue (int): Requests allowed to wait for a slot.
+            queue_timeout (float): Seconds a request may wait for a slot.
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+
+    async def acquire(self) -> str:
+        """Waits for a slot. Returns "" when admitted, otherwise the reason for the rejection."""
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending
+            await self._semaphore.acquire()
+            IN_FLIGHT.inc(endpoint_class=self.name)
+            return ""
+        if self._waiting >= self.max_queue:
+            return "queue_full"
+
+        self._waiting += 1
+        QUEUE_DEPTH.set(self._waiting, endpoint_class=self.name)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        finally:
+            self._waiting -= 1
+            QUEUE_DEPTH.set(self._waiting, endpoint_class=self.name)
+
+        IN_FLIGHT.inc(endpoint_class=self.name)
+        return ""
+
+    def release(self) -> None:
+        self._semaphore.release()
+        IN_FLIGHT.dec(endpoint_class=self.name)
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that admits requests through the limiter of their endpoint class.
+
+    Paths without a class are not limited. Rejected requests get a 503 with Retry-After.
+    """
+
+    def __init__(self, app, limiters: Dict[str, ConcurrencyLimiter], endpoint_classes: Dict[str, str],
+                 retry_after: int = 1):
+        """
+        Args:
+            app: The wrapped ASGI application.
+            limiters (Dict[str, ConcurrencyLimiter]): Limiter per endpoint class.
+            endpoint_classes (Dict[str, str]): Endpoint class per request path.
+            retry_after (int): Seconds sent in the Retry-After header of rejections.
+        """
+        self.app = app
+        self.limiters = limiters
+        self.endpoint_classes = endpoint_classes
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_config(cls, app, admission_config: dict) -> "AdmissionControlMiddleware":
+        limiters = {
+            name: ConcurrencyLimiter(
+                name,
+                max_concurrent=int(settings.get("max_concurrent", 8)),
+                max_queue=int(settings.get("max_queue", 16)),
+                queue_timeout=float(settings.get("queue_timeout_ms", 500)) / 1000,
+            )
+            for name, settings in admission_config.get("classes", {}).items()
+        }
+        return cls(app, limiters, admission_config.get("endpoints", {}),
+                   int(admission_config.get("retry_after_seconds", 1)))
+
+    async def __call__(self, scope, receive, send):
+        limiter = None
+        if scope["type"] == "http":
+            limiter = self.limiters.get(self.endpoint_classes.get(scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await limiter.acquire()
+        if rejection:
+            REJECTED.inc(endpoint_class=limiter.name, reason=rejection)
+            logging.debug("Rejected %s (%s): %s", scope["path"], limiter.name, rejection)
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({"detail": "Server is busy, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,241 @@
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict
+from main.api.server import compute_pool_size, current_worker_count
+from main.mongodb.MongoHelper import MongoDBClient
+from main.mongodb.pool_monitor import PoolStatsListener
+from main.services.backend import QualifiedBackend
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.offload import ScoringOffloader
+from main.services.qualified_service import QualifiedService
+from main.services.resilience import CircuitBreaker, ResilientQualifiedService
+from main.services.result_cache import (
+    CachingDataProcessor, LocalLRUCache, SQLiteSharedCache, TieredResultCache, default_shared_cache_path,
+)
+from main.services.data_processor import DataProcessor
+from main.services.rankings import RankingStore
+from main.services.snapshots import SnapshotDataProcessor, SnapshotStore
+from main.services.data_version import DataVersionWatcher
+from main.services.exceptions import DataUnavailableError
+from main.services.request_context import current_request
+from main.services.role_index import RoleIndex
+
+
+class AppServices:
+    """
+    Lazily builds and owns the per-worker MongoDB client, services and processors.
+
+    Nothing is created until a request first needs it, so building the application
+    (and importing the API module) never touches the database.
+    """
+
+    def __init__(self, config: dict):
+        """
+        Args:
+            config (dict): The parsed application configuration.
+        """
+        self.config = config
+        self._lock = threading.RLock()
+        self._mongo_client = None
+        self._qualified_service = None
+        self._data_processor = None
+        self._version_watcher = None
+        self._role_index = None
+        self._role_similarity = None
+        self._role_similarity_mtime = 0.0
+        self._refresh_executor = None
+        self._offloader = None
+        # Pool saturation of the MongoDB client, once it has been created
+        self.pool_stats = None
+
+    @property
+    def mongo_client(self) -> MongoDBClient:
+        if self._mongo_client is None:
+            with self._lock:
+                if self._mongo_client is None:
+                    mongo_config = self.config["mongo"]
+                    max_pool_size = compute_pool_size(mongo_config, current_worker_count())
+                    pool_stats = PoolStatsListener(max_pool_size)
+                    self._mongo_client = MongoDBClient(
+                        uri=os.getenv("MONGO_URI"),
+                        database_name=mongo_config["database_name"],
+                        collection_name=mongo_config["collection_qualified"],
+                        test_mode=mongo_config["test_mode"],
+                        maxPoolSize=max_pool_size,
+                        minPoolSize=int(mongo_config.get("min_pool_size", 0)),
+                        event_listeners=[pool_stats],
+                    )
+                    self.pool_stats = pool_stats
+        return self._mongo_client
+
+    @property
+    def qualified_service(self) -> QualifiedBackend:
+        if self._qualified_service is None:
+            with self._lock:
+                if self._qualified_service is None:
+                    services_config = self.config.get("services", {})
+                    if services_config.get("backend", "mongo") == "memory":
+                        # Served from JSONL exports: no MongoDB client, and no outages to ride out
+                        self._qualified_service = InMemoryQualifiedService.from_jsonl(
+                            services_config["memory_qualified_path"],
+                            services_config["memory_bigrams_path"],
+                            bigram_max_items=self.config.get("mongo", {}).get("bigram_max_items"),
+                        )
+                        return self._qualified_service
+
+                    qualified_service = QualifiedService(
+                        self.mongo_client,
+                        bigram_max_items=self.config["mongo"].get("bigram_max_items"),
+                        default_timeout_ms=self.config.get("deadlines", {}).get("default_ms"),
+                    )
+                    resilience_config = self.config.get("resilience", {})
+                    if resilience_config.get("enabled", False):
+                        self._refresh_executor = ThreadPoolExecutor(
+                            max_workers=int(resilience_config.get("refresh_workers", 2)),
+                            thread_name_prefix="stale-refresh",
+                        )
+                        qualified_service = ResilientQualifiedService(
+                            qualified_service,
+                            CircuitBreaker(
+                                failure_threshold=int(resilience_config.get("failure_threshold", 5)),
+                                reset_timeout=float(resilience_config.get("reset_timeout_seconds", 30)),
+                            ),
+                            self._refresh_executor,
+                            fresh_ttl=float(resilience_config.get("fresh_seconds", 60)),
+                            max_stale=float(resilience_config.get("max_stale_seconds", 86400)),
+                            max_entries=int(resilience_config.get("max_entries", 10000)),
+                        )
+                    self._qualified_service = qualified_service
+        return self._qualified_service
+
+    @property
+    def data_processor(self) -> DataProcessor:
+        if self._data_processor is None:
+            with self._lock:
+                if self._data_processor is None:
+                    offload_config = self.config.get("offload", {})
+                    if offload_config.get("enabled", False):
+                        workers = int(offload_config.get("workers", 2))
+                        # Spawned, not forked: the worker process already runs MongoDB monitor threads
+                        self._offloader = ScoringOffloader(
+                            lambda: ProcessPoolExecutor(max_workers=workers,
+                                                        mp_context=multiprocessing.get_context("spawn")),
+                            min_bytes=int(offload_config.get("min_bytes", 512 * 1024)),
+                            max_pending=int(offload_config.get("max_pending", 2 * workers)),
+                        )
+                    data_processor = DataProcessor(
+                        self.qualified_service,
+                        bigram_strategy=self.config.get("services", {}).get("bigram_strategy", "python"),
+                        offloader=self._offloader,
+                        ranking_store=RankingStore(
+                            int(self.config.get("services", {}).get("ranking_max_entries", 1024)),
+                            self.version_watcher,
+                        ),
+                    )
+                    cache_config = self.config.get("cache", {})
+                    if cache_config.get("enabled", False):
+                        shared = None
+                        if cache_config.get("shared_enabled", False):
+                            shared_path = cache_config.get("shared_path") or default_shared_cache_path()
+                            try:
+                                shared = SQLiteSharedCache(
+                                    shared_path,
+                                    max_entries=int(cache_config.get("shared_max_entries", 50000)),
+                                    max_value_bytes=int(cache_config.get("shared_max_value_bytes", 1 << 20)),
+                                )
+                            except sqlite3.Error as e:
+                                # The shared tier is an optimization; without it the local tier still works
+                                logging.warning("Shared result cache unavailable at %s, using the local tier only: %s",
+                                                shared_path, e)
+                        data_processor = CachingDataProcessor(data_processor, TieredResultCache(
+                            LocalLRUCache(int(cache_config.get("local_max_entries", 2048))),
+                            shared,
+                            self.version_watcher,
+                        ))
+                    snapshot_config = self.config.get("snapshots", {})
+                    if snapshot_config.get("enabled", False):
+                        data_processor = SnapshotDataProcessor(data_processor, SnapshotStore(
+                            snapshot_config.get("directory") or "data/snapshots",
+                            refresh_interval=float(snapshot_config.get("refresh_seconds", 30)),
+                        ))
+                    self._data_processor = data_processor
+        return self._data_processor
+
+    @property
+    def version_watcher(self) -> DataVersionWatcher:
+        if self._version_watcher is None:
+            with self._lock:
+                if self._version_watcher is None:
+                    self._version_watcher = DataVersionWatcher(
+                        self.qualified_service,
+                        refresh_interval=self.config.get("services", {}).get("data_version_refresh_seconds", 60),
+                    )
+        return self._version_watcher
+
+    @property
+    def role_index(self) -> RoleIndex:
+        if self._role_index is None:
+            with self._lock:
+                if self._role_index is None:
+                    self._role_index = RoleIndex(self.qualified_service, self.version_watcher)
+        return self._role_index
+
+    @property
+    def role_similarity(self):
+        """
+        The role similarity index, loaded from the file built by main.services.role_similarity.
+
+        When the index was built from another data version than the current one, the file is read
+        again if it has been rewritten since; until then the index is served marked stale.
+        """
+        index = self._role_similarity
+        version = self.version_watcher.current() if index is not None and index.version else ""
+        if index is None or (version and index.version != version):
+            with self._lock:
+                index = self._load_role_similarity()
+        if version and index.version != version:
+            context = current_request()
+            if context is not None:
+                context.mark_stale(max(time.time() - self._role_similarity_mtime, 0.0))
+        return index
+
+    def _load_role_similarity(self):
+        path = self.config.get("similarity", {}).get("index_path") or "data/role_vectors.npz"
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            if self._role_similarity is None:
+                raise DataUnavailableError(f"The role similarity index has not been built: {path}")
+            return self._role_similarity
+        if self._role_similarity is None or mtime != self._role_similarity_mtime:
+            # numpy and scipy are only imported by workers that serve similarity requests
+            from main.services.role_similarity import RoleSimilarityIndex
+            self._role_similarity = RoleSimilarityIndex.load(path)
+            self._role_similarity_mtime = mtime
+        return self._role_similarity
+
+    def cache_state(self) -> Dict:
+        """Describes what the caches hold so far, without building or loading anything."""
+        result_cache = getattr(self._data_processor, "result_cache", None)
+        return {
+            "role_index_warm": self._role_index is not None and self._role_index.is_warm(),
+            "result_cache_entries": len(result_cache.local) if result_cache is not None else 0,
+        }
+
+    def close(self) -> None:
+        """Stops background refreshes and scoring processes and closes the MongoDB client if one was created."""
+        if self._refresh_executor is not None:
+            self._refresh_executor.shutdown(wait=True, cancel_futures=True)
+            self._refresh_executor = None
+        if self._offloader is not None:
+            self._offloader.close()
+            self._offloader = None
+        if self._mongo_client is not None:
+            self._mongo_client.close_connection()
+            self._mongo_client = None
+            logging.info("Application services closed")
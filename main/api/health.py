@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+import anyio
+import pymongo
+from anyio import to_thread
+
+
+class ReadinessChecker:
+    """
+    Decides whether a worker should receive traffic, from its dependencies and its own load.
+
+    Checks MongoDB ping latency, connection pool waiters, cache warmth and the number of requests
+    waiting for a thread of the endpoint thread pool. A result is reused for cache_seconds, and
+    concurrent probes wait for the same check, so probing never adds more than one ping per
+    interval. The ping runs on a dedicated thread, so it is not queued behind busy endpoints.
+    """
+
+    def __init__(self, services, health_config: dict, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            services (AppServices): Services of the worker.
+            health_config (dict): The 'health' section of the configuration.
+            clock (Callable[[], float]): Time source, in seconds.
+        """
+        self.services = services
+        self.cache_seconds = float(health_config.get("cache_seconds", 2))
+        self.max_ping_ms = float(health_config.get("max_ping_ms", 250))
+        self.ping_timeout_ms = float(health_config.get("ping_timeout_ms", 1000))
+        self.max_pool_waiting = int(health_config.get("max_pool_waiting", 8))
+        self.max_threadpool_waiting = int(health_config.get("max_threadpool_waiting", 20))
+        self.require_warm = bool(health_config.get("require_warm", False))
+        self.clock = clock
+        self._result: Optional[Dict] = None
+        self._checked_at = float("-inf")
+        self._lock: Optional[asyncio.Lock] = None
+        self._probe_limiter: Optional[anyio.CapacityLimiter] = None
+
+    async def check(self) -> Dict:
+        """
+        Returns the readiness of the worker, checking again when the last result is too old.
+
+        Returns:
+            Dict: "ready" and the outcome of each check under "checks".
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._probe_limiter = anyio.CapacityLimiter(1)
+        async with self._lock:
+            if self.clock() - self._checked_at >= self.cache_seconds:
+                checks = {
+                    "mongo": await to_thread.run_sync(self._check_mongo, limiter=self._probe_limiter),
+                    "pool": self._check_pool(),
+                    "cache": self._check_cache(),
+                    "threadpool": self._check_threadpool(),
+                }
+                self._result = {"ready": all(check["ok"] for check in checks.values()), "checks": checks}
+                self._checked_at = self.clock()
+                if not self._result["ready"]:
+                    logging.warning("Worker not ready: %s",
+                                    ", ".join(name for name, check in checks.items() if not check["ok"]))
+        return self._result
+
+    def _uses_mongo(self) -> bool:
+        return self.services.config.get("services", {}).get("backend", "mongo") != "memory"
+
+    def _check_mongo(self) -> Dict:
+        if not self._uses_mongo():
+            return {"ok": True, "backend": "memory"}
+        try:
+            with pymongo.timeout(self.ping_timeout_ms / 1000):
+                latency_ms = self.services.mongo_client.ping() * 1000
+        except Exception as e:
+            logging.warning("MongoDB ping failed: %s", e)
+            return {"ok": False, "error": type(e).__name__}
+        return {"ok": latency_ms <= self.max_ping_ms, "ping_ms": round(latency_ms, 1)}
+
+    def _check_pool(self) -> Dict:
+        pool_stats = self.services.pool_stats
+        if pool_stats is None:
+            return {"ok": True}
+        stats = pool_stats.snapshot()
+        return {"ok": stats["waiting"] <= self.max_pool_waiting, **stats}
+
+    def _check_cache(self) -> Dict:
+        state = self.services.cache_state()
+        return {"ok": state["role_index_warm"] or not self.require_warm, **state}
+
+    def _check_threadpool(self) -> Dict:
+        # Sync endpoints run on anyio's default thread limiter; requests beyond its tokens wait in line
+        limiter = to_thread.current_default_thread_limiter()
+        statistics = limiter.statistics()
+        return {
+            "ok": statistics.tasks_waiting <= self.max_threadpool_waiting,
+            "busy": statistics.borrowed_tokens,
+            "size": statistics.total_tokens,
+            "waiting": statistics.tasks_waiting,
+        }
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 from enum import Enum
 
 class CountryEnum(str, Enum):
@@ -77,15 +78,55 @@ class StateEnumCanada(str, Enum):
     YT = "YT"
     all = "All"
 
-# Role as a simple string
-class FullRequestData(BaseModel):
+# States accepted for each country, built once so that validating a request is a set lookup
+STATES_BY_COUNTRY = {
+    CountryEnum.usa: frozenset(state.value for state in StateEnumUSA),
+    CountryEnum.canada: frozenset(state.value for state in StateEnumCanada),
+}
+STATE_ERRORS = {
+    CountryEnum.usa: "Invalid state for USA",
+    CountryEnum.canada: "Invalid province for Canada",
+}
+
+# Country and a state of that country; an unknown state is rejected with a 422
+class StateRequestData(BaseModel):
     country: CountryEnum
     state: str
+
+    @field_validator("state")
+    @classmethod
+    def check_state(cls, state: str, info: ValidationInfo) -> str:
+        country = info.data.get("country")  # Missing when the country itself is invalid
+        if country is not None and state not in STATES_BY_COUNTRY[country]:
+            raise ValueError(STATE_ERRORS[country])
+        return state
+
+# Role as a simple string
+class FullRequestData(StateRequestData):
     role: str  # Changed from RoleEnum to str
 
+# Details request with optional paging of the full rankings; the usual top entries when both are omitted
+class RankedRequestData(FullRequestData):
+    top_k: Optional[int] = Field(default=None, ge=1, le=1000)
+    offset: int = Field(default=0, ge=0)
+
 class CountryOnlyRequest(BaseModel):
     country: CountryEnum
 
-class RolesRequestData(BaseModel):
+class RolesRequestData(StateRequestData):
+    pass
+
+class RoleSearchRequest(BaseModel):
     country: CountryEnum
-    state: str
+    prefix: str = ""
+    limit: int = Field(default=10, ge=1, le=100)
+
+class SimilarRolesRequest(FullRequestData):
+    limit: int = Field(default=10, ge=1, le=100)
+
+class ExportRequest(BaseModel):
+    country: Optional[CountryEnum] = None  # All countries when omitted
+
+class RoleMapRequest(BaseModel):
+    country: CountryEnum
+    role: str
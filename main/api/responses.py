@@ -0,0 +1,17 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+from main.services.records import json_default
+
+
+class RecordJSONResponse(JSONResponse):
+    """
+    JSON response for DataProcessor results.
+
+    Result records are written in their API format while the body is serialized, in one pass,
+    instead of going through jsonable_encoder first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                          default=json_default).encode("utf-8")
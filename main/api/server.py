@@ -0,0 +1,88 @@
+import logging
+import os
+import uvicorn
+from main.utilities.config import load_config
+from main.utilities.logging_config import configure_logging, stop_logging
+
+# Environment variable the launcher uses to tell each worker how many siblings it has
+WORKERS_ENV_VAR = "TECH_MASTERY_WORKERS"
+
+
+def compute_worker_count(server_config: dict, cpu_count: int = None) -> int:
+    """
+    Determines how many uvicorn worker processes to start.
+
+    An explicit 'workers' value in the config wins. Otherwise one worker is started per CPU,
+    capped by 'max_workers'.
+
+    Args:
+        server_config (dict): The 'server' section of the configuration.
+        cpu_count (int): Number of CPUs available. Detected when not provided.
+
+    Returns:
+        int: The number of worker processes, at least 1.
+    """
+    configured = int(server_config.get("workers") or 0)
+    if configured > 0:
+        return configured
+
+    if cpu_count is None:
+        # Respect CPU affinity (e.g. container cpusets) when the platform exposes it
+        cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    max_workers = int(server_config.get("max_workers") or 0)
+    workers = cpu_count or 1
+    if max_workers > 0:
+        workers = min(workers, max_workers)
+    return max(workers, 1)
+
+
+def compute_pool_size(mongo_config: dict, workers: int) -> int:
+    """
+    Splits the per-host connection budget evenly across workers.
+
+    Args:
+        mongo_config (dict): The 'mongo' section of the configuration.
+        workers (int): The number of worker processes sharing the host.
+
+    Returns:
+        int: The maxPoolSize each worker should use.
+    """
+    total = int(mongo_config.get("max_pool_size", 100))
+    floor = int(mongo_config.get("worker_pool_floor", 1))
+    return max(total // max(workers, 1), floor, 1)
+
+
+def current_worker_count() -> int:
+    """Returns the worker count announced by the launcher, or 1 for a plain uvicorn run."""
+    try:
+        return max(int(os.getenv(WORKERS_ENV_VAR, "1")), 1)
+    except ValueError:
+        return 1
+
+
+def main() -> None:
+    """Starts the API with a pre-fork pool of uvicorn workers sized from the configuration."""
+    config = load_config()
+    server_config = config.get("server", {})
+    workers = compute_worker_count(server_config)
+
+    # Workers are started after this point and read the count to size their Mongo pools
+    os.environ[WORKERS_ENV_VAR] = str(workers)
+    # Workers configure logging themselves, so the launcher only does it around its own message
+    log_listener = configure_logging(config.get("logging", {}))
+    logging.info("Starting Tech Mastery API with %d worker(s), each with a MongoDB pool of up to %d connections",
+                 workers, compute_pool_size(config.get("mongo", {}), workers))
+    stop_logging(log_listener)
+
+    uvicorn.run(
+        "main.api.tech_mastery_api:create_app",
+        factory=True,
+        host=server_config.get("host", "0.0.0.0"),
+        port=int(server_config.get("port", 8000)),
+        workers=workers,
+        timeout_graceful_shutdown=int(server_config.get("graceful_shutdown_timeout", 30)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,143 @@
 import logging
-import yaml
-from fastapi import FastAPI, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+from itertools import chain
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from main.api.models import RolesRequestData, CountryOnlyRequest, FullRequestData, CountryEnum, StateEnumUSA, StateEnumCanada
-from main.services.qualified_service import QualifiedService
+from main.api.models import CountryOnlyRequest, FullRequestData, RankedRequestData, RoleSearchRequest, SimilarRolesRequest, RoleMapRequest, ExportRequest, CountryEnum
+from main.api.admission import AdmissionControlMiddleware
+from main.api.app_context import AppServices
+from main.api.health import ReadinessChecker
+from main.api.responses import RecordJSONResponse
 from main.services.data_processor import DataProcessor
-from main.mongodb.MongoHelper import MongoDBClient
+from main.services.export import with_completion_line
+from main.services.records import json_default
+from main.services.role_index import RoleIndex
+from main.utilities.config import load_config
+from main.utilities.jsonl import ndjson_chunks
+from main.utilities.logging_config import configure_logging, stop_logging
 from dotenv import load_dotenv
 import os
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from main.services.exceptions import DataUnavailableError, DeadlineExceededError
+from main.services.request_context import start_request
+from main.utilities.metrics import REGISTRY
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Access credentials from environment variables
-USERNAME = os.getenv("API_USERNAME")
-PASSWORD = os.getenv("API_PASSWORD")
-
-# Load configuration from YAML file with error handling
-try:
-    with open("main/utilities/config.local.yaml", "r") as file:
-        config = yaml.safe_load(file)
-except FileNotFoundError:
-    raise FileNotFoundError("The configuration file 'config.local.yaml' was not found.")
-except yaml.YAMLError as e:
-    raise RuntimeError(f"Error parsing the YAML configuration file: {e}")
-
-# Initialize the MongoDB client using the URI and other configuration details
-mongo_client = MongoDBClient(
-    uri=os.getenv("MONGO_URI"),
-    database_name=config["mongo"]["database_name"],
-    collection_name=config["mongo"]["collection_qualified"],
-    test_mode=config["mongo"]["test_mode"]
-)
-
-# Instantiate the service and processor classes
-qualified_service = QualifiedService(mongo_client)
-data_processor = DataProcessor(qualified_service)
-
-# Initialize the FastAPI app
-app = FastAPI()
-
-# Add CORS middleware for open access during testing (to be restricted later)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Open to all origins during testing
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Attaches the lazily-built services to the app when a worker starts and closes them on shutdown.
+
+    The MongoDB client is only created on first use, inside the worker process, so every
+    worker owns its own connection pool. Logging is routed through a queue drained by a
+    background thread for the lifetime of the worker.
+    """
+    log_listener = configure_logging(app.state.config.get("logging", {}))
+    app.state.services = AppServices(app.state.config)
+    app.state.readiness = ReadinessChecker(app.state.services, app.state.config.get("health", {}))
+    try:
+        yield
+    finally:
+        # Uvicorn only runs this once in-flight requests have finished, so the pool drains cleanly
+        app.state.services.close()
+        stop_logging(log_listener)
+
+
+def create_app(config: dict = None) -> FastAPI:
+    """
+    Builds the FastAPI application.
+
+    Args:
+        config (dict): The parsed configuration. Loaded from config.local.yaml when not provided.
+
+    Returns:
+        FastAPI: The configured application.
+    """
+    # Load environment variables from .env file
+    load_dotenv()
+    if config is None:
+        config = load_config()
+
+    # Initialize the FastAPI app
+    app = FastAPI(lifespan=lifespan)
+    app.state.config = config
+
+    # Access credentials from environment variables
+    app.state.credentials = (os.getenv("API_USERNAME"), os.getenv("API_PASSWORD"))
+
+    # Admission control runs inside the request context, so time spent queued counts towards the deadline
+    admission_config = config.get("admission", {})
+    if admission_config.get("enabled", False):
+        app.add_middleware(AdmissionControlMiddleware.from_config, admission_config=admission_config)
+    app.middleware("http")(track_request_context)
+
+    # Add CORS middleware for open access during testing (to be restricted later).
+    # Added last so it is the outermost middleware, and admission 503s carry CORS headers too
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Open to all origins during testing
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_exception_handler(DataUnavailableError, data_unavailable_handler)
+    app.add_exception_handler(DeadlineExceededError, deadline_exceeded_handler)
+    app.include_router(router)
+    return app
+
+
+def endpoint_timeout_ms(config: dict, path: str):
+    """Returns the deadline configured for an endpoint, falling back to the default one."""
+    deadlines = config.get("deadlines", {})
+    return deadlines.get("endpoints", {}).get(path, deadlines.get("default_ms"))
+
+
+async def track_request_context(request: Request, call_next):
+    # Services read the request deadline from this context and record whether stale data was served
+    path = request.url.path
+    context = start_request(path, endpoint_timeout_ms(request.app.state.config, path))
+    response = await call_next(request)
+    if context.stale:
+        response.headers["X-Data-Stale"] = "true"
+        response.headers["Age"] = str(int(context.max_staleness))
+    return response
+
+
+async def data_unavailable_handler(request: Request, exc: DataUnavailableError):
+    logging.warning("Data unavailable for %s: %s", request.url.path, exc)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Data is temporarily unavailable"},
+        headers={"Retry-After": str(int(request.app.state.config.get("resilience", {}).get("reset_timeout_seconds", 30)))},
+    )
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    logging.warning("Deadline exceeded for %s: %s", request.url.path, exc)
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "The request did not complete within its deadline"},
+    )
+
+
+def __getattr__(name: str):
+    # Keeps `uvicorn main.api.tech_mastery_api:app` working without building the app at import time
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+router = APIRouter()
 
 # Basic Authentication setup
 security = HTTPBasic()
 
-def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)):
-    if credentials.username != USERNAME or credentials.password != PASSWORD:
+def authenticate_user(request: Request, credentials: HTTPBasicCredentials = Depends(security)):
+    username, password = request.app.state.credentials
+    if credentials.username != username or credentials.password != password:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -62,48 +145,104 @@ def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)):
         )
     return credentials
 
+def get_data_processor(request: Request) -> DataProcessor:
+    return request.app.state.services.data_processor
+
+def get_role_index(request: Request) -> RoleIndex:
+    return request.app.state.services.role_index
+
+def get_role_similarity(request: Request):
+    return request.app.state.services.role_similarity
+
+# States are validated by the request models; roles need the data, so they are checked against the cached role index
+def check_role(role_index: RoleIndex, country: str, role: str) -> None:
+    try:
+        known = role_index.has_role(country, role)
+    except DataUnavailableError as e:
+        # The roles could not be loaded: the request is let through rather than failed
+        logging.warning("Role check skipped for country: %s: %s", country, e)
+        return
+    if not known:
+        raise HTTPException(
+            status_code=422,  # Same status as the request model errors
+            detail=[{"type": "value_error", "loc": ["body", "role"], "msg": f"Unknown role for {country}",
+                     "input": role}],
+        )
+
 # Define your API endpoints using the security dependency to ensure they are protected
-@app.get("/")
+@router.get("/")
 def read_root():
     return {"message": "Welcome to the Tech Mastery API"}
 
+# Liveness probe: answers as long as the worker's event loop runs, whatever the state of its dependencies
+@router.get("/healthz")
+async def get_health():
+    return {"status": "ok"}
+
+# Readiness probe: 503 while MongoDB is slow or unreachable, or the worker is saturated
+@router.get("/readyz")
+async def get_readiness(request: Request):
+    readiness = await request.app.state.readiness.check()
+    return JSONResponse(status_code=status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+                        content=readiness)
+
+# Process-local counters and gauges in the Prometheus text format
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(credentials: HTTPBasicCredentials = Depends(authenticate_user)):
+    return REGISTRY.render()
+
 # API Type 1: Takes a JSON object and returns tools, skills, libraries, and languages
-@app.post("/details/operations")
-def get_operations(request_data: FullRequestData, credentials: HTTPBasicCredentials = Depends(authenticate_user)):
-    if request_data.country == CountryEnum.usa and request_data.state not in StateEnumUSA.__members__.values():
-        return {"error": "Invalid state for USA"}
-    elif request_data.country == CountryEnum.canada and request_data.state not in StateEnumCanada.__members__.values():
-        return {"error": "Invalid province for Canada"}
+@router.post("/details/operations")
+def get_operations(request_data: RankedRequestData, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                   data_processor: DataProcessor = Depends(get_data_processor),
+                   role_index: RoleIndex = Depends(get_role_index)):
+    check_role(role_index, request_data.country.value, request_data.role)
+
+    if request_data.top_k is not None or request_data.offset:
+        return RecordJSONResponse(data_processor.process_ranked_bigram_data(
+            country=request_data.country.value,
+            state=request_data.state,
+            role=request_data.role,
+            top_k=request_data.top_k,
+            offset=request_data.offset
+        ))
 
     processed_data = data_processor.process_bigram_data(
         country=request_data.country.value,
         state=request_data.state,
         role=request_data.role
     )
-    return processed_data
+    return RecordJSONResponse(processed_data)
 
 # API Type 1: Takes a JSON object and returns education data
-@app.post("/details/education")
-def get_education(request_data: FullRequestData, credentials: HTTPBasicCredentials = Depends(authenticate_user)):
-    if request_data.country == CountryEnum.usa and request_data.state not in StateEnumUSA.__members__.values():
-        return {"error": "Invalid state for USA"}
-    elif request_data.country == CountryEnum.canada and request_data.state not in StateEnumCanada.__members__.values():
-        return {"error": "Invalid province for Canada"}
+@router.post("/details/education")
+def get_education(request_data: RankedRequestData, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                  data_processor: DataProcessor = Depends(get_data_processor),
+                  role_index: RoleIndex = Depends(get_role_index)):
+    check_role(role_index, request_data.country.value, request_data.role)
+
+    if request_data.top_k is not None or request_data.offset:
+        return RecordJSONResponse(data_processor.process_ranked_education_data(
+            country=request_data.country.value,
+            state=request_data.state,
+            role=request_data.role,
+            top_k=request_data.top_k,
+            offset=request_data.offset
+        ))
 
     education_data = data_processor.process_education_data(
         country=request_data.country.value,
         state=request_data.state,
         role=request_data.role
     )
-    return {"education": education_data}
+    return RecordJSONResponse({"education": education_data})
 
 # API Type 1: Takes a JSON object and returns workplace data
-@app.post("/details/workplace")
-def get_workplace(request_data: FullRequestData, credentials: HTTPBasicCredentials = Depends(authenticate_user)):
-    if request_data.country == CountryEnum.usa and request_data.state not in StateEnumUSA.__members__.values():
-        return {"error": "Invalid state for USA"}
-    elif request_data.country == CountryEnum.canada and request_data.state not in StateEnumCanada.__members__.values():
-        return {"error": "Invalid province for Canada"}
+@router.post("/details/workplace")
+def get_workplace(request_data: FullRequestData, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                  data_processor: DataProcessor = Depends(get_data_processor),
+                  role_index: RoleIndex = Depends(get_role_index)):
+    check_role(role_index, request_data.country.value, request_data.role)
 
     workplace_data = data_processor.process_place_of_work_data(
         country=request_data.country.value,
@@ -113,8 +252,9 @@ def get_workplace(request_data: FullRequestData, credentials: HTTPBasicCredentia
     return {"workplace": workplace_data}
 
 # API Type 2: Takes a JSON object and returns country-specific details
-@app.post("/details/country")
-def get_country_details(request_data: CountryOnlyRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user)):
+@router.post("/details/country")
+def get_country_details(request_data: CountryOnlyRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                        data_processor: DataProcessor = Depends(get_data_processor)):
     if request_data.country == CountryEnum.canada:
         return {"states": data_processor.process_state_frequency_data(request_data.country.value)}
     elif request_data.country == CountryEnum.usa:
@@ -122,11 +262,48 @@ def get_country_details(request_data: CountryOnlyRequest, credentials: HTTPBasic
     else:
         return {"error": "Country not found or data unavailable"}
 
+# API Type 2: Takes a JSON object and returns, per state, the postings of one role and their place of work split
+@router.post("/details/roles/map")
+def get_role_state_map(request_data: RoleMapRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                       data_processor: DataProcessor = Depends(get_data_processor),
+                       role_index: RoleIndex = Depends(get_role_index)):
+    check_role(role_index, request_data.country.value, request_data.role)
+
+    states = data_processor.process_role_state_map(request_data.country.value, request_data.role)
+    return {"states": states}
+
 # API Type 3: Takes a JSON object and returns roles
-@app.post("/details/roles")
-def get_role_details(request_data: CountryOnlyRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user)):
+@router.post("/details/roles")
+def get_role_details(request_data: CountryOnlyRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                     role_index: RoleIndex = Depends(get_role_index)):
 
-    roles_data = data_processor.fetch_distinct_roles(
-        country=request_data.country.value
-    )
+    roles_data = role_index.roles(request_data.country.value)
     return {"roles": roles_data}
+
+# API Type 3: Takes a JSON object and returns the roles matching a typed prefix, with their posting counts
+@router.post("/details/roles/search")
+def search_roles(request_data: RoleSearchRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                 role_index: RoleIndex = Depends(get_role_index)):
+
+    matches = role_index.search(request_data.country.value, request_data.prefix, request_data.limit)
+    return {"roles": matches}
+
+# API Type 3: Takes a JSON object and returns the roles of the same state needing the most similar skills and tools
+@router.post("/details/roles/similar")
+def get_similar_roles(request_data: SimilarRolesRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                      role_similarity=Depends(get_role_similarity)):
+
+    similar = role_similarity.similar(request_data.country.value, request_data.state, request_data.role,
+                                      request_data.limit)
+    return {"roles": similar}
+
+# Streams the operations and education results of every (country, state, role) as newline-delimited JSON
+@router.post("/details/export")
+def export_details(request_data: ExportRequest, credentials: HTTPBasicCredentials = Depends(authenticate_user),
+                   data_processor: DataProcessor = Depends(get_data_processor)):
+    country = request_data.country.value if request_data.country is not None else None
+    chunks = ndjson_chunks(data_processor.iter_results(country), default=json_default)
+    # Reads the first batch before responding, so an unavailable database still gets a 503.
+    # Later failures can no longer change the status, so the last line tells whether the export is complete
+    first = next(chunks, b"")
+    return StreamingResponse(with_completion_line(chain([first], chunks)), media_type="application/x-ndjson")
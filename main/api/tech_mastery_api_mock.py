@@ -1,5 +1,10 @@
+"""
+Static mock of the API, returning the fixed lists in main/data/mock_data.py.
+
+To run the real API without MongoDB, set services.backend to "memory" in config.local.yaml instead.
+"""
 from fastapi import FastAPI
-from main.api.models import RequestData, CountryEnum, StateEnumUSA, StateEnumCanada  # Import models and enums
+from main.api.models import FullRequestData, CountryOnlyRequest, CountryEnum  # Import models and enums
 from main.data.mock_data import (  # Import mock data from mock_data.py
     mockLangData,
     mockToolsData,
@@ -19,13 +24,8 @@ def read_root():
 
 # API Type 1: Takes a JSON object and returns tools, skills, libraries, languages, education, workplace
 @app.post("/details")
-def get_details(request_data: RequestData):
-    # Validate state based on the country
-    if request_data.country == CountryEnum.usa and request_data.state not in StateEnumUSA.__members__.values():
-        return {"error": "Invalid state for USA"}
-    elif request_data.country == CountryEnum.canada and request_data.state not in StateEnumCanada.__members__.values():
-        return {"error": "Invalid province for Canada"}
-
+def get_details(request_data: FullRequestData):
+    # The state is validated by FullRequestData
     return {
         "tools": mockToolsData,
         "skills": mockSkillsData,
@@ -37,7 +37,7 @@ def get_details(request_data: RequestData):
 
 # API Type 2: Takes a JSON object and returns country-specific details
 @app.post("/country-details")
-def get_country_details(request_data: RequestData):
+def get_country_details(request_data: CountryOnlyRequest):
     if request_data.country == CountryEnum.canada:
         return {"states": mockCanadaData}
     elif request_data.country == CountryEnum.usa:
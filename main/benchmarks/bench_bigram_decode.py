@@ -0,0 +1,90 @@
+"""
+Compares the bigram read paths on synthetic documents, without a database.
+
+  legacy   - the full bigrams document, {bigram, score} subdocuments decoded into dicts,
+             read once per category as process_bigram_data used to do
+  columns  - the $project column form read once by get_bigram_columns_by_country_state_role
+  sliced   - the column form limited to the top N bigrams per category (mongo.bigram_max_items)
+
+For each path it reports the BSON bytes that would cross the wire, the decode time,
+and the decode plus DataProcessor scoring time.
+
+Run from the repository root:
+    python -m main.benchmarks.bench_bigram_decode [--items 3000] [--max-items 200]
+"""
+import argparse
+import random
+import time
+import bson
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.data_processor import (
+    accumulate_language_scores, accumulate_library_scores, accumulate_skill_scores, accumulate_tool_scores,
+    rank_scores,
+)
+from main.services.qualified_service import BIGRAM_CATEGORIES
+
+ACCUMULATORS = {
+    "skills": (accumulate_skill_scores, "skill"),
+    "tools": (accumulate_tool_scores, "tool"),
+    "libraries": (accumulate_library_scores, "library"),
+    "languages": (accumulate_language_scores, "language"),
+}
+
+
+def to_columns(document: dict, max_items: int = None) -> dict:
+    """Mirrors the $project stage of QualifiedService._bigram_columns_projection."""
+    columns = {}
+    for category in BIGRAM_CATEGORIES:
+        items = document[category]
+        if max_items:
+            items = sorted(items, key=lambda item: item["score"], reverse=True)[:max_items]
+        columns[category] = {"bigrams": [item["bigram"] for item in items], "scores": [item["score"] for item in items]}
+    return columns
+
+
+def process_legacy(raw: bytes) -> None:
+    for category in BIGRAM_CATEGORIES:
+        document = bson.decode(raw)
+        accumulate, key = ACCUMULATORS[category]
+        items = document[category]
+        rank_scores(accumulate([item["bigram"] for item in items], [item["score"] for item in items]), key, 5)
+
+
+def process_columns(raw: bytes) -> None:
+    document = bson.decode(raw)
+    for category in BIGRAM_CATEGORIES:
+        accumulate, key = ACCUMULATORS[category]
+        rank_scores(accumulate(document[category]["bigrams"], document[category]["scores"]), key, 5)
+
+
+def time_call(function, raw: bytes, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        function(raw)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=3000, help="bigrams per category")
+    parser.add_argument("--max-items", type=int, default=200, help="bigrams per category on the sliced path")
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    document = make_bigrams_document("United States", "All", "Data Engineer", args.items, random.Random(42))
+    projected = {category: document[category] for category in BIGRAM_CATEGORIES}
+    paths = {
+        "legacy": (bson.encode(projected), process_legacy, len(BIGRAM_CATEGORIES)),
+        "columns": (bson.encode(to_columns(document)), process_columns, 1),
+        "sliced": (bson.encode(to_columns(document, args.max_items)), process_columns, 1),
+    }
+
+    print(f"{'path':<10}{'bytes/request':>16}{'decode ms':>12}{'decode+score ms':>18}")
+    for name, (raw, process, reads) in paths.items():
+        decode_ms = time_call(bson.decode, raw, args.runs) * reads
+        total_ms = time_call(process, raw, args.runs)
+        print(f"{name:<10}{len(raw) * reads:>16,}{decode_ms:>12.2f}{total_ms:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
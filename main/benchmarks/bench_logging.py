@@ -0,0 +1,114 @@
+"""
+Measures the logging overhead paid by the request thread.
+
+A simulated request emits the log calls of a /details/* request: the collection switch, the
+service read and the processor summary. Reported, as the mean time per request:
+  - before: synchronous file and console handlers on the root logger, eager f-strings and the
+    collection switch logged at INFO
+  - queued: the same handlers behind a QueueListener, lazy %-formatting, every request logged
+  - queued + sampled: as above, keeping the info logs of --sample-rate of the requests
+
+Console output goes to os.devnull and the log file to a temporary directory, so the numbers
+reflect formatting and write costs rather than a terminal.
+
+Run from the repository root:
+    python -m main.benchmarks.bench_logging [--requests N] [--sample-rate R]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from main.services.request_context import clear_request, start_request
+from main.utilities.logging_config import DEFAULT_FORMAT, configure_logging, stop_logging
+
+COUNTRY, STATE, ROLE = "usa", "California", "data engineer"
+
+
+def eager_request() -> None:
+    logging.info(f"Collection changed to: {'qualified'}")
+    logging.info(f"Successfully fetched bigrams data for country: {COUNTRY}, state: {STATE}, role: {ROLE}")
+    logging.info(f"Collection changed to: {'qualified'}")
+    logging.info(f"Successfully fetched education data for country: {COUNTRY}, state: {STATE}, role: {ROLE}")
+    logging.info(f"Processed bigram data for country: {COUNTRY}, state: {STATE}, role: {ROLE}")
+
+
+def lazy_request() -> None:
+    logging.debug("Collection changed to: %s", "qualified")
+    logging.info("Successfully fetched bigrams data for country: %s, state: %s, role: %s", COUNTRY, STATE, ROLE)
+    logging.debug("Collection changed to: %s", "qualified")
+    logging.info("Successfully fetched education data for country: %s, state: %s, role: %s", COUNTRY, STATE, ROLE)
+    logging.info("Processed bigram data for country: %s, state: %s, role: %s", COUNTRY, STATE, ROLE)
+
+
+def make_handlers(log_file: str, console) -> list:
+    formatter = logging.Formatter(DEFAULT_FORMAT)
+    handlers = [logging.FileHandler(log_file), logging.StreamHandler(console)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def time_requests(emit, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        start_request("/details/operations")
+        emit()
+    elapsed = time.perf_counter() - start
+    clear_request()
+    return elapsed / requests
+
+
+def run_before(requests: int, log_file: str, console) -> float:
+    root = logging.getLogger()
+    handlers = make_handlers(log_file, console)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    try:
+        return time_requests(eager_request, requests)
+    finally:
+        for handler in handlers:
+            root.removeHandler(handler)
+            handler.close()
+
+
+def run_queued(requests: int, log_file: str, console, sample_rate: float) -> float:
+    config = {"level": "INFO", "request_sample_rate": sample_rate}
+    listener = configure_logging(config, handlers=make_handlers(log_file, console))
+    try:
+        return time_requests(lazy_request, requests)
+    finally:
+        stop_logging(listener)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    saved_handlers = logging.getLogger().handlers[:]
+    for handler in saved_handlers:
+        logging.getLogger().removeHandler(handler)
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as console:
+        log_file = os.path.join(tmp, "api.log")
+        results = [
+            ("before (sync, eager)", run_before(args.requests, log_file, console)),
+            ("queued", run_queued(args.requests, log_file, console, 1.0)),
+            (f"queued + sampled ({args.sample_rate:g})", run_queued(args.requests, log_file, console, args.sample_rate)),
+        ]
+
+    for handler in saved_handlers:
+        logging.getLogger().addHandler(handler)
+
+    baseline = results[0][1]
+    print(f"{args.requests} simulated requests, 5 log calls each")
+    for name, per_request in results:
+        print(f"  {name:<28} {per_request * 1e6:8.1f} us/request  ({baseline / per_request:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
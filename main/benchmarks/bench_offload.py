@@ -0,0 +1,123 @@
+"""
+Load test of the process-pool offload for large bigrams documents.
+
+Serves an in-memory dataset with one very large "All" document and many small ones. Heavy
+threads keep requesting the large document while light threads request small documents,
+as endpoint threads of one API worker would. Reports the latency percentiles of the small
+requests, counted from when each was due, and the number of large requests completed:
+  - inline: every document is decoded and scored on the request thread, as without offload
+  - offload: documents of at least --min-bytes are decoded and scored in a process pool
+
+The pool only helps when the host has spare cores for the scoring processes.
+
+Run from the repository root:
+    python -m main.benchmarks.bench_offload [--seconds S] [--large-items N] [--heavy T] [--light T] [--workers N]
+"""
+import argparse
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.data_processor import DataProcessor
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.offload import ScoringOffloader
+
+COUNTRY = "United States"
+SMALL_ROLES = 50
+
+
+def build_service(large_items: int) -> InMemoryQualifiedService:
+    rng = random.Random(0)
+    documents = [make_bigrams_document(COUNTRY, "All", "large role", large_items, rng)]
+    documents += [make_bigrams_document(COUNTRY, "CA", f"role {i}", 200, rng) for i in range(SMALL_ROLES)]
+    return InMemoryQualifiedService([], documents)
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_load(processor: DataProcessor, seconds: float, heavy: int, light: int, interval: float) -> dict:
+    stop = threading.Event()
+    latencies, heavy_done = [], [0]
+    lock = threading.Lock()
+
+    def heavy_loop():
+        while not stop.is_set():
+            processor.process_bigram_data(COUNTRY, "All", "large role")
+            with lock:
+                heavy_done[0] += 1
+
+    def light_loop(seed: int):
+        # Open loop: requests are due at fixed times and latency counts from then, so time spent
+        # waiting for the GIL before the request even starts is included
+        rng = random.Random(seed)
+        due = time.perf_counter()
+        while not stop.is_set():
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            processor.process_bigram_data(COUNTRY, "CA", f"role {rng.randrange(SMALL_ROLES)}")
+            with lock:
+                latencies.append(time.perf_counter() - due)
+            due += interval
+
+    threads = [threading.Thread(target=heavy_loop) for _ in range(heavy)]
+    threads += [threading.Thread(target=light_loop, args=(i,)) for i in range(light)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "small requests": len(latencies),
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p95 ms": percentile(latencies, 0.95) * 1000,
+        "p99 ms": percentile(latencies, 0.99) * 1000,
+        "max ms": max(latencies) * 1000,
+        "large requests": heavy_done[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--large-items", type=int, default=20000, help="Bigrams per category of the large document")
+    parser.add_argument("--heavy", type=int, default=2, help="Threads requesting the large document")
+    parser.add_argument("--light", type=int, default=4, help="Threads requesting small documents")
+    parser.add_argument("--interval-ms", type=float, default=50, help="Time between two requests of a light thread")
+    parser.add_argument("--workers", type=int, default=2, help="Scoring processes")
+    parser.add_argument("--min-bytes", type=int, default=512 * 1024)
+    args = parser.parse_args()
+
+    service = build_service(args.large_items)
+    large = service.get_bigram_columns_raw_by_country_state_role(COUNTRY, "All", "large role")
+    print(f"Large document: {len(large) / 1e6:.1f} MB of BSON, small documents: "
+          f"{len(service.get_bigram_columns_raw_by_country_state_role(COUNTRY, 'CA', 'role 0')) / 1e3:.0f} kB")
+
+    def pool():
+        return ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    modes = {
+        "inline": ScoringOffloader(pool, min_bytes=float("inf")),
+        "offload": ScoringOffloader(pool, min_bytes=args.min_bytes, max_pending=2 * args.workers),
+    }
+    for name, offloader in modes.items():
+        processor = DataProcessor(service, offloader=offloader)
+        # Starts the worker processes before measuring
+        processor.process_bigram_data(COUNTRY, "All", "large role")
+        result = run_load(processor, args.seconds, args.heavy, args.light, args.interval_ms / 1000)
+        offloader.close()
+        print(f"{name:>8}: " + ", ".join(
+            f"{key} {value:.1f}" if isinstance(value, float) else f"{key} {value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
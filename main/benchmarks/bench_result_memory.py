@@ -0,0 +1,118 @@
+"""
+Measures the memory held by cached /details/operations and /details/education results.
+
+Scores the bigrams documents of --roles synthetic keys twice and keeps every result, as the
+per-worker result cache does:
+  - dicts: one {key: token, "percentage": value} dict per entry, as rank_scores used to return,
+    each holding its own copy of the token string
+  - records: RankedTokens/RankedEducation records with interned tokens
+
+Reported with tracemalloc: the bytes and allocated blocks retained per cached key, the peak
+memory allocated while scoring one key, and the scoring time without tracing.
+
+Run from the repository root:
+    python -m main.benchmarks.bench_result_memory [--roles N] [--items N]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.data_processor import (
+    ACCUMULATORS, CATEGORY_KEYS, TOP_K, rank_education_scores, rank_scores,
+)
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.qualified_service import BIGRAM_CATEGORIES
+
+
+def dict_rank_scores(token_scores, key, limit):
+    # rank_scores before result records: a dict per token, sorted in full
+    total_score = sum(token_scores.values())
+    data = [{key: token, "percentage": round((score / total_score * 100), 2) if total_score > 0 else 0}
+            for token, score in token_scores.items()]
+    data.sort(key=lambda x: x["percentage"], reverse=True)
+    return data[:limit]
+
+
+def dict_rank_education_scores(education_scores, limit):
+    total_score = sum(education_scores.values())
+    data = [{"id": word.capitalize(), "label": word.capitalize(),
+             "value": round((score / total_score * 100), 2) if total_score > 0 else 0}
+            for word, score in education_scores.items()]
+    data.sort(key=lambda x: x["value"], reverse=True)
+    return data[:limit]
+
+
+def score_dicts(columns):
+    result = {category: dict_rank_scores(ACCUMULATORS[category](*columns[category]), CATEGORY_KEYS[category],
+                                         TOP_K[category])
+              for category in BIGRAM_CATEGORIES}
+    result["education"] = dict_rank_education_scores(ACCUMULATORS["education"](*columns["education"]),
+                                                     TOP_K["education"])
+    return result
+
+
+def score_records(columns):
+    result = {category: rank_scores(ACCUMULATORS[category](*columns[category]), CATEGORY_KEYS[category],
+                                    TOP_K[category])
+              for category in BIGRAM_CATEGORIES}
+    result["education"] = rank_education_scores(ACCUMULATORS["education"](*columns["education"]), TOP_K["education"])
+    return result
+
+
+def measure(score, service, keys) -> dict:
+    columns = [service.get_bigram_columns_by_country_state_role(*key, categories=(*BIGRAM_CATEGORIES, "education"))
+               for key in keys]
+
+    # Timed without tracemalloc, which slows allocations down; best of 3 passes
+    elapsed = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for document in columns:
+            score(document)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    cache = {key: score(document) for key, document in zip(keys, columns)}
+    after = tracemalloc.take_snapshot()
+    retained = [stat for stat in after.compare_to(before, "filename")]
+    retained_bytes = sum(stat.size_diff for stat in retained)
+    retained_blocks = sum(stat.count_diff for stat in retained)
+
+    # Peak allocation while scoring one key, results included
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    score(columns[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+
+    return {
+        "bytes per cached key": retained_bytes / len(keys),
+        "blocks per cached key": retained_blocks / len(keys),
+        "peak kB per request": (peak - current) / 1000,
+        "us per request": elapsed / len(keys) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", type=int, default=2000, help="Keys scored and cached")
+    parser.add_argument("--items", type=int, default=100, help="Bigrams per category")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [make_bigrams_document("United States", f"S{i % 50}", f"role {i}", args.items, rng)
+                 for i in range(args.roles)]
+    service = InMemoryQualifiedService([], documents)
+    keys = [(document["country"], document["state"], document["role"]) for document in documents]
+
+    for name, score in (("dicts", score_dicts), ("records", score_records)):
+        result = measure(score, service, keys)
+        print(f"{name:>8}: " + ", ".join(f"{key} {value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Measures the role similarity index on synthetic data.
+
+Reports the build time, the size of the saved index and the latency of similarity queries.
+
+Run from the repository root:
+    python -m main.benchmarks.bench_role_similarity [--states N] [--roles N] [--items N] [--queries N]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.role_similarity import RoleSimilarityIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, default=10)
+    parser.add_argument("--roles", type=int, default=1000, help="Roles per state")
+    parser.add_argument("--items", type=int, default=200, help="Bigrams per category")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [
+        make_bigrams_document("United States", f"S{state}", f"role {role}", args.items, rng)
+        for state in range(args.states) for role in range(args.roles)
+    ]
+
+    start = time.perf_counter()
+    index = RoleSimilarityIndex.build(documents)
+    build_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "role_vectors.npz")
+        index.save(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        RoleSimilarityIndex.load(path)
+        load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(args.queries):
+        state, role = f"S{rng.randrange(args.states)}", f"role {rng.randrange(args.roles)}"
+        start = time.perf_counter()
+        index.similar("United States", state, role, limit=10)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(f"{len(index.keys)} roles, {len(index.vocabulary)} features, {index.matrix.nnz} non-zeros")
+    print(f"build {build_seconds:.2f} s, index file {size / 1e6:.2f} MB, load {load_seconds * 1000:.0f} ms")
+    print(f"query p50 {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms ({args.roles} roles per state)")
+
+
+if __name__ == "__main__":
+    main()
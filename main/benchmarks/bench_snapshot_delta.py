@@ -0,0 +1,72 @@
+"""
+Compares a full snapshot rebuild with an incremental one after a partial data refresh.
+
+Builds a full snapshot of --roles synthetic keys, then changes the bigrams documents of
+--changed-percent of them and builds again, once in full and once as a delta. Reports the
+build time and file size of each, and the time a worker takes to load the full snapshot
+against applying the delta in place.
+
+Run from the repository root:
+    python -m main.benchmarks.bench_snapshot_delta [--roles N] [--changed-percent P]
+"""
+import argparse
+import copy
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.qualified_service import CONTENT_HASH_FIELD
+from main.services.snapshots import ResultSnapshot, SnapshotBuilder
+from main.utilities.jsonl import content_hash
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", type=int, default=2000, help="Keys in the dataset")
+    parser.add_argument("--items", type=int, default=100, help="Bigrams per category")
+    parser.add_argument("--changed-percent", type=float, default=1.0, help="Share of keys changed by the refresh")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [make_bigrams_document("United States", f"S{i % 50}", f"role {i}", args.items, rng)
+                 for i in range(args.roles)]
+    qualified = [{"country": "United States", "state": f"S{i % 50}", "role": f"role {i}", "place_of_work": "Remote"}
+                 for i in range(args.roles)]
+    refreshed = copy.deepcopy(documents)
+    for document in rng.sample(refreshed, int(args.roles * args.changed_percent / 100)):
+        document["tools"][0]["score"] += 1
+    # Stamped as the bulk loader does, so the builder reads the hashes instead of digesting every document
+    for document in documents + refreshed:
+        document[CONTENT_HASH_FIELD] = content_hash(document, exclude=("_id", CONTENT_HASH_FIELD))
+
+    incremental_dir, full_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        SnapshotBuilder(InMemoryQualifiedService(qualified, documents, version="v1"), incremental_dir).build()
+        refreshed_service = InMemoryQualifiedService(qualified, refreshed, version="v2")
+        delta = SnapshotBuilder(refreshed_service, incremental_dir).build()
+        full = SnapshotBuilder(refreshed_service, full_dir).build(full=True)
+        print(f"   full rebuild: {full.changed} keys, {full.seconds:.2f} s, {os.path.getsize(full.path) / 1e6:.2f} MB")
+        print(f"          delta: {delta.changed} keys, {delta.seconds:.2f} s, {os.path.getsize(delta.path) / 1e6:.3f} MB")
+
+        worker = ResultSnapshot()
+        _, load_seconds = timed(lambda: ResultSnapshot().apply(full.path))
+        worker.apply(os.path.join(incremental_dir, "snapshot-000001.jsonl.gz"))
+        _, apply_seconds = timed(lambda: worker.apply(delta.path))
+        print(f"worker full load: {load_seconds * 1000:.1f} ms, delta applied in place: {apply_seconds * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(incremental_dir)
+        shutil.rmtree(full_dir)
+
+
+if __name__ == "__main__":
+    main()
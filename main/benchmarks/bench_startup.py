@@ -0,0 +1,73 @@
+"""
+Measures API cold start.
+
+Reports, as medians over several runs:
+  - importing main.api.tech_mastery_api in a fresh interpreter
+  - building the app with create_app()
+  - running the lifespan startup
+  - building the services on first use (MongoClient connects in the background, so no server is needed)
+
+Run from the repository root:
+    python -m main.benchmarks.bench_startup [--runs N]
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "import main.api.tech_mastery_api; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_import(runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+async def time_startup(runs: int) -> dict:
+    from main.api.tech_mastery_api import create_app
+    from main.utilities.config import load_config
+
+    config = load_config()
+    create_samples, lifespan_samples, services_samples = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app = create_app(config)
+        create_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            lifespan_samples.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            app.state.services.data_processor
+            services_samples.append(time.perf_counter() - start)
+
+    return {
+        "create_app": statistics.median(create_samples),
+        "lifespan startup": statistics.median(lifespan_samples),
+        "services on first use": statistics.median(services_samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {"module import": time_import(args.runs)}
+    results.update(asyncio.run(time_startup(args.runs)))
+    for name, seconds in results.items():
+        print(f"{name:<24} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Measures the per-request cost of validating a /details/* request body.
+
+Compares, on a mix of valid and invalid states:
+  - enum scan: the former model without a validator, followed by the
+    `state not in StateEnumUSA.__members__.values()` check the handlers made
+  - validator: FullRequestData, whose state validator looks the state up in a frozenset
+  - validator + role: the same, plus the role lookup in the cached role index of the country
+
+Run from the repository root:
+    python -m main.benchmarks.bench_validation [--requests N] [--roles N]
+"""
+import argparse
+import time
+
+from pydantic import BaseModel, ValidationError
+
+from main.api.models import CountryEnum, FullRequestData, StateEnumCanada, StateEnumUSA
+from main.api.tech_mastery_api import check_role
+from main.services.role_index import CountryRoles
+
+
+class UncheckedRequestData(BaseModel):
+    country: CountryEnum
+    state: str
+    role: str
+
+
+def enum_scan(body: dict) -> bool:
+    request_data = UncheckedRequestData.model_validate(body)
+    if request_data.country == CountryEnum.usa and request_data.state not in StateEnumUSA.__members__.values():
+        return False
+    elif request_data.country == CountryEnum.canada and request_data.state not in StateEnumCanada.__members__.values():
+        return False
+    return True
+
+
+def validator(body: dict) -> bool:
+    try:
+        FullRequestData.model_validate(body)
+    except ValidationError:
+        return False
+    return True
+
+
+class StaticRoleIndex:
+    # A warm RoleIndex: get() returns the loaded roles of the country
+    def __init__(self, roles):
+        self.country_roles = CountryRoles("v1", roles, {})
+
+    def get(self, country):
+        return self.country_roles
+
+    def has_role(self, country, role):
+        role_set = self.get(country).role_set
+        return not role_set or role in role_set
+
+
+def make_validator_and_role(role_index):
+    def validate(body: dict) -> bool:
+        if not validator(body):
+            return False
+        check_role(role_index, body["country"], body["role"])
+        return True
+    return validate
+
+
+def measure(validate, bodies, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            validate(body)
+        best = min(best, time.perf_counter() - start)
+    return best / len(bodies) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000, help="Request bodies validated per pass")
+    parser.add_argument("--roles", type=int, default=5000, help="Roles of the country")
+    args = parser.parse_args()
+
+    roles = [f"role {i}" for i in range(args.roles)]
+    # WY and All are at the end of the enum, XX is invalid
+    states = ["NY", "WY", "All", "XX"]
+    bodies = [{"country": "United States", "state": states[i % len(states)], "role": roles[i % len(roles)]}
+              for i in range(args.requests)]
+
+    for name, validate in (("enum scan", enum_scan), ("validator", validator),
+                           ("validator + role", make_validator_and_role(StaticRoleIndex(roles)))):
+        print(f"{name:>17}: {measure(validate, bodies):.2f} us per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Synthetic 'bigrams' and 'qualified' documents shaped like the Machine Learning layer output.
+
+Writes a JSONL dataset for the in-memory backend (services.backend: "memory") when run directly:
+    python -m main.benchmarks.synthetic --out data [--roles N] [--postings N] [--items N]
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, Iterable, List
+
+VOCABULARY = {
+    "skills": ["data", "analysis", "machine", "learning", "cloud", "computing", "project", "management",
+               "software", "development", "statistical", "modeling", "problem", "solving", "communication"],
+    "tools": ["power", "bi", "microsoft", "excel", "azure", "google", "cloud", "tableau", "git", "docker",
+              "jira", "like", "kubernetes", "jenkins", "terraform", "looker"],
+    "libraries": ["spring", "boot", "apache", "kafka", "framework", "react", "js", "node", "pandas", "numpy",
+                  "tensorflow", "pytorch", "django", "angular", "spark"],
+    "languages": ["python", "java", "sql", "net", "c", "javascript", "typescript", "go", "scala", "data",
+                  "server", "r", "rust", "kotlin"],
+    "education": ["bachelor", "master", "phd", "degree", "jobrelated", "associate", "diploma"],
+}
+
+PLACES_OF_WORK = ["Hybrid", "On-Site", "Remote"]
+
+
+def make_bigrams_document(country: str, state: str, role: str, items_per_category: int,
+                          rng: random.Random = None) -> Dict:
+    """
+    Builds one 'bigrams' document with random bigrams and scores for every category.
+
+    Args:
+        country (str): The document's country.
+        state (str): The document's state.
+        role (str): The document's role.
+        items_per_category (int): Number of {bigram, score} entries per category.
+        rng (random.Random): Random source, for reproducible data.
+
+    Returns:
+        Dict: The document.
+    """
+    rng = rng or random.Random(0)
+    document = {"country": country, "state": state, "role": role}
+    for category, words in VOCABULARY.items():
+        document[category] = [
+            {"bigram": rng.sample(words, 2), "score": round(rng.uniform(0.01, 10), 4)}
+            for _ in range(items_per_category)
+        ]
+    return document
+
+
+def make_qualified_documents(country: str, state: str, role: str, count: int,
+                             rng: random.Random = None) -> List[Dict]:
+    """
+    Builds 'qualified' job posting documents for one (country, state, role).
+
+    Args:
+        country (str): The postings' country.
+        state (str): The postings' state.
+        role (str): The postings' role.
+        count (int): Number of postings.
+        rng (random.Random): Random source, for reproducible data.
+
+    Returns:
+        List[Dict]: The postings.
+    """
+    rng = rng or random.Random(0)
+    return [
+        {"country": country, "state": state, "role": role, "place_of_work": rng.choice(PLACES_OF_WORK)}
+        for _ in range(count)
+    ]
+
+
+def write_jsonl(path: str, documents: Iterable[Dict]) -> int:
+    """Writes documents to a JSONL file, one per line, and returns how many were written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for document in documents:
+            f.write(json.dumps(document))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def make_dataset(roles: int, postings_per_key: int, items_per_category: int, seed: int = 0):
+    """
+    Builds 'qualified' and 'bigrams' documents for a few states of both countries, including "All".
+
+    Args:
+        roles (int): Number of roles.
+        postings_per_key (int): Postings per (country, state, role).
+        items_per_category (int): Bigrams per category of each 'bigrams' document.
+        seed (int): Random seed.
+
+    Returns:
+        Tuple[List[Dict], List[Dict]]: The 'qualified' and 'bigrams' documents.
+    """
+    rng = random.Random(seed)
+    states = {"United States": ["All", "CA", "NY", "TX", "WA"], "Canada": ["All", "ON", "BC", "QC"]}
+    qualified, bigrams = [], []
+    for country, country_states in states.items():
+        for state in country_states:
+            for index in range(roles):
+                role = f"role {index}"
+                qualified.extend(make_qualified_documents(country, state, role, postings_per_key, rng))
+                bigrams.append(make_bigrams_document(country, state, role, items_per_category, rng))
+    return qualified, bigrams
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="data")
+    parser.add_argument("--roles", type=int, default=50)
+    parser.add_argument("--postings", type=int, default=20)
+    parser.add_argument("--items", type=int, default=200)
+    args = parser.parse_args()
+
+    qualified, bigrams = make_dataset(args.roles, args.postings, args.items)
+    os.makedirs(args.out, exist_ok=True)
+    for name, documents in (("qualified", qualified), ("bigrams", bigrams)):
+        path = os.path.join(args.out, f"{name}.jsonl")
+        print(f"Wrote {write_jsonl(path, documents)} documents to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Checks the "aggregation" bigram strategy against the Python DataProcessor on synthetic data.
+
+Writes synthetic 'bigrams' documents to a scratch database on the MongoDB server at MONGO_URI,
+processes every key with both strategies, reports any differences, and drops the scratch database.
+Both strategies rank by score, then token, so results are compared entry by entry.
+
+Run from the repository root:
+    MONGO_URI=mongodb://localhost:27017 python -m main.benchmarks.verify_bigram_aggregation [--keys 50]
+"""
+import argparse
+import os
+import random
+import time
+from main.benchmarks.synthetic import make_bigrams_document
+from main.mongodb.MongoHelper import MongoDBClient
+from main.services.data_processor import DataProcessor
+from main.services.qualified_service import QualifiedService
+
+SCRATCH_DATABASE = "tech_mastery_verify"
+
+
+def normalise(result) -> list:
+    """Returns a RankedTokens or RankedEducation result as the entries of the API response."""
+    return result.to_json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=50, help="number of synthetic (country, state, role) documents")
+    parser.add_argument("--items", type=int, default=500, help="bigrams per category")
+    args = parser.parse_args()
+
+    client = MongoDBClient(os.getenv("MONGO_URI"), SCRATCH_DATABASE, "bigrams", test_mode=False)
+    try:
+        rng = random.Random(1)
+        keys = [("United States", "CA", f"Role {i}") for i in range(args.keys)]
+        client.insert_documents([make_bigrams_document(*key, args.items, rng) for key in keys], "bigrams")
+
+        service = QualifiedService(client)
+        python_processor = DataProcessor(service, bigram_strategy="python")
+        aggregation_processor = DataProcessor(service, bigram_strategy="aggregation")
+
+        mismatches, timings = 0, {"python": 0.0, "aggregation": 0.0}
+        for key in keys:
+            results = {}
+            for name, processor in (("python", python_processor), ("aggregation", aggregation_processor)):
+                start = time.perf_counter()
+                results[name] = (processor.process_bigram_data(*key), processor.process_education_data(*key))
+                timings[name] += time.perf_counter() - start
+
+            (python_bigrams, python_education), (aggregation_bigrams, aggregation_education) = \
+                results["python"], results["aggregation"]
+            for category in python_bigrams:
+                if normalise(python_bigrams[category]) != normalise(aggregation_bigrams[category]):
+                    mismatches += 1
+                    print(f"MISMATCH {key} {category}:\n  python      {normalise(python_bigrams[category])}\n"
+                          f"  aggregation {normalise(aggregation_bigrams[category])}")
+            if normalise(python_education) != normalise(aggregation_education):
+                mismatches += 1
+                print(f"MISMATCH {key} education:\n  python      {normalise(python_education)}\n"
+                      f"  aggregation {normalise(aggregation_education)}")
+
+        print(f"{len(keys)} keys checked, {mismatches} mismatching categories")
+        for name, seconds in timings.items():
+            print(f"{name:<12} {seconds / len(keys) * 1000:8.2f} ms per key")
+    finally:
+        client.client.drop_database(SCRATCH_DATABASE)
+        client.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,32 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 import logging
-from typing import List, Dict
+import time
+from typing import List, Dict, Sequence
 
 
 class MongoDBClient:
-    def __init__(self, uri: str, database_name: str, collection_name: str, test_mode: bool):
+    def __init__(self, uri: str, database_name: str, collection_name: str, test_mode: bool, **client_options):
+        """
+        Connects to MongoDB and selects the working database and collection.
+
+        Args:
+            uri (str): MongoDB connection URI.
+            database_name (str): Database used when test_mode is False.
+            collection_name (str): Default collection for queries.
+            test_mode (bool): Use 'test_db' instead of database_name.
+            **client_options: Extra keyword arguments passed to MongoClient (e.g. maxPoolSize, minPoolSize).
+        """
         try:
-            self.client = MongoClient(uri)
+            self.client = MongoClient(uri, **client_options)
             self.test_mode = test_mode
             if test_mode:
                 self.db = self.client['test_db']  # Use test database if in test mode
             else:
                 self.db = self.client[database_name]  # Use production database
             self.collection = self.db[collection_name]
-            logging.info(f"Connected to MongoDB database: {self.db.name}, collection: {self.collection.name}")
+            logging.info("Connected to MongoDB database: %s, collection: %s", self.db.name, self.collection.name)
         except Exception as e:
-            logging.error(f"Error connecting to MongoDB: {e}")
+            logging.error("Error connecting to MongoDB: %s", e)
             raise
 
 
@@ -30,15 +41,15 @@ class MongoDBClient:
             # If a single string is passed, create a single field index
             if isinstance(index_fields, str):
                 self.collection.create_index(index_fields, unique=True)
-                logging.info(f"Index created on {index_fields}")
+                logging.info("Index created on %s", index_fields)
             # If a list of tuples is passed, create a compound index
             elif isinstance(index_fields, list) and all(isinstance(field, tuple) for field in index_fields):
                 self.collection.create_index(index_fields, unique=True)
-                logging.info(f"Compound index created on {index_fields}")
+                logging.info("Compound index created on %s", index_fields)
             else:
                 logging.error("Invalid index format. Provide a string or list of tuples for compound indexes.")
         except Exception as e:
-            logging.error(f"Error creating index: {e}")
+            logging.error("Error creating index: %s", e)
 
 
     def insert_document(self, doc: dict, col_name: str = None) -> bool:
@@ -46,10 +57,10 @@ class MongoDBClient:
         collection = self.collection if col_name is None else self.db[col_name]
         try:
             collection.insert_one(doc)
-            logging.info(f"Document inserted into {collection.name}")
+            logging.info("Document inserted into %s", collection.name)
             return True
         except Exception as e:
-            logging.error(f"Error inserting document: {e}")
+            logging.error("Error inserting document: %s", e)
             return False
 
     def update_document(self, query: dict, update: dict, upsert: bool = True, col_name: str = None):
@@ -57,9 +68,9 @@ class MongoDBClient:
         collection = self.collection if col_name is None else self.db[col_name]
         try:
             collection.update_one(query, {'$set': update}, upsert=upsert)
-            logging.debug(f"Document updated or inserted in {collection.name}")
+            logging.debug("Document updated or inserted in %s", collection.name)
         except Exception as e:
-            logging.error(f"Error updating document: {e}")
+            logging.error("Error updating document: %s", e)
 
     def insert_documents(self, docs: List[Dict], col_name: str) -> bool:
         """Performs bulk insertion of documents into the specified collection."""
@@ -67,49 +78,103 @@ class MongoDBClient:
         if docs:
             try:
                 collection.insert_many(docs)
-                logging.info(f"Inserted {len(docs)} documents into {collection.name} in bulk.")
+                logging.info("Inserted %d documents into %s in bulk.", len(docs), collection.name)
                 return True
             except Exception as e:
-                logging.error(f"Error during bulk insertion into {collection.name}: {e}")
+                logging.error("Error during bulk insertion into %s: %s", collection.name, e)
                 return False
         else:
             logging.info("No documents to insert.")
             return False
 
+    def bulk_upsert_documents(self, docs: List[Dict], key_fields: Sequence[str], col_name: str = None):
+        """
+        Upserts documents with a single unordered bulk_write, matching existing documents on key_fields.
+
+        Unordered writes let the server apply the operations in parallel and carry on past a failed one.
+        Errors are logged and raised, since a partial load must not go unnoticed.
+
+        Args:
+            docs (List[Dict]): Documents to write. Fields other than _id replace the stored values.
+            key_fields (Sequence[str]): Fields identifying a document, e.g. ("country", "state", "role").
+            col_name (str): Collection name. Defaults to the current collection.
+
+        Returns:
+            BulkWriteResult: The result of the write, or None when there is nothing to write.
+        """
+        collection = self.collection if col_name is None else self.db[col_name]
+        if not docs:
+            logging.info("No documents to upsert.")
+            return None
+        operations = [
+            UpdateOne({field: doc.get(field) for field in key_fields},
+                      {'$set': {field: value for field, value in doc.items() if field != '_id'}},
+                      upsert=True)
+            for doc in docs
+        ]
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            logging.debug("Upserted %d documents into %s in bulk", len(docs), collection.name)
+            return result
+        except Exception as e:
+            logging.error("Error during bulk upsert into %s: %s", collection.name, e)
+            raise
+
     def update_many_documents(self, query: dict, update: dict, col_name: str):
         """Updates multiple documents in the specified collection."""
         collection = self.db[col_name]
         try:
             result = collection.update_many(query, {'$set': update})
-            logging.info(f"Updated {result.modified_count} documents in {collection.name}")
+            logging.info("Updated %d documents in %s", result.modified_count, collection.name)
         except Exception as e:
-            logging.error(f"Error updating documents in {collection.name}: {e}")
+            logging.error("Error updating documents in %s: %s", collection.name, e)
 
     def query_documents(self, query: dict, projection: dict = None, col_name: str = None):
         """Queries documents from the collection."""
         collection = self.collection if col_name is None else self.db[col_name]
         try:
             results = collection.find(query, projection)
-            logging.debug(f"Queried documents from {collection.name}")
+            logging.debug("Queried documents from %s", collection.name)
             return results
         except Exception as e:
-            logging.error(f"Error querying documents: {e}")
+            logging.error("Error querying documents: %s", e)
             return None
 
+    def get_collection(self, col_name: str = None, codec_options=None):
+        """
+        Returns a collection handle without changing the client's current collection.
+
+        Unlike change_database_and_collection, this is safe to call from concurrent requests.
+
+        Args:
+            col_name (str): Collection name. Defaults to the current collection.
+            codec_options (CodecOptions): Optional decoding options, e.g. RawBSONDocument documents.
+        """
+        collection = self.collection if col_name is None else self.db[col_name]
+        if codec_options is not None:
+            collection = collection.with_options(codec_options=codec_options)
+        return collection
+
     def change_database_and_collection(self, new_database_name: str = None, new_collection_name: str = None) -> None:
         """Changes the database and/or collection to new specified names."""
         try:
             # If test_mode is False, allow changing the database
             if not self.test_mode and new_database_name:
                 self.db = self.client[new_database_name]
-                logging.info(f"Database changed to: {self.db.name}")
+                logging.debug("Database changed to: %s", new_database_name)
 
             # Change collection if new_collection_name is provided
             if new_collection_name:
                 self.collection = self.db[new_collection_name]
-                logging.info(f"Collection changed to: {self.collection.name}")
+                logging.debug("Collection changed to: %s", new_collection_name)
         except Exception as e:
-            logging.error(f"Error changing database and/or collection: {e}")
+            logging.error("Error changing database and/or collection: %s", e)
+
+    def ping(self) -> float:
+        """Sends a ping command to the server and returns its round-trip time in seconds. Errors are raised."""
+        start = time.perf_counter()
+        self.client.admin.command("ping")
+        return time.perf_counter() - start
 
     def close_connection(self) -> None:
         """Closes the connection to MongoDB."""
@@ -117,4 +182,4 @@ class MongoDBClient:
             self.client.close()
             logging.info("MongoDB connection closed.")
         except Exception as e:
-            logging.error(f"Error closing MongoDB connection: {e}")
\ No newline at end of file
+            logging.error("Error closing MongoDB connection: %s", e)
\ No newline at end of file
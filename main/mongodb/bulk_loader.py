@@ -0,0 +1,193 @@
+"""
+Loads refreshed 'bigrams' and 'qualified' data into MongoDB.
+
+Documents are streamed from JSONL in batches and written with unordered bulk upserts. With
+--shadow, they are written to a separate collection that then replaces the live one with a
+single rename, so the API never reads a half-updated collection. The data version stamp is
+bumped afterwards, which invalidates the API caches. Bigrams documents are stamped with a digest
+of their content, which the snapshot builder uses to find the keys that changed.
+
+Run from the repository root (MONGO_URI is read from the environment or .env):
+    python -m main.mongodb.bulk_loader bigrams data/bigrams.jsonl [--shadow] [--batch-size N]
+"""
+import argparse
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Sequence
+from dotenv import load_dotenv
+from main.mongodb.MongoHelper import MongoDBClient
+from main.services.qualified_service import CONTENT_HASH_FIELD, DATA_VERSION_ID, METADATA_COLLECTION
+from main.utilities.config import load_config
+from main.utilities.jsonl import batched, content_hash, iter_jsonl
+
+# Fields identifying a document of each collection; other collections are matched on _id
+KEY_FIELDS = {
+    "bigrams": ("country", "state", "role"),
+}
+
+# Collections whose documents get a CONTENT_HASH_FIELD. Unchanged documents keep the same digest,
+# so re-loading them leaves them unmodified
+HASHED_COLLECTIONS = ("bigrams",)
+
+SHADOW_SUFFIX = "__shadow"
+
+# Index options carried over to the shadow collection
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "collation")
+
+
+class LoadReport:
+    """Counts and timing of a load."""
+
+    def __init__(self, collection_name: str):
+        self.collection_name = collection_name
+        self.documents = 0
+        self.batches = 0
+        self.upserted = 0
+        self.modified = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self.version = None
+
+    @property
+    def throughput(self) -> float:
+        """Documents written per second."""
+        return self.documents / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.collection_name}: {self.documents} documents in {self.batches} batches, "
+                f"{self.upserted} inserted, {self.modified} modified, {self.skipped} skipped, "
+                f"{self.seconds:.2f} s ({self.throughput:.0f} docs/s), data version {self.version}")
+
+
+def new_data_version() -> str:
+    """Returns a unique, time-ordered data version."""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S.%fZ')}-{uuid.uuid4().hex[:8]}"
+
+
+class BulkLoader:
+    """Writes documents to a collection in batches of unordered bulk upserts."""
+
+    def __init__(self, mdb_client: MongoDBClient, batch_size: int = 1000):
+        """
+        Args:
+            mdb_client (MongoDBClient): Client of the target database.
+            batch_size (int): Documents per bulk_write.
+        """
+        self.mdb_client = mdb_client
+        self.batch_size = batch_size
+
+    def load(self, documents: Iterable[Dict], collection_name: str, key_fields: Sequence[str] = None,
+             shadow: bool = False) -> LoadReport:
+        """
+        Upserts documents into a collection and bumps the data version.
+
+        Args:
+            documents (Iterable[Dict]): Documents to load, read lazily.
+            collection_name (str): Target collection, e.g. "bigrams".
+            key_fields (Sequence[str]): Fields identifying a document. Defaults to KEY_FIELDS, or _id.
+            shadow (bool): Load into an empty shadow collection and rename it over the target, replacing
+                its content atomically. Otherwise documents are upserted into the live collection.
+
+        Returns:
+            LoadReport: Counts and throughput of the load.
+        """
+        key_fields = tuple(key_fields or KEY_FIELDS.get(collection_name, ("_id",)))
+        target = self.mdb_client.get_collection(collection_name)
+        write_name = collection_name + SHADOW_SUFFIX if shadow else collection_name
+        if shadow:
+            self.mdb_client.get_collection(write_name).drop()
+            self._copy_indexes(target, self.mdb_client.get_collection(write_name))
+        if key_fields != ("_id",):
+            self._ensure_key_index(self.mdb_client.get_collection(write_name), key_fields)
+
+        report = LoadReport(collection_name)
+        start = time.perf_counter()
+        for batch in batched(documents, self.batch_size):
+            valid = [doc for doc in batch if all(field in doc for field in key_fields)]
+            report.skipped += len(batch) - len(valid)
+            if collection_name in HASHED_COLLECTIONS:
+                for doc in valid:
+                    doc[CONTENT_HASH_FIELD] = content_hash(doc, exclude=("_id", CONTENT_HASH_FIELD))
+            result = self.mdb_client.bulk_upsert_documents(valid, key_fields, col_name=write_name)
+            if result is not None:
+                report.upserted += result.upserted_count
+                report.modified += result.modified_count
+            report.documents += len(valid)
+            report.batches += 1
+            logging.debug("Loaded batch %d into %s (%d documents so far)", report.batches, write_name, report.documents)
+
+        if shadow:
+            if report.documents == 0:
+                raise ValueError(f"No documents were loaded into {write_name}; keeping {collection_name} unchanged")
+            # renameCollection replaces the target in one step, readers see either the old or the new data
+            self.mdb_client.get_collection(write_name).rename(collection_name, dropTarget=True)
+
+        report.version = self.bump_data_version()
+        report.seconds = time.perf_counter() - start
+        if report.skipped:
+            logging.warning("Skipped %d documents of %s missing one of the key fields %s",
+                            report.skipped, collection_name, key_fields)
+        logging.info("Loaded %s", report)
+        return report
+
+    @staticmethod
+    def _ensure_key_index(collection, key_fields: Sequence[str]) -> None:
+        """Creates an index on key_fields unless one exists. Without it every upsert scans the collection."""
+        keys = [(field, 1) for field in key_fields]
+        if not any(list(info["key"]) == keys for info in collection.index_information().values()):
+            collection.create_index(keys)
+
+    @staticmethod
+    def _copy_indexes(source, destination) -> None:
+        """Creates the secondary indexes of source on destination."""
+        for name, info in source.index_information().items():
+            if name == "_id_":
+                continue
+            options = {option: info[option] for option in INDEX_OPTIONS if option in info}
+            destination.create_index(info["key"], name=name, **options)
+
+    def bump_data_version(self) -> str:
+        """Writes a new data version stamp, which the API caches and indexes pick up on their next check."""
+        version = new_data_version()
+        self.mdb_client.get_collection(METADATA_COLLECTION).update_one(
+            {"_id": DATA_VERSION_ID},
+            {"$set": {"version": version, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        return version
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("collection", help="Target collection, e.g. bigrams or qualified")
+    parser.add_argument("input", help="JSONL file, one document per line")
+    parser.add_argument("--shadow", action="store_true", help="Load into a shadow collection and swap it in")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--key", help="Comma-separated key fields, overriding the collection default")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_dotenv()
+    mongo_config = load_config()["mongo"]
+    mdb_client = MongoDBClient(
+        uri=os.getenv("MONGO_URI"),
+        database_name=mongo_config["database_name"],
+        collection_name=args.collection,
+        test_mode=mongo_config["test_mode"],
+    )
+    try:
+        report = BulkLoader(mdb_client, batch_size=args.batch_size).load(
+            iter_jsonl(args.input), args.collection,
+            key_fields=args.key.split(",") if args.key else None,
+            shadow=args.shadow,
+        )
+        print(report)
+    finally:
+        mdb_client.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import logging
+import threading
+from typing import Dict
+from pymongo import monitoring
+from main.utilities.metrics import REGISTRY
+
+POOL_CHECKED_OUT = REGISTRY.gauge("mongo_pool_checked_out", "MongoDB connections in use")
+POOL_WAITING = REGISTRY.gauge("mongo_pool_waiting", "Operations waiting for a MongoDB connection")
+POOL_CHECKOUT_FAILURES = REGISTRY.counter(
+    "mongo_pool_checkout_failures_total", "MongoDB connection checkouts that failed", ("reason",))
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks how saturated the MongoDB connection pool of this process is.
+
+    Registered on the MongoClient with event_listeners. pymongo calls it on the thread doing the
+    checkout, so the counters are kept under a lock. Pools of every server are added together.
+    """
+
+    def __init__(self, max_pool_size: int):
+        """
+        Args:
+            max_pool_size (int): maxPoolSize of the client, per server.
+        """
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._checked_out = 0
+        self._waiting = 0
+        self._checkout_failures = 0
+        self._max_wait = 0.0
+
+    def snapshot(self) -> Dict:
+        """
+        Returns the pool stats, and restarts the measure of the longest checkout wait.
+
+        Returns:
+            Dict: "checked_out", "waiting", "max_pool_size", "checkout_failures" since the client
+            was created, and "max_wait_ms", the longest checkout since the previous snapshot.
+        """
+        with self._lock:
+            stats = {
+                "checked_out": self._checked_out,
+                "waiting": self._waiting,
+                "max_pool_size": self.max_pool_size,
+                "checkout_failures": self._checkout_failures,
+                "max_wait_ms": round(self._max_wait * 1000, 1),
+            }
+            self._max_wait = 0.0
+        return stats
+
+    def connection_check_out_started(self, event) -> None:
+        with self._lock:
+            self._waiting += 1
+            POOL_WAITING.set(self._waiting)
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            self._waiting -= 1
+            self._checked_out += 1
+            if event.duration is not None:
+                self._max_wait = max(self._max_wait, event.duration)
+            POOL_WAITING.set(self._waiting)
+            POOL_CHECKED_OUT.set(self._checked_out)
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self._waiting -= 1
+            self._checkout_failures += 1
+            POOL_WAITING.set(self._waiting)
+        POOL_CHECKOUT_FAILURES.inc(reason=str(event.reason))
+        logging.warning("MongoDB connection checkout failed on %s: %s", event.address, event.reason)
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self._checked_out -= 1
+            POOL_CHECKED_OUT.set(self._checked_out)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        pass
@@ -0,0 +1,63 @@
+from typing import Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
+from main.services.qualified_service import BIGRAM_CATEGORIES, BigramColumns
+
+
+class QualifiedBackend(Protocol):
+    """
+    Read interface of the 'qualified' and 'bigrams' data used by the processors and the role index.
+
+    QualifiedService implements it on top of MongoDB and InMemoryQualifiedService on top of JSONL
+    exports. Read methods return empty results for a key with no data and raise
+    DataUnavailableError when the data cannot be read.
+    """
+
+    def get_place_of_work_count_grouped_by_role_and_state(self, country: str, state: str, role: str) -> List[Dict]:
+        ...
+
+    def get_bigram_details_by_country_state_role(self, country: str, state: str, role: str) -> Dict[str, List[Dict]]:
+        ...
+
+    def get_bigram_columns_by_country_state_role(
+            self, country: str, state: str, role: str, categories: Sequence[str] = BIGRAM_CATEGORIES
+    ) -> Dict[str, BigramColumns]:
+        ...
+
+    def get_bigram_columns_raw_by_country_state_role(
+            self, country: str, state: str, role: str, categories: Sequence[str] = BIGRAM_CATEGORIES
+    ) -> Optional[bytes]:
+        ...
+
+    def iter_bigram_columns(
+            self, country: Optional[str] = None, categories: Sequence[str] = (*BIGRAM_CATEGORIES, "education"),
+            batch_size: int = 1000, keys: Optional[Sequence[Tuple[str, str, str]]] = None
+    ) -> Iterator[Tuple[Tuple[str, str, str], Dict[str, BigramColumns]]]:
+        ...
+
+    def get_bigram_content_hashes(self, country: Optional[str] = None) -> Dict[Tuple[str, str, str], Optional[str]]:
+        ...
+
+    def get_place_of_work_counts(self, country: Optional[str] = None) -> Dict[Tuple[str, str, str], Dict[str, int]]:
+        ...
+
+    def get_top_bigram_tokens_by_country_state_role(
+            self, country: str, state: str, role: str, top_k: Dict[str, int]
+    ) -> Dict[str, Dict]:
+        ...
+
+    def get_education_data_by_country_state_role(self, country: str, state: str, role: str) -> List[Dict]:
+        ...
+
+    def get_freq_grouped_by_state(self, country: str) -> List[Dict]:
+        ...
+
+    def get_role_counts_by_state_and_place_of_work(self, country: str, role: str) -> List[Dict]:
+        ...
+
+    def get_roles_by_country_and_state(self, country: str) -> List[str]:
+        ...
+
+    def get_role_posting_counts(self, country: str) -> Dict[str, int]:
+        ...
+
+    def get_data_version(self) -> str:
+        ...
@@ -0,0 +1,143 @@
+"""
+MongoDB aggregation expressions that mirror the DataProcessor accumulate_* rules.
+
+Each token expression turns the bigram bound to $$b into the array of tokens the matching
+Python function would add the bigram's score to. Keep both sides in sync when the rules change.
+"""
+from typing import Dict, List
+from main.services.token_rules import IGNORED_EDUCATION_1GRAMS, IGNORED_LANGUAGE_1GRAMS, IGNORED_TOOL_1GRAMS
+
+BIGRAM = "$$b"
+FIRST_WORD = {"$arrayElemAt": [BIGRAM, 0]}
+SECOND_WORD = {"$arrayElemAt": [BIGRAM, 1]}
+
+
+def _lower(expression) -> Dict:
+    return {"$toLower": expression}
+
+
+def _contains(word: str) -> Dict:
+    return {"$in": [word, BIGRAM]}
+
+
+def _partner_of(word: str) -> Dict:
+    # bigram[1] if bigram[0].lower() == word else bigram[0]
+    return {"$cond": [{"$eq": [_lower(FIRST_WORD), word]}, SECOND_WORD, FIRST_WORD]}
+
+
+def _drop_nulls(expression) -> Dict:
+    return {"$filter": {"input": expression, "as": "t", "cond": {"$ne": ["$$t", None]}}}
+
+
+def tool_tokens() -> Dict:
+    """Mirrors accumulate_tool_scores."""
+    word = _lower("$$w")
+    return {"$cond": [
+        {"$and": [_contains("power"), _contains("bi")]},
+        ["powerbi"],
+        _drop_nulls({"$map": {"input": BIGRAM, "as": "w", "in": {"$switch": {
+            "branches": [
+                {"case": {"$in": [word, sorted(IGNORED_TOOL_1GRAMS)]}, "then": None},
+                {"case": {"$eq": [word, "microsoft"]},
+                 "then": _lower({"$concat": ["microsoft ", _partner_of("microsoft")]})},
+                {"case": {"$eq": [word, "google"]},
+                 "then": _lower({"$concat": ["google ", _partner_of("google")]})},
+            ],
+            "default": word,
+        }}}}),
+    ]}
+
+
+def skill_tokens() -> List[Dict]:
+    """Mirrors accumulate_skill_scores (the bigram joined with a space)."""
+    return [{"$reduce": {
+        "input": {"$slice": [BIGRAM, 1, {"$max": [{"$size": BIGRAM}, 1]}]},
+        "initialValue": {"$ifNull": [FIRST_WORD, ""]},
+        "in": {"$concat": ["$$value", " ", "$$this"]},
+    }}]
+
+
+def language_tokens() -> Dict:
+    """Mirrors accumulate_language_scores."""
+    word = _lower("$$w")
+    return _drop_nulls({"$map": {"input": BIGRAM, "as": "w", "in": {"$cond": [
+        {"$and": [{"$ne": [{"$ifNull": ["$$w", ""]}, ""]}, {"$not": [{"$in": [word, sorted(IGNORED_LANGUAGE_1GRAMS)]}]}]},
+        {"$cond": [{"$eq": [word, "net"]}, ".net", word]},
+        None,
+    ]}}})
+
+
+def library_tokens() -> Dict:
+    """Mirrors accumulate_library_scores."""
+    return {"$switch": {
+        "branches": [
+            {"case": {"$and": [_contains("spring"), _contains("boot")]}, "then": ["spring boot"]},
+            {"case": {"$and": [_contains("apache"), _contains("kafka")]}, "then": ["apache kafka"]},
+            {"case": _contains("framework"),
+             "then": [_lower({"$concat": [_partner_of("framework"), " framework"]})]},
+            {"case": _contains("js"),
+             "then": [_lower({"$concat": [_partner_of("js"), ".js"]})]},
+        ],
+        "default": {"$map": {"input": BIGRAM, "as": "w", "in": _lower("$$w")}},
+    }}
+
+
+def education_tokens() -> Dict:
+    """Mirrors accumulate_education_scores."""
+    return {"$filter": {
+        "input": {"$map": {"input": BIGRAM, "as": "w", "in": _lower("$$w")}},
+        "as": "t",
+        "cond": {"$not": [{"$in": ["$$t", sorted(IGNORED_EDUCATION_1GRAMS)]}]},
+    }}
+
+
+TOKEN_EXPRESSIONS = {
+    "skills": skill_tokens,
+    "tools": tool_tokens,
+    "libraries": library_tokens,
+    "languages": language_tokens,
+    "education": education_tokens,
+}
+
+
+def top_tokens_facet(category: str, top_k: int) -> List[Dict]:
+    """
+    Builds the $facet branch that scores one category and keeps its top_k tokens.
+
+    The branch yields a single {total, items} document, where total is the sum over all
+    tokens (for percentages) and items are the top_k {token, score} entries, highest first.
+    """
+    bigram = {"$ifNull": [f"${category}.bigram", []]}
+    return [
+        {"$unwind": f"${category}"},
+        {"$project": {
+            "_id": 0,
+            "score": {"$ifNull": [f"${category}.score", 0]},
+            "tokens": {"$let": {
+                "vars": {"b": {"$cond": [{"$isArray": bigram}, bigram, []]}},
+                "in": TOKEN_EXPRESSIONS[category](),
+            }},
+        }},
+        {"$unwind": "$tokens"},
+        {"$group": {"_id": "$tokens", "score": {"$sum": "$score"}}},
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$group": {"_id": None, "total": {"$sum": "$score"}, "items": {"$push": {"token": "$_id", "score": "$score"}}}},
+        {"$project": {"_id": 0, "total": 1, "items": {"$slice": ["$items", top_k]}}},
+    ]
+
+
+def top_tokens_pipeline(country: str, state: str, role: str, top_k: Dict[str, int]) -> List[Dict]:
+    """
+    Builds the aggregation that computes the top tokens of several categories in one round trip.
+
+    Args:
+        country (str): The country to filter by.
+        state (str): The state to filter by.
+        role (str): The role to filter by.
+        top_k (Dict[str, int]): Number of tokens to keep per category.
+    """
+    return [
+        {"$match": {"country": country, "state": state, "role": role}},
+        {"$limit": 1},
+        {"$facet": {category: top_tokens_facet(category, k) for category, k in top_k.items()}},
+    ]
@@ -1,16 +1,329 @@
 import logging
-from typing import Dict, List
-from main.services.qualified_service import QualifiedService
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from main.services.qualified_service import QualifiedService, BIGRAM_CATEGORIES, BigramColumns, decode_bigram_columns
+from main.services.rankings import RankedScores, RankingStore
+from main.services.records import RankedEducation, RankedTokens
+from main.services.token_rules import IGNORED_EDUCATION_1GRAMS, IGNORED_LANGUAGE_1GRAMS, IGNORED_TOOL_1GRAMS
+
+# Output field name and number of entries returned for each bigram category
+CATEGORY_KEYS = {"skills": "skill", "tools": "tool", "libraries": "library", "languages": "language"}
+TOP_K = {"skills": 5, "tools": 5, "libraries": 5, "languages": 5, "education": 3}
+
+# Places of work reported by the workplace endpoints
+PLACE_OF_WORK_LABELS = ["Hybrid", "On-Site", "Remote"]
+
+
+def accumulate_tool_scores(bigrams: Sequence[List[str]], scores: Sequence[float]) -> Dict[str, float]:
+    """
+    Extracts tool 1-grams from bigrams and accumulates their scores. Special handling for
+    'power' + 'bi' -> 'powerbi', Microsoft-related combinations, 'google' partnering with its
+    bigram partner, and ignoring specific 1-grams.
+
+    Args:
+        bigrams (Sequence[List[str]]): The bigram word lists.
+        scores (Sequence[float]): The score of each bigram, index aligned with bigrams.
+
+    Returns:
+        Dict[str, float]: Accumulated score per tool.
+    """
+    tools_scores = {}
+    for bigram, score in zip(bigrams, scores):
+        # Check for special case: "power" + "bi" -> "powerbi"
+        if "power" in bigram and "bi" in bigram:
+            tools_scores["powerbi"] = tools_scores.get("powerbi", 0) + score
+        else:
+            for word in bigram:
+                word = word.lower()
+                if word in IGNORED_TOOL_1GRAMS:
+                    # Skip words that are in the ignored set
+                    continue
+                elif word == "microsoft":
+                    # Combine 'Microsoft' with the other word in the bigram
+                    word = f"microsoft {bigram[1] if bigram[0].lower() == 'microsoft' else bigram[0]}".lower()
+                elif word == "google":
+                    # Combine 'Google' with its partner word in the bigram
+                    word = f"google {bigram[1] if bigram[0].lower() == 'google' else bigram[0]}".lower()
+                tools_scores[word] = tools_scores.get(word, 0) + score
+    return tools_scores
+
+
+def accumulate_skill_scores(bigrams: Sequence[List[str]], scores: Sequence[float]) -> Dict[str, float]:
+    """
+    Accumulates scores per skill, where a skill is the bigram joined with a space.
+
+    Args:
+        bigrams (Sequence[List[str]]): The bigram word lists.
+        scores (Sequence[float]): The score of each bigram, index aligned with bigrams.
+
+    Returns:
+        Dict[str, float]: Accumulated score per skill.
+    """
+    skills_scores = {}
+    for bigram, score in zip(bigrams, scores):
+        skill = " ".join(bigram)  # Join bigram with a space
+        skills_scores[skill] = skills_scores.get(skill, 0) + score
+    return skills_scores
+
+
+def accumulate_language_scores(bigrams: Sequence[List[str]], scores: Sequence[float]) -> Dict[str, float]:
+    """
+    Extracts language 1-grams from bigrams and accumulates their scores.
+    Ignores specific 1-grams and handles renaming "net" to ".net".
+
+    Args:
+        bigrams (Sequence[List[str]]): The bigram word lists.
+        scores (Sequence[float]): The score of each bigram, index aligned with bigrams.
+
+    Returns:
+        Dict[str, float]: Accumulated score per language.
+    """
+    languages_scores = {}
+    for bigram, score in zip(bigrams, scores):
+        # Ensure 'bigram' is not None and is a list before processing
+        if not bigram or not isinstance(bigram, list):
+            continue
+
+        for word in bigram:
+            if word and word.lower() not in IGNORED_LANGUAGE_1GRAMS:  # Check if the word is not None and not ignored
+                word = word.lower()
+                # Rename "net" to ".net"
+                if word == "net":
+                    word = ".net"
+                languages_scores[word] = languages_scores.get(word, 0) + score
+    return languages_scores
+
+
+def accumulate_library_scores(bigrams: Sequence[List[str]], scores: Sequence[float]) -> Dict[str, float]:
+    """
+    Extracts library 1-grams from bigrams and accumulates their scores.
+    Special handling for "spring" + "boot" -> "spring boot", "apache" + "kafka" -> "apache kafka",
+    combining "framework" with its bigram partner, and combining "js" with its bigram partner.
+
+    Args:
+        bigrams (Sequence[List[str]]): The bigram word lists.
+        scores (Sequence[float]): The score of each bigram, index aligned with bigrams.
+
+    Returns:
+        Dict[str, float]: Accumulated score per library.
+    """
+    libraries_scores = {}
+    for bigram, score in zip(bigrams, scores):
+        # Check for special cases: "spring" + "boot" -> "spring boot" and "apache" + "kafka" -> "apache kafka"
+        if "spring" in bigram and "boot" in bigram:
+            libraries_scores["spring boot"] = libraries_scores.get("spring boot", 0) + score
+        elif "apache" in bigram and "kafka" in bigram:
+            libraries_scores["apache kafka"] = libraries_scores.get("apache kafka", 0) + score
+        elif "framework" in bigram:
+            # Combine "framework" with its bigram partner
+            combined_library = f"{bigram[1] if bigram[0].lower() == 'framework' else bigram[0]} framework".lower()
+            libraries_scores[combined_library] = libraries_scores.get(combined_library, 0) + score
+        elif "js" in bigram:
+            # Combine "js" with its bigram partner to form "partner.js"
+            combined_library = f"{bigram[1] if bigram[0].lower() == 'js' else bigram[0]}.js".lower()
+            libraries_scores[combined_library] = libraries_scores.get(combined_library, 0) + score
+        else:
+            for word in bigram:
+                libraries_scores[word.lower()] = libraries_scores.get(word.lower(), 0) + score
+    return libraries_scores
+
+
+def accumulate_education_scores(bigrams: Sequence[List[str]], scores: Sequence[float]) -> Dict[str, float]:
+    """
+    Groups the 1-grams from education bigrams (ignoring specific words) and sums their scores.
+
+    Args:
+        bigrams (Sequence[List[str]]): The bigram word lists.
+        scores (Sequence[float]): The score of each bigram, index aligned with bigrams.
+
+    Returns:
+        Dict[str, float]: Accumulated score per lower-cased 1-gram.
+    """
+    education_scores = {}
+    for bigram, score in zip(bigrams, scores):
+        for word in bigram:
+            word = word.lower()
+            if word not in IGNORED_EDUCATION_1GRAMS:  # Ignore words in the set
+                education_scores[word] = education_scores.get(word, 0) + score
+    return education_scores
+
+
+# Accumulation of the scores of each category of a bigrams document
+ACCUMULATORS = {
+    "skills": accumulate_skill_scores,
+    "tools": accumulate_tool_scores,
+    "libraries": accumulate_library_scores,
+    "languages": accumulate_language_scores,
+    "education": accumulate_education_scores,
+}
+
+
+def top_tokens(token_scores: Dict[str, float], limit: int,
+               total_score: float = None) -> Tuple[List[str], List[float]]:
+    """
+    Converts accumulated scores to percentages of the total and selects the highest ones.
+
+    Entries are ranked by score, highest first, ties by token: the order of the "aggregation"
+    strategy's pipeline, so both strategies pick the same entries at the cut-off.
+
+    Args:
+        token_scores (Dict[str, float]): Accumulated score per token.
+        limit (int): Number of entries to return.
+        total_score (float): Total to take percentages of, when token_scores is already truncated.
+
+    Returns:
+        Tuple[List[str], List[float]]: The tokens, highest first, and their percentages.
+    """
+    # Calculate total score and convert to percentages
+    if total_score is None:
+        total_score = sum(token_scores.values())
+    percentages = {
+        token: round((score / total_score * 100), 2) if total_score > 0 else 0
+        for token, score in token_scores.items()
+    }
+
+    tokens = sorted(token_scores, key=lambda token: (-token_scores[token], token))[:limit]
+    return tokens, [percentages[token] for token in tokens]
+
+
+def rank_scores(token_scores: Dict[str, float], key: str, limit: int, total_score: float = None) -> RankedTokens:
+    """
+    Returns the highest scoring tokens with their percentages of the total.
+
+    Args:
+        token_scores (Dict[str, float]): Accumulated score per token.
+        key (str): Name of the token field in the output, e.g. "tool".
+        limit (int): Number of entries to return.
+        total_score (float): Total to take percentages of, when token_scores is already truncated.
+
+    Returns:
+        RankedTokens: Serialized as entries of the form {key: token, "percentage": value}, highest first.
+    """
+    return RankedTokens(key, *top_tokens(token_scores, limit, total_score))
+
+
+def rank_education_scores(education_scores: Dict[str, float], limit: int = 3,
+                          total_score: float = None) -> RankedEducation:
+    """
+    Returns the highest scoring education 1-grams with their percentages of the total.
+
+    Args:
+        education_scores (Dict[str, float]): Accumulated score per lower-cased 1-gram.
+        limit (int): Number of entries to return.
+        total_score (float): Total to take percentages of, when education_scores is already truncated.
+
+    Returns:
+        RankedEducation: Serialized as entries with 'id', 'label' (capitalized 1-gram) and 'value', highest first.
+    """
+    return RankedEducation(*top_tokens(education_scores, limit, total_score))
+
+
+def place_of_work_percentages(place_of_work_counts: Dict[str, int]) -> List[Dict]:
+    """
+    Converts place of work counts into percentages of 'Hybrid', 'On-Site' and 'Remote'.
+    1 is added to each category to balance the data, so missing categories never show as 0%.
+
+    Args:
+        place_of_work_counts (Dict[str, int]): Number of postings per place of work.
+
+    Returns:
+        List[Dict]: The 'id', 'label' and 'value' (percentage) of each place of work.
+    """
+    # Initialize counts, adding 1 to each category to balance the data
+    balanced_counts = {label: place_of_work_counts.get(label, 0) + 1 for label in PLACE_OF_WORK_LABELS}
+
+    # Calculate the total count after adding 1 to each category
+    total_count = sum(balanced_counts.values())
+
+    # Process the data to form percentages and match the desired format
+    processed_data = []
+    for label in PLACE_OF_WORK_LABELS:
+        count = balanced_counts[label]
+        percentage = (count / total_count * 100) if total_count > 0 else 0
+        processed_data.append({
+            "id": label,
+            "label": label,
+            "value": round(percentage, 2)  # Round to 2 decimal places
+        })
+    return processed_data
+
+
+def score_bigram_columns(columns: Dict[str, BigramColumns]) -> Dict[str, RankedTokens]:
+    """
+    Scores and ranks the skills, tools, libraries and languages of a bigrams document.
+
+    Args:
+        columns (Dict[str, BigramColumns]): (bigrams, scores) per category.
+
+    Returns:
+        Dict[str, RankedTokens]: The top entries of each category.
+    """
+    return {
+        "skills": rank_scores(accumulate_skill_scores(*columns["skills"]), "skill", 5),
+        "tools": rank_scores(accumulate_tool_scores(*columns["tools"]), "tool", 5),
+        "libraries": rank_scores(accumulate_library_scores(*columns["libraries"]), "library", 5),
+        "languages": rank_scores(accumulate_language_scores(*columns["languages"]), "language", 5)
+    }
+
+
+def score_bigram_document(raw: Optional[bytes]) -> Dict[str, RankedTokens]:
+    """Decodes and scores a raw bigrams document. Module level so it can run in a worker process."""
+    return score_bigram_columns(decode_bigram_columns(raw, BIGRAM_CATEGORIES))
+
+
+def score_education_document(raw: Optional[bytes]) -> RankedEducation:
+    """Decodes and ranks the education column of a raw bigrams document, in any process."""
+    bigrams, scores = decode_bigram_columns(raw, ("education",))["education"]
+    return rank_education_scores(accumulate_education_scores(bigrams, scores), 3)
+
+
+def page_summary(rankings: Dict[str, RankedScores], offset: int, top_k: Optional[int]) -> Dict:
+    """
+    Describes a page of rankings.
+
+    Args:
+        rankings (Dict[str, RankedScores]): Ranking per category.
+        offset (int): Rank of the first entry of the page.
+        top_k (int): Entries per category, the usual number of each category when None.
+
+    Returns:
+        Dict: "offset", and per category the total number of entries and the percentage of the
+        total score held by the entries ranked up to the end of the page.
+    """
+    return {
+        "offset": offset,
+        "total": {category: len(ranked) for category, ranked in rankings.items()},
+        "covered_percentage": {
+            category: ranked.covered_percentage(offset + (top_k or TOP_K[category]))
+            for category, ranked in rankings.items()
+        },
+    }
+
 
 class DataProcessor:
-    def __init__(self, qualified_service: QualifiedService):
+    # Where bigram scores are accumulated and ranked: in Python, or inside MongoDB with a $facet aggregation
+    BIGRAM_STRATEGIES = ("python", "aggregation")
+
+    def __init__(self, qualified_service: QualifiedService, bigram_strategy: str = "python", offloader=None,
+                 ranking_store: RankingStore = None):
         """
         Initializes the DataProcessor with an instance of QualifiedService.
 
         Args:
-            qualified_service (QualifiedService): An instance of QualifiedService to fetch and process data.
+            qualified_service (QualifiedService): The data source, a QualifiedService or any other
+                QualifiedBackend such as InMemoryQualifiedService.
+            bigram_strategy (str): "python" to score bigrams here, or "aggregation" to have MongoDB
+                return only the top tokens of each category.
+            offloader (ScoringOffloader): With the "python" strategy, scores documents above its size
+                threshold in a worker process instead of holding the GIL of this one.
+            ranking_store (RankingStore): Keeps the sorted scores that paged requests are served from.
+                A store without a version watcher is created when omitted.
         """
+        if bigram_strategy not in self.BIGRAM_STRATEGIES:
+            raise ValueError(f"Unknown bigram strategy: {bigram_strategy}")
         self.qualified_service = qualified_service
+        self.bigram_strategy = bigram_strategy
+        self.offloader = offloader
+        self.ranking_store = ranking_store if ranking_store is not None else RankingStore()
 
     def process_place_of_work_data(self, country: str, state: str, role: str) -> List[Dict]:
         """
@@ -32,36 +345,15 @@ class DataProcessor:
 
         # Convert the raw data to a dictionary for easier access
         place_of_work_counts = {entry["_id"]: entry["count"] for entry in raw_data}
+        processed_data = place_of_work_percentages(place_of_work_counts)
 
-        # Define the desired place of work labels
-        desired_labels = ["Hybrid", "On-Site", "Remote"]
-
-        # Initialize counts, adding 1 to each category to balance the data
-        balanced_counts = {label: place_of_work_counts.get(label, 0) + 1 for label in desired_labels}
-
-        # Calculate the total count after adding 1 to each category
-        total_count = sum(balanced_counts.values())
-
-        # Process the data to form percentages and match the desired format
-        processed_data = []
-        for label in desired_labels:
-            count = balanced_counts[label]
-            percentage = (count / total_count * 100) if total_count > 0 else 0
-            processed_data.append({
-                "id": label,
-                "label": label,
-                "value": round(percentage, 2)  # Round to 2 decimal places
-            })
-
-        logging.info(f"Processed place of work data for country: {country}, state: {state}, role: {role}")
+        logging.info("Processed place of work data for country: %s, state: %s, role: %s", country, state, role)
         return processed_data
 
-    def process_tools_data(self, country: str, state: str, role: str) -> List[Dict]:
+    def process_tools_data(self, country: str, state: str, role: str) -> RankedTokens:
         """
         Processes the tools data by extracting 1-grams from bigrams, accumulating scores,
-        and calculating percentages. Special handling for 'power' + 'bi' -> 'powerbi',
-        Microsoft-related combinations, 'google' partnering with its bigram partner,
-        and ignoring specific 1-grams.
+        and calculating percentages. See accumulate_tool_scores for the special cases.
 
         Args:
             country (str): The country to filter by.
@@ -69,50 +361,13 @@ class DataProcessor:
             role (str): The role to filter by.
 
         Returns:
-            List[Dict]: A list of tools with their percentages.
+            RankedTokens: The top tools with their percentages.
         """
-        raw_tools_data = self.qualified_service.get_bigram_details_by_country_state_role(country, state, role).get(
-            'tools', [])
-        tools_scores = {}
-
-        # Define 1-grams to ignore
-        ignored_1grams = {"like"}  # Add more words to ignore as needed
-
-        for item in raw_tools_data:
-            bigram = item['bigram']
-            score = item['score']
+        bigrams, scores = self.qualified_service.get_bigram_columns_by_country_state_role(
+            country, state, role, categories=("tools",))["tools"]
+        return rank_scores(accumulate_tool_scores(bigrams, scores), "tool", 5)
 
-            # Check for special case: "power" + "bi" -> "powerbi"
-            if "power" in bigram and "bi" in bigram:
-                tools_scores["powerbi"] = tools_scores.get("powerbi", 0) + score
-            else:
-                for word in bigram:
-                    if word.lower() in ignored_1grams:
-                        # Skip words that are in the ignored set
-                        continue
-                    elif word.lower() == "microsoft":
-                        # Combine 'Microsoft' with the other word in the bigram
-                        combined_tool = f"microsoft {bigram[1] if bigram[0].lower() == 'microsoft' else bigram[0]}"
-                        tools_scores[combined_tool.lower()] = tools_scores.get(combined_tool.lower(), 0) + score
-                    elif word.lower() == "google":
-                        # Combine 'Google' with its partner word in the bigram
-                        combined_tool = f"google {bigram[1] if bigram[0].lower() == 'google' else bigram[0]}"
-                        tools_scores[combined_tool.lower()] = tools_scores.get(combined_tool.lower(), 0) + score
-                    else:
-                        tools_scores[word.lower()] = tools_scores.get(word.lower(), 0) + score
-
-        # Calculate total score and convert to percentages
-        total_score = sum(tools_scores.values())
-        tools_data = [
-            {"tool": tool, "percentage": round((score / total_score * 100), 2) if total_score > 0 else 0}
-            for tool, score in tools_scores.items()
-        ]
-
-        # Sort and return the top 5
-        tools_data.sort(key=lambda x: x["percentage"], reverse=True)
-        return tools_data[:5]
-
-    def process_skills_data(self, country: str, state: str, role: str) -> List[Dict]:
+    def process_skills_data(self, country: str, state: str, role: str) -> RankedTokens:
         """
         Processes the skills data by extracting bigrams, accumulating scores, and calculating percentages.
 
@@ -122,28 +377,13 @@ class DataProcessor:
             role (str): The role to filter by.
 
         Returns:
-            List[Dict]: A list of skills with their percentages.
+            RankedTokens: The top skills with their percentages.
         """
-        raw_skills_data = self.qualified_service.get_bigram_details_by_country_state_role(country, state, role).get('skills', [])
-        skills_scores = {}
-
-        for item in raw_skills_data:
-            bigram = " ".join(item['bigram'])  # Join bigram with a space
-            score = item['score']
-            skills_scores[bigram] = skills_scores.get(bigram, 0) + score
-
-        # Calculate total score and convert to percentages
-        total_score = sum(skills_scores.values())
-        skills_data = [
-            {"skill": skill, "percentage": round((score / total_score * 100), 2) if total_score > 0 else 0}
-            for skill, score in skills_scores.items()
-        ]
-
-        # Sort and return the top 5
-        skills_data.sort(key=lambda x: x["percentage"], reverse=True)
-        return skills_data[:5]
-
-    def process_languages_data(self, country: str, state: str, role: str) -> List[Dict]:
+        bigrams, scores = self.qualified_service.get_bigram_columns_by_country_state_role(
+            country, state, role, categories=("skills",))["skills"]
+        return rank_scores(accumulate_skill_scores(bigrams, scores), "skill", 5)
+
+    def process_languages_data(self, country: str, state: str, role: str) -> RankedTokens:
         """
         Processes the languages data by extracting 1-grams, accumulating scores, and calculating percentages.
         Ignores specific 1-grams and handles renaming "net" to ".net".
@@ -154,46 +394,16 @@ class DataProcessor:
             role (str): The role to filter by.
 
         Returns:
-            List[Dict]: A list of languages with their percentages.
+            RankedTokens: The top languages with their percentages.
         """
-        raw_languages_data = self.qualified_service.get_bigram_details_by_country_state_role(country, state, role).get(
-            'languages', []
-        )
-        languages_scores = {}
-
-        # Define 1-grams to ignore
-        ignored_1grams = {"data", "server"}  # Add any other 1-grams you want to ignore
+        bigrams, scores = self.qualified_service.get_bigram_columns_by_country_state_role(
+            country, state, role, categories=("languages",))["languages"]
+        return rank_scores(accumulate_language_scores(bigrams, scores), "language", 5)
 
-        for item in raw_languages_data:
-            # Ensure 'bigram' is not None and is a list before processing
-            bigram = item.get('bigram', [])
-            if not bigram or not isinstance(bigram, list):
-                continue
-
-            score = item.get('score', 0)
-            for word in bigram:
-                if word and word.lower() not in ignored_1grams:  # Check if the word is not None and not in the ignored list
-                    # Rename "net" to ".net"
-                    if word.lower() == "net":
-                        word = ".net"
-                    languages_scores[word.lower()] = languages_scores.get(word.lower(), 0) + score
-
-        # Calculate total score and convert to percentages
-        total_score = sum(languages_scores.values())
-        languages_data = [
-            {"language": language, "percentage": round((score / total_score * 100), 2) if total_score > 0 else 0}
-            for language, score in languages_scores.items()
-        ]
-
-        # Sort and return the top 5
-        languages_data.sort(key=lambda x: x["percentage"], reverse=True)
-        return languages_data[:5]
-
-    def process_libraries_data(self, country: str, state: str, role: str) -> List[Dict]:
+    def process_libraries_data(self, country: str, state: str, role: str) -> RankedTokens:
         """
         Processes the libraries data by extracting 1-grams, accumulating scores, and calculating percentages.
-        Special handling for "spring" + "boot" -> "spring boot", "apache" + "kafka" -> "apache kafka",
-        combining "framework" with its bigram partner, and combining "js" with its bigram partner.
+        See accumulate_library_scores for the special cases.
 
         Args:
             country (str): The country to filter by.
@@ -201,48 +411,16 @@ class DataProcessor:
             role (str): The role to filter by.
 
         Returns:
-            List[Dict]: A list of libraries with their percentages.
+            RankedTokens: The top libraries with their percentages.
         """
-        raw_libraries_data = self.qualified_service.get_bigram_details_by_country_state_role(country, state, role).get(
-            'libraries', []
-        )
-        libraries_scores = {}
-
-        for item in raw_libraries_data:
-            bigram = item['bigram']
-            score = item['score']
-
-            # Check for special cases: "spring" + "boot" -> "spring boot" and "apache" + "kafka" -> "apache kafka"
-            if "spring" in bigram and "boot" in bigram:
-                libraries_scores["spring boot"] = libraries_scores.get("spring boot", 0) + score
-            elif "apache" in bigram and "kafka" in bigram:
-                libraries_scores["apache kafka"] = libraries_scores.get("apache kafka", 0) + score
-            elif "framework" in bigram:
-                # Combine "framework" with its bigram partner
-                combined_library = f"{bigram[1] if bigram[0].lower() == 'framework' else bigram[0]} framework"
-                libraries_scores[combined_library.lower()] = libraries_scores.get(combined_library.lower(), 0) + score
-            elif "js" in bigram:
-                # Combine "js" with its bigram partner to form "partner.js"
-                combined_library = f"{bigram[1] if bigram[0].lower() == 'js' else bigram[0]}.js"
-                libraries_scores[combined_library.lower()] = libraries_scores.get(combined_library.lower(), 0) + score
-            else:
-                for word in bigram:
-                    libraries_scores[word.lower()] = libraries_scores.get(word.lower(), 0) + score
-
-        # Calculate total score and convert to percentages
-        total_score = sum(libraries_scores.values())
-        libraries_data = [
-            {"library": library, "percentage": round((score / total_score * 100), 2) if total_score > 0 else 0}
-            for library, score in libraries_scores.items()
-        ]
-
-        # Sort and return the top 5
-        libraries_data.sort(key=lambda x: x["percentage"], reverse=True)
-        return libraries_data[:5]
+        bigrams, scores = self.qualified_service.get_bigram_columns_by_country_state_role(
+            country, state, role, categories=("libraries",))["libraries"]
+        return rank_scores(accumulate_library_scores(bigrams, scores), "library", 5)
 
-    def process_bigram_data(self, country: str, state: str, role: str) -> Dict[str, List[Dict]]:
+    def process_bigram_data(self, country: str, state: str, role: str) -> Dict[str, RankedTokens]:
         """
-        Calls all four processing methods and formats the data into the desired structure.
+        Processes skills, tools, libraries, and languages from a single read of the bigrams document
+        and formats the data into the desired structure.
 
         Args:
             country (str): The country to filter by.
@@ -250,26 +428,31 @@ class DataProcessor:
             role (str): The role to filter by.
 
         Returns:
-            Dict[str, List[Dict]]: A dictionary containing processed data for skills, tools, libraries, and languages.
+            Dict[str, RankedTokens]: A dictionary containing processed data for skills, tools, libraries, and languages.
         """
-        # Call each method to get the processed data
-        skills_data = self.process_skills_data(country, state, role)
-        tools_data = self.process_tools_data(country, state, role)
-        libraries_data = self.process_libraries_data(country, state, role)
-        languages_data = self.process_languages_data(country, state, role)
+        if self.bigram_strategy == "aggregation":
+            top_tokens = self.qualified_service.get_top_bigram_tokens_by_country_state_role(
+                country, state, role, {category: TOP_K[category] for category in BIGRAM_CATEGORIES})
+            data = {
+                category: rank_scores(
+                    {item["token"]: item["score"] for item in top_tokens[category]["items"]},
+                    CATEGORY_KEYS[category], TOP_K[category], total_score=top_tokens[category]["total"])
+                for category in BIGRAM_CATEGORIES
+            }
+            logging.info("Processed bigram data for country: %s, state: %s, role: %s", country, state, role)
+            return data
 
-        # Format the data into the desired structure
-        data = {
-            "skills": [{"skill": item["skill"], "percentage": item["percentage"]} for item in skills_data],
-            "tools": [{"tool": item["tool"], "percentage": item["percentage"]} for item in tools_data],
-            "libraries": [{"library": item["library"], "percentage": item["percentage"]} for item in libraries_data],
-            "languages": [{"language": item["language"], "percentage": item["percentage"]} for item in languages_data]
-        }
+        if self.offloader is not None:
+            raw = self.qualified_service.get_bigram_columns_raw_by_country_state_role(country, state, role)
+            data = self.offloader.run(score_bigram_document, raw)
+        else:
+            columns = self.qualified_service.get_bigram_columns_by_country_state_role(country, state, role)
+            data = score_bigram_columns(columns)
 
-        logging.info(f"Processed bigram data for country: {country}, state: {state}, role: {role}")
+        logging.info("Processed bigram data for country: %s, state: %s, role: %s", country, state, role)
         return data
 
-    def process_education_data(self, country: str, state: str, role: str) -> List[Dict]:
+    def process_education_data(self, country: str, state: str, role: str) -> RankedEducation:
         """
         Processes the education data to prepare it in a list of dictionaries format.
         Groups the 1-grams from bigrams (ignoring specific words) and sums the scores,
@@ -281,48 +464,116 @@ class DataProcessor:
             role (str): The role to filter by.
 
         Returns:
-            List[Dict]: A list of dictionaries containing 'id', 'label', and 'value' for the top 4 1-grams.
+            RankedEducation: The top 3 1-grams, serialized with 'id', 'label', and 'value'.
         """
-        # Set of 1-grams to ignore
-        ignored_1grams = {"degree", "jobrelated"}
+        if self.bigram_strategy == "aggregation":
+            education = self.qualified_service.get_top_bigram_tokens_by_country_state_role(
+                country, state, role, {"education": TOP_K["education"]})["education"]
+            top_3_data = rank_education_scores(
+                {item["token"]: item["score"] for item in education["items"]}, 3, total_score=education["total"])
+        elif self.offloader is not None:
+            raw = self.qualified_service.get_bigram_columns_raw_by_country_state_role(
+                country, state, role, categories=("education",))
+            top_3_data = self.offloader.run(score_education_document, raw)
+        else:
+            bigrams, scores = self.qualified_service.get_bigram_columns_by_country_state_role(
+                country, state, role, categories=("education",))["education"]
+            top_3_data = rank_education_scores(accumulate_education_scores(bigrams, scores), 3)
+
+        logging.info("Processed education data for country: %s, state: %s, role: %s", country, state, role)
+        return top_3_data
 
-        # Call the QualifiedService method to get raw education data
-        raw_education_data = self.qualified_service.get_education_data_by_country_state_role(country, state, role)
+    def _rankings(self, country: str, state: str, role: str, categories: Tuple[str, ...]) -> Dict[str, RankedScores]:
+        """Returns the sorted scores of some categories, reading the bigrams document when one is not cached."""
+        def build(missing: Tuple[str, ...]) -> Dict[str, RankedScores]:
+            # Whatever the bigram strategy, the full rankings come from the document's columns
+            columns = self.qualified_service.get_bigram_columns_by_country_state_role(
+                country, state, role, categories=missing)
+            return {category: RankedScores(ACCUMULATORS[category](*columns[category])) for category in missing}
 
-        # Dictionary to accumulate scores for each 1-gram
-        education_scores = {}
+        return self.ranking_store.get(country, state, role, categories, build)
 
-        # Process the raw data to extract and accumulate scores
-        for item in raw_education_data:
-            bigram = item.get("bigram", [])
-            score = item.get("score", 0)
+    def process_ranked_bigram_data(self, country: str, state: str, role: str, top_k: Optional[int] = None,
+                                   offset: int = 0) -> Dict:
+        """
+        Returns a page of the full skills, tools, libraries and languages rankings.
 
-            for word in bigram:
-                if word.lower() not in ignored_1grams:  # Ignore words in the set
-                    if word.lower() in education_scores:
-                        education_scores[word.lower()] += score
-                    else:
-                        education_scores[word.lower()] = score
-
-        # Calculate the total score for all 1-grams
-        total_score = sum(education_scores.values())
-
-        # Convert accumulated scores into percentages and format as required
-        data = [
-            {
-                "id": word.capitalize(),
-                "label": word.capitalize(),  # Capitalize for label formatting
-                "value": round((score / total_score * 100), 2) if total_score > 0 else 0  # Calculate percentage
-            }
-            for word, score in education_scores.items()
-        ]
+        The rankings are sorted once per document and data version, so each page is a slice.
 
-        # Sort the data by percentage in descending order and select the top 4
-        data.sort(key=lambda x: x["value"], reverse=True)
-        top_3_data = data[:3]  # Get only the top 4 entries
+        Args:
+            country (str): The country to filter by.
+            state (str): The state to filter by.
+            role (str): The role to filter by.
+            top_k (int): Entries per category, the usual number of each category when None.
+            offset (int): Rank of the first entry returned, 0 for the highest.
 
-        logging.info(f"Processed education data for country: {country}, state: {state}, role: {role}")
-        return top_3_data
+        Returns:
+            Dict: The entries of each category, in the format of process_bigram_data, and under
+            "page" the offset, the total number of entries and the share of the total score covered
+            up to the end of the page, per category.
+        """
+        rankings = self._rankings(country, state, role, BIGRAM_CATEGORIES)
+        data = {
+            category: RankedTokens(CATEGORY_KEYS[category],
+                                   *rankings[category].columns(offset, top_k or TOP_K[category]))
+            for category in BIGRAM_CATEGORIES
+        }
+        data["page"] = page_summary(rankings, offset, top_k)
+        logging.info("Processed ranked bigram data for country: %s, state: %s, role: %s, top_k: %s, offset: %s",
+                     country, state, role, top_k, offset)
+        return data
+
+    def process_ranked_education_data(self, country: str, state: str, role: str, top_k: Optional[int] = None,
+                                      offset: int = 0) -> Dict:
+        """
+        Returns a page of the full education ranking.
+
+        Args:
+            country (str): The country to filter by.
+            state (str): The state to filter by.
+            role (str): The role to filter by.
+            top_k (int): Entries returned, 3 when None.
+            offset (int): Rank of the first entry returned, 0 for the highest.
+
+        Returns:
+            Dict: The entries under "education", in the format of process_education_data, and the
+            page summary under "page".
+        """
+        rankings = self._rankings(country, state, role, ("education",))
+        data = {
+            "education": RankedEducation(*rankings["education"].columns(offset, top_k or TOP_K["education"])),
+            "page": page_summary(rankings, offset, top_k),
+        }
+        logging.info("Processed ranked education data for country: %s, state: %s, role: %s, top_k: %s, offset: %s",
+                     country, state, role, top_k, offset)
+        return data
+
+    def iter_results(self, country: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Processes the bigrams document of every (country, state, role), one at a time.
+
+        The documents are read through a single cursor and each result is yielded before the next
+        document is processed, so memory does not grow with the number of documents. Results are
+        always scored here, whatever the bigram strategy.
+
+        Args:
+            country (Optional[str]): Only process the documents of this country, all when None.
+            batch_size (int): Documents read per round trip to MongoDB.
+
+        Yields:
+            Dict: "country", "state" and "role", the entries of process_bigram_data and the
+            "education" entries of process_education_data.
+        """
+        count = 0
+        for (key_country, state, role), columns in self.qualified_service.iter_bigram_columns(
+                country, batch_size=batch_size):
+            result = {"country": key_country, "state": state, "role": role}
+            result.update(score_bigram_columns(columns))
+            result["education"] = rank_education_scores(accumulate_education_scores(*columns["education"]),
+                                                        TOP_K["education"])
+            count += 1
+            yield result
+        logging.info("Processed %d bigrams documents for export, country: %s", count, country)
 
     def process_state_frequency_data(self, country: str) -> List[Dict]:
         """
@@ -362,7 +613,42 @@ class DataProcessor:
         # Sort the data by state for consistency
         processed_data.sort(key=lambda x: x["state"])
 
-        logging.info(f"Processed state frequency data for country: {country}")
+        logging.info("Processed state frequency data for country: %s", country)
+        return processed_data
+
+    def process_role_state_map(self, country: str, role: str) -> List[Dict]:
+        """
+        Processes the postings of a role into per-state counts, the share of the role's postings
+        in each state and the place of work split of each state, from a single grouped query.
+
+        Args:
+            country (str): The country to filter by.
+            role (str): The role to filter by.
+
+        Returns:
+            List[Dict]: Per state, {"state", "count", "percentage", "workplace"} sorted by state, where
+            "workplace" has the format of process_place_of_work_data.
+        """
+        raw_data = self.qualified_service.get_role_counts_by_state_and_place_of_work(country, role)
+
+        place_of_work_by_state = {}
+        for entry in raw_data:
+            counts = place_of_work_by_state.setdefault(entry["state"], {})
+            counts[entry["place_of_work"]] = counts.get(entry["place_of_work"], 0) + entry["count"]
+
+        total_count = sum(entry["count"] for entry in raw_data)
+        processed_data = []
+        for state in sorted(place_of_work_by_state):
+            counts = place_of_work_by_state[state]
+            count = sum(counts.values())
+            processed_data.append({
+                "state": state,
+                "count": count,
+                "percentage": round(count / total_count * 100, 2) if total_count > 0 else 0,
+                "workplace": place_of_work_percentages(counts),
+            })
+
+        logging.info("Processed state map for country: %s, role: %s", country, role)
         return processed_data
 
     def fetch_distinct_roles(self, country: str) -> List[str]:
@@ -377,9 +663,9 @@ class DataProcessor:
         """
         try:
             roles = self.qualified_service.get_roles_by_country_and_state(country)
-            logging.info(f"Fetched distinct roles for country: {country}")
+            logging.info("Fetched distinct roles for country: %s", country)
             return roles
         except Exception as e:
-            logging.exception(f"Error fetching distinct roles for country: {country}")
+            logging.exception("Error fetching distinct roles for country: %s", country)
             return []
 
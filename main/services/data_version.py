@@ -0,0 +1,43 @@
+import logging
+import threading
+import time
+from main.services.qualified_service import QualifiedService
+
+
+class DataVersionWatcher:
+    """
+    Tracks the current data version, asking MongoDB at most once per refresh interval.
+
+    Caches and indexes built from MongoDB data compare their own version against
+    current() to know when they must be rebuilt.
+    """
+
+    def __init__(self, qualified_service: QualifiedService, refresh_interval: float = 60.0):
+        """
+        Args:
+            qualified_service (QualifiedService): Service used to read the data version.
+            refresh_interval (float): Seconds between two checks of the version in MongoDB.
+        """
+        self.qualified_service = qualified_service
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = float("-inf")
+
+    def current(self) -> str:
+        """Returns the data version, refreshing it when the interval has elapsed."""
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.refresh_interval:
+                    version = self.qualified_service.get_data_version()
+                    # Keep the last known version when the read fails
+                    if version:
+                        if self._version is not None and version != self._version:
+                            logging.info("Data version changed from %s to %s", self._version, version)
+                        self._version = version
+                    self._checked_at = time.monotonic()
+        return self._version or ""
+
+    def invalidate(self) -> None:
+        """Forces the next call to current() to read the version from MongoDB."""
+        self._checked_at = float("-inf")
@@ -0,0 +1,6 @@
+class DataUnavailableError(Exception):
+    """Raised when data cannot be read from MongoDB, as opposed to there being no data."""
+
+
+class DeadlineExceededError(DataUnavailableError):
+    """Raised when a MongoDB operation cannot finish within the request deadline."""
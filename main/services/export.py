@@ -0,0 +1,79 @@
+"""
+Exports the processed results of every (country, state, role) as newline-delimited JSON.
+
+Each line holds the /details/operations and /details/education results of one key. The
+bigrams collection is read through a single cursor, so memory stays flat whatever its size.
+The last line is {"complete": true, "count": N}, or {"complete": false, ...} when reading the
+data failed part way, so a cut-off export can be told apart from a complete one.
+Uses the data source configured in config.local.yaml:
+    python -m main.services.export [--out results.ndjson] [--country "United States"] [--batch-size N]
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Iterable, Iterator
+from dotenv import load_dotenv
+from main.api.app_context import AppServices
+from main.services.records import json_default
+from main.utilities.config import load_config
+from main.utilities.jsonl import ndjson_chunks
+
+
+def with_completion_line(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Passes NDJSON chunks through and ends them with a line telling whether the export is complete.
+
+    A failure while reading is not raised, since the lines before it may already have been sent:
+    it is logged and reported in the last line instead.
+
+    Args:
+        chunks (Iterable[bytes]): Chunks of ndjson_chunks.
+
+    Yields:
+        bytes: The chunks, then {"complete": true, "count": N}, or {"complete": false, "count": N,
+        "error": ...} on failure, where N is the number of result lines before it.
+    """
+    count = 0
+    status = {"complete": True}
+    try:
+        for chunk in chunks:
+            count += chunk.count(b"\n")
+            yield chunk
+    except Exception as e:
+        logging.exception("Export stopped after %d lines", count)
+        status = {"complete": False, "error": type(e).__name__}
+    yield (json.dumps({**status, "count": count}, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", help="Output file, standard output when omitted")
+    parser.add_argument("--country", help="Only export this country")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per round trip to MongoDB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_dotenv()
+    services = AppServices(load_config())
+    start = time.perf_counter()
+    written = 0
+    chunk = b""
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        results = services.data_processor.iter_results(args.country, batch_size=args.batch_size)
+        for chunk in with_completion_line(ndjson_chunks(results, default=json_default)):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.out:
+            out.close()
+        services.close()
+    logging.info("Exported %.1f MB in %.1f s", written / 1e6, time.perf_counter() - start)
+    if not json.loads(chunk)["complete"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
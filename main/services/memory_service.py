@@ -0,0 +1,180 @@
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import bson
+from main.services.data_processor import ACCUMULATORS
+from main.services.qualified_service import BIGRAM_CATEGORIES, CONTENT_HASH_FIELD, BigramColumns
+from main.utilities.jsonl import content_hash, iter_jsonl
+
+Key = Tuple[str, str, str]
+
+
+def document_columns(document: Dict, category: str, max_items: Optional[int] = None) -> BigramColumns:
+    """Turns a category of a 'bigrams' document into parallel (bigrams, scores) lists."""
+    items = document.get(category) or []
+    if max_items:
+        items = sorted(items, key=lambda item: item.get("score", 0), reverse=True)[:max_items]
+    return [item.get("bigram") or [] for item in items], [item.get("score", 0) for item in items]
+
+
+class InMemoryQualifiedService:
+    """
+    Serves the 'qualified' and 'bigrams' data from memory, with the same interface as QualifiedService.
+
+    All aggregations are computed once when the data is loaded and kept in dicts keyed on
+    (country, state, role), so reads are dict lookups. Used to run the API without MongoDB,
+    in CI, benchmarks and frontend development.
+    """
+
+    def __init__(self, qualified_documents: Iterable[Dict], bigrams_documents: Iterable[Dict],
+                 bigram_max_items: Optional[int] = None, version: Optional[str] = None):
+        """
+        Builds the indexes.
+
+        Args:
+            qualified_documents (Iterable[Dict]): Documents of the 'qualified' collection.
+            bigrams_documents (Iterable[Dict]): Documents of the 'bigrams' collection.
+            bigram_max_items (Optional[int]): If set, only the highest scoring bigrams of each category
+                are returned by the column reads, as with QualifiedService.
+            version (Optional[str]): Data version to report. Derived from the document counts when not provided.
+        """
+        self.bigram_max_items = bigram_max_items
+
+        self._place_of_work_counts: Dict[Key, Counter] = defaultdict(Counter)
+        self._state_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._role_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._role_state_counts: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        qualified_count = 0
+        for document in qualified_documents:
+            qualified_count += 1
+            country, state, role = document.get("country"), document.get("state"), document.get("role")
+            self._place_of_work_counts[(country, state, role)][document.get("place_of_work")] += 1
+            if state != "All":
+                self._state_counts[country][state] += 1
+                self._role_counts[country][role] += 1
+                self._role_state_counts[(country, role)][(state, document.get("place_of_work"))] += 1
+
+        self._bigrams: Dict[Key, Dict] = {}
+        self._columns: Dict[Key, Dict[str, BigramColumns]] = {}
+        # BSON encodings of the column reads, built on first use
+        self._raw_columns: Dict[Tuple[Key, Tuple[str, ...]], bytes] = {}
+        self._roles: Dict[str, set] = defaultdict(set)
+        bigrams_count = 0
+        for document in bigrams_documents:
+            bigrams_count += 1
+            key = (document.get("country"), document.get("state"), document.get("role"))
+            self._roles[key[0]].add(key[2])
+            # Like find_one, the first document of a key wins
+            if key not in self._bigrams:
+                self._bigrams[key] = document
+                self._columns[key] = {
+                    category: document_columns(document, category, bigram_max_items)
+                    for category in (*BIGRAM_CATEGORIES, "education")
+                }
+
+        self.version = version or f"memory:{bigrams_count}:{qualified_count}"
+        logging.info("Loaded %d qualified and %d bigrams documents into memory", qualified_count, bigrams_count)
+
+    @classmethod
+    def from_jsonl(cls, qualified_path: str, bigrams_path: str, bigram_max_items: Optional[int] = None,
+                   version: Optional[str] = None) -> "InMemoryQualifiedService":
+        """
+        Loads the data from JSONL exports of the 'qualified' and 'bigrams' collections.
+
+        Args:
+            qualified_path (str): Path of the 'qualified' export.
+            bigrams_path (str): Path of the 'bigrams' export.
+            bigram_max_items (Optional[int]): See __init__.
+            version (Optional[str]): See __init__.
+
+        Returns:
+            InMemoryQualifiedService: The loaded service.
+        """
+        return cls(iter_jsonl(qualified_path), iter_jsonl(bigrams_path), bigram_max_items, version)
+
+    def get_place_of_work_count_grouped_by_role_and_state(self, country: str, state: str, role: str) -> List[Dict]:
+        counts = self._place_of_work_counts.get((country, state, role), Counter())
+        grouped = [{"_id": place, "count": count} for place, count in counts.items()]
+        grouped.sort(key=lambda entry: entry["count"])
+        return grouped
+
+    def get_bigram_details_by_country_state_role(self, country: str, state: str, role: str) -> Dict[str, List[Dict]]:
+        document = self._bigrams.get((country, state, role), {})
+        return {category: document.get(category, []) for category in ("tools", "libraries", "skills", "languages")}
+
+    def get_bigram_columns_by_country_state_role(
+            self, country: str, state: str, role: str, categories: Sequence[str] = BIGRAM_CATEGORIES
+    ) -> Dict[str, BigramColumns]:
+        columns = self._columns.get((country, state, role))
+        if columns is None:
+            return {category: ([], []) for category in categories}
+        return {category: columns[category] for category in categories}
+
+    def get_bigram_columns_raw_by_country_state_role(
+            self, country: str, state: str, role: str, categories: Sequence[str] = BIGRAM_CATEGORIES
+    ) -> Optional[bytes]:
+        key = (country, state, role)
+        columns = self._columns.get(key)
+        if columns is None:
+            return None
+        raw_key = (key, tuple(categories))
+        raw = self._raw_columns.get(raw_key)
+        if raw is None:
+            raw = bson.encode({category: {"bigrams": columns[category][0], "scores": columns[category][1]}
+                               for category in categories})
+            self._raw_columns[raw_key] = raw
+        return raw
+
+    def iter_bigram_columns(
+            self, country: Optional[str] = None, categories: Sequence[str] = (*BIGRAM_CATEGORIES, "education"),
+            batch_size: int = 1000, keys: Optional[Sequence[Key]] = None
+    ) -> Iterator[Tuple[Key, Dict[str, BigramColumns]]]:
+        selected = self._columns if keys is None else [key for key in keys if key in self._columns]
+        for key in sorted(key for key in selected if None not in key):
+            if country is None or key[0] == country:
+                columns = self._columns[key]
+                yield key, {category: columns[category] for category in categories}
+
+    def get_bigram_content_hashes(self, country: Optional[str] = None) -> Dict[Key, Optional[str]]:
+        # Exports of documents loaded before content hashes existed are digested here
+        return {key: document.get(CONTENT_HASH_FIELD) or content_hash(document, exclude=("_id", CONTENT_HASH_FIELD))
+                for key, document in self._bigrams.items()
+                if None not in key and (country is None or key[0] == country)}
+
+    def get_place_of_work_counts(self, country: Optional[str] = None) -> Dict[Key, Dict[str, int]]:
+        return {key: dict(counts) for key, counts in self._place_of_work_counts.items()
+                if None not in key and (country is None or key[0] == country)}
+
+    def get_top_bigram_tokens_by_country_state_role(
+            self, country: str, state: str, role: str, top_k: Dict[str, int]
+    ) -> Dict[str, Dict]:
+        document = self._bigrams.get((country, state, role), {})
+        result = {}
+        for category, limit in top_k.items():
+            # Always scores the full category, like the $facet pipeline
+            token_scores = ACCUMULATORS[category](*document_columns(document, category, None))
+            ranked = sorted(token_scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            result[category] = {
+                "total": sum(token_scores.values()),
+                "items": [{"token": token, "score": score} for token, score in ranked],
+            }
+        return result
+
+    def get_education_data_by_country_state_role(self, country: str, state: str, role: str) -> List[Dict]:
+        return self._bigrams.get((country, state, role), {}).get("education", [])
+
+    def get_freq_grouped_by_state(self, country: str) -> List[Dict]:
+        return [{"state": state, "count": count} for state, count in self._state_counts.get(country, Counter()).most_common()]
+
+    def get_role_counts_by_state_and_place_of_work(self, country: str, role: str) -> List[Dict]:
+        return [{"state": state, "place_of_work": place, "count": count}
+                for (state, place), count in self._role_state_counts.get((country, role), Counter()).items()]
+
+    def get_roles_by_country_and_state(self, country: str) -> List[str]:
+        return sorted(self._roles.get(country, ()))
+
+    def get_role_posting_counts(self, country: str) -> Dict[str, int]:
+        return dict(self._role_counts.get(country, {}))
+
+    def get_data_version(self) -> str:
+        return self.version
@@ -0,0 +1,105 @@
+import logging
+import threading
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+from main.services.exceptions import DeadlineExceededError
+from main.services.request_context import current_request
+from main.utilities.metrics import REGISTRY
+
+T = TypeVar("T")
+
+OFFLOADED = REGISTRY.counter("scoring_offloaded_total", "Documents scored in a worker process", ("function",))
+INLINE = REGISTRY.counter("scoring_inline_total", "Documents scored on the request thread", ("function",))
+
+
+class ScoringOffloader:
+    """
+    Runs CPU-heavy scoring of large documents in a bounded process pool.
+
+    Documents are passed as their raw BSON bytes, which pickle at memory-copy speed, and are
+    decoded and scored in the worker process. Only the few ranked entries come back, so the
+    request thread holds the GIL for a few milliseconds instead of the full decode and score.
+    Documents below the size threshold are scored inline, where the round trip would cost more
+    than it saves.
+    """
+
+    def __init__(self, executor_factory: Callable[[], Executor], min_bytes: int = 512 * 1024, max_pending: int = 8):
+        """
+        Args:
+            executor_factory (Callable[[], Executor]): Creates the pool, on first use and again if it breaks.
+            min_bytes (int): Documents of at least this many bytes are scored in the pool.
+            max_pending (int): Most documents submitted to the pool at once. Further requests wait
+                for a slot, within their deadline.
+        """
+        self.executor_factory = executor_factory
+        self.min_bytes = min_bytes
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+
+    def should_offload(self, raw: Optional[bytes]) -> bool:
+        """Returns True when the document is large enough to be worth sending to the pool."""
+        return raw is not None and len(raw) >= self.min_bytes
+
+    def run(self, function: Callable[[Optional[bytes]], T], raw: Optional[bytes]) -> T:
+        """
+        Returns function(raw), computed in the pool for large documents and inline otherwise.
+
+        Args:
+            function (Callable): A module-level function, so the worker process can import it.
+            raw (Optional[bytes]): The raw document.
+
+        Returns:
+            The function's result.
+
+        Raises:
+            DeadlineExceededError: When the request deadline passes while waiting for the pool.
+        """
+        if not self.should_offload(raw):
+            INLINE.inc(function=function.__name__)
+            return function(raw)
+
+        if not self._slots.acquire(timeout=self._remaining_seconds()):
+            raise DeadlineExceededError("Request deadline exceeded while waiting for a scoring process")
+        try:
+            executor = self._get_executor()
+            future = executor.submit(function, raw)
+            OFFLOADED.inc(function=function.__name__)
+            try:
+                return future.result(timeout=self._remaining_seconds())
+            except FutureTimeoutError:
+                future.cancel()
+                raise DeadlineExceededError("Request deadline exceeded while scoring in a worker process")
+            except BrokenProcessPool:
+                logging.exception("Scoring process pool broke, scoring inline and restarting the pool")
+                self._reset(executor)
+                return function(raw)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _remaining_seconds() -> Optional[float]:
+        context = current_request()
+        remaining = context.remaining_seconds() if context is not None else None
+        return max(remaining, 0) if remaining is not None else None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self.executor_factory()
+        return self._executor
+
+    def _reset(self, broken: Executor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        """Shuts the pool down, waiting for running work to finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,18 +1,110 @@
 import logging
-from typing import Dict, List
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import bson
+import pymongo
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from main.mongodb.MongoHelper import MongoDBClient
+from main.services.exceptions import DataUnavailableError, DeadlineExceededError
+from main.services.bigram_pipeline import top_tokens_pipeline
+from main.services.request_context import current_request
+from main.utilities.jsonl import batched
+from main.utilities.metrics import REGISTRY
 from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+# Categories stored as arrays of {bigram: [...], score: ...} in the 'bigrams' collection
+BIGRAM_CATEGORIES = ("skills", "tools", "libraries", "languages")
+
+# Column form of a category: the bigram word lists and their scores, index aligned
+BigramColumns = Tuple[List[List[str]], List[float]]
+
+# Keeps documents as undecoded bytes so their size can be measured before decoding
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# Collection and document holding the version stamp written when the data is refreshed
+METADATA_COLLECTION = "metadata"
+DATA_VERSION_ID = "data_version"
+
+# Field of each bigrams document holding the digest of its content, written by the bulk loader
+CONTENT_HASH_FIELD = "content_hash"
+
+
+def decode_bigram_columns(raw: Optional[bytes], categories: Sequence[str] = BIGRAM_CATEGORIES) -> Dict[str, BigramColumns]:
+    """
+    Decodes a document read by get_bigram_columns_raw_by_country_state_role into column form.
+
+    Args:
+        raw (Optional[bytes]): The BSON document, or None when no document was found.
+        categories (Sequence[str]): Categories the document was read with.
+
+    Returns:
+        Dict[str, BigramColumns]: (bigrams, scores) per category. Empty lists if raw is None.
+    """
+    if raw is None:
+        return {category: ([], []) for category in categories}
+    document = bson.decode(raw)
+    return {category: (document[category]["bigrams"], document[category]["scores"]) for category in categories}
+
+
+DEADLINE_EXCEEDED = REGISTRY.counter(
+    "mongo_deadline_exceeded_total", "MongoDB operations stopped by the request deadline", ("endpoint",))
 
 
 class QualifiedService:
-    def __init__(self, mdb_client: MongoDBClient):
+    """
+    Reads the 'qualified' and 'bigrams' collections.
+
+    Read methods raise DataUnavailableError when MongoDB cannot be queried, so callers can tell
+    an outage apart from a key that simply has no data (an empty result).
+    """
+
+    def __init__(self, mdb_client: MongoDBClient, bigram_max_items: Optional[int] = None,
+                 default_timeout_ms: Optional[float] = None):
         """
         Initializes the QualifiedService with a MongoDBClient instance.
 
         Args:
             mdb_client (MongoDBClient): An instance of MongoDBClient.
+            bigram_max_items (Optional[int]): If set, only the highest scoring bigrams of each category
+                are read (sorted and sliced inside MongoDB). Percentages are then computed over that subset.
+            default_timeout_ms (Optional[float]): Time limit for operations made outside of a request,
+                such as background refreshes. Requests use their own deadline.
         """
         self.mdb_client = mdb_client
+        self.bigram_max_items = bigram_max_items
+        self.default_timeout_ms = default_timeout_ms
+
+    @contextmanager
+    def _time_limit(self):
+        """
+        Bounds the MongoDB operations in the block by the current request's remaining time.
+
+        pymongo.timeout sends the remaining time as maxTimeMS with every command and uses it as
+        the socket timeout, so a slow aggregation cannot hold a worker thread past the deadline.
+        """
+        context = current_request()
+        remaining = context.remaining_seconds() if context is not None else None
+        if remaining is None and self.default_timeout_ms:
+            remaining = self.default_timeout_ms / 1000
+        if remaining is None:
+            yield
+            return
+        if remaining <= 0:
+            raise DeadlineExceededError("Request deadline exceeded before querying MongoDB")
+        with pymongo.timeout(remaining):
+            yield
+
+    @staticmethod
+    def _unavailable_error(message: str, error: Exception) -> DataUnavailableError:
+        """Builds the error raised for a failed read, telling deadline expiry apart from other failures."""
+        if isinstance(error, DeadlineExceededError) or (isinstance(error, PyMongoError) and error.timeout):
+            context = current_request()
+            DEADLINE_EXCEEDED.inc(endpoint=context.endpoint if context is not None else "")
+            return DeadlineExceededError(f"{message}: deadline exceeded")
+        return DataUnavailableError(message)
 
     def get_place_of_work_count_grouped_by_role_and_state(
             self, country: str, state: str, role: str
@@ -30,22 +122,23 @@ class QualifiedService:
             List[Dict]: A list of dictionaries containing the count of 'place_of_work' occurrences.
         """
         try:
-            self.mdb_client.change_database_and_collection(new_collection_name="qualified")
-            match_query = {"country": country, "state": state, "role": role}
-            pipeline = [
-                {"$match": match_query},
-                {"$group": {"_id": "$place_of_work", "count": {"$sum": 1}}},
-                {"$sort": {"count": ASCENDING}}
-            ]
-
-            results = self.mdb_client.collection.aggregate(pipeline)
-            grouped_data = [doc for doc in results]
-            logging.info("Successfully queried and grouped data for country: %s, state: %s, role: %s", country, state, role)
-            return grouped_data
+            with self._time_limit():
+                collection = self.mdb_client.get_collection("qualified")
+                match_query = {"country": country, "state": state, "role": role}
+                pipeline = [
+                    {"$match": match_query},
+                    {"$group": {"_id": "$place_of_work", "count": {"$sum": 1}}},
+                    {"$sort": {"count": ASCENDING}}
+                ]
+
+                results = collection.aggregate(pipeline)
+                grouped_data = [doc for doc in results]
+                logging.info("Successfully queried and grouped data for country: %s, state: %s, role: %s", country, state, role)
+                return grouped_data
 
         except Exception as e:
             logging.exception("Failed to query and group data for country: %s, state: %s, role: %s", country, state, role)
-            return []
+            raise self._unavailable_error("Failed to query and group data", e) from e
 
     def get_bigram_details_by_country_state_role(
             self, country: str, state: str, role: str
@@ -63,28 +156,254 @@ class QualifiedService:
             Dict[str, List[Dict]]: A dictionary containing tools, libraries, skills, and languages data.
         """
         try:
-            self.mdb_client.change_database_and_collection(new_collection_name="bigrams")
-            query = {"country": country, "state": state, "role": role}
-            projection = {"tools": 1, "libraries": 1, "skills": 1, "languages": 1, "_id": 0}
-
-            result = self.mdb_client.query_documents(query, projection)
-            document = next(result, None)
-
-            if document:
-                logging.info("Successfully fetched bigrams data for country: %s, state: %s, role: %s", country, state, role)
-                return {
-                    "tools": document.get("tools", []),
-                    "libraries": document.get("libraries", []),
-                    "skills": document.get("skills", []),
-                    "languages": document.get("languages", [])
-                }
-            else:
-                logging.warning("No bigrams data found for country: %s, state: %s, role: %s", country, state, role)
-                return {"tools": [], "libraries": [], "skills": [], "languages": []}
+            with self._time_limit():
+                query = {"country": country, "state": state, "role": role}
+                projection = {"tools": 1, "libraries": 1, "skills": 1, "languages": 1, "_id": 0}
+
+                result = self.mdb_client.query_documents(query, projection, col_name="bigrams")
+                document = next(result, None)
+
+                if document:
+                    logging.info("Successfully fetched bigrams data for country: %s, state: %s, role: %s", country, state, role)
+                    return {
+                        "tools": document.get("tools", []),
+                        "libraries": document.get("libraries", []),
+                        "skills": document.get("skills", []),
+                        "languages": document.get("languages", [])
+                    }
+                else:
+                    logging.warning("No bigrams data found for country: %s, state: %s, role: %s", country, state, role)
+                    return {"tools": [], "libraries": [], "skills": [], "languages": []}
 
         except Exception as e:
             logging.exception("Error querying bigrams data for country: %s, state: %s, role: %s", country, state, role)
-            return {"tools": [], "libraries": [], "skills": [], "languages": []}
+            raise self._unavailable_error("Error querying bigrams data", e) from e
+
+    def get_bigram_columns_by_country_state_role(
+            self, country: str, state: str, role: str, categories: Sequence[str] = BIGRAM_CATEGORIES
+    ) -> Dict[str, BigramColumns]:
+        """
+        Reads the requested categories of a 'bigrams' document in a compact column form.
+
+        MongoDB reshapes each array of {bigram, score} subdocuments into two parallel arrays,
+        which are smaller on the wire and much cheaper to decode than one dict per bigram.
+
+        Args:
+            country (str): The country to filter by.
+            state (str): The state to filter by.
+            role (str): The role to filter by.
+            categories (Sequence[str]): Categories to read, e.g. ("tools",) or ("education",).
+
+        Returns:
+            Dict[str, BigramColumns]: (bigrams, scores) per category. Empty lists if no data is found.
+        """
+        raw = self.get_bigram_columns_raw_by_country_state_role(country, state, role, categories)
+        if raw is None:
+            return decode_bigram_columns(None, categories)
+
+        start = time.perf_counter()
+        columns = decode_bigram_columns(raw, categories)
+        logging.debug("Decoded %d bytes of bigrams data in %.3f ms for country: %s, state: %s, role: %s",
+                      len(raw), (time.perf_counter() - start) * 1000, country, state, role)
+        return columns
+
+    def get_bigram_columns_raw_by_country_state_role(
+            self, country: str, state: str, role: str, categories: Sequence[str] = BIGRAM_CATEGORIES
+    ) -> Optional[bytes]:
+        """
+        Reads the same document as get_bigram_columns_by_country_state_role but leaves it undecoded.
+
+        The bytes can be measured, cached or sent to another process before paying for decoding;
+        decode_bigram_columns turns them into columns.
+
+        Args:
+            country (str): The country to filter by.
+            state (str): The state to filter by.
+            role (str): The role to filter by.
+            categories (Sequence[str]): Categories to read, e.g. ("tools",) or ("education",).
+
+        Returns:
+            Optional[bytes]: The BSON document, or None if no data is found.
+        """
+        try:
+            with self._time_limit():
+                collection = self.mdb_client.get_collection("bigrams", codec_options=RAW_CODEC_OPTIONS)
+                pipeline = [
+                    {"$match": {"country": country, "state": state, "role": role}},
+                    {"$limit": 1},
+                    {"$project": self._bigram_columns_projection(categories)},
+                ]
+                raw_document = next(iter(collection.aggregate(pipeline)), None)
+
+                if raw_document is None:
+                    logging.warning("No bigrams data found for country: %s, state: %s, role: %s", country, state, role)
+                    return None
+                return raw_document.raw
+
+        except Exception as e:
+            logging.exception("Error querying bigrams data for country: %s, state: %s, role: %s", country, state, role)
+            raise self._unavailable_error("Error querying bigrams data", e) from e
+
+    def iter_bigram_columns(
+            self, country: Optional[str] = None, categories: Sequence[str] = (*BIGRAM_CATEGORIES, "education"),
+            batch_size: int = 1000, keys: Optional[Sequence[Tuple[str, str, str]]] = None
+    ) -> Iterator[Tuple[Tuple[str, str, str], Dict[str, BigramColumns]]]:
+        """
+        Reads every bigrams document, in (country, state, role) order, through a single cursor.
+
+        Documents are fetched batch_size at a time and yielded one by one, so memory stays bounded
+        by one batch whatever the size of the collection. The cursor is not bound by the request
+        deadline; a failure while iterating raises DataUnavailableError.
+
+        Args:
+            country (Optional[str]): Only read the documents of this country, all when None.
+            categories (Sequence[str]): Categories to read.
+            batch_size (int): Documents per round trip to MongoDB.
+            keys (Optional[Sequence[Tuple[str, str, str]]]): Only read the documents of these
+                (country, state, role) keys, batch_size keys per query. Order is kept within a query only.
+
+        Yields:
+            Tuple: ((country, state, role), columns) where columns holds (bigrams, scores) per category.
+        """
+        projection = self._bigram_columns_projection(categories)
+        projection.update({"country": 1, "state": 1, "role": 1})
+        base_match = {"country": country} if country is not None else {}
+        if keys is None:
+            matches = [base_match]
+        else:
+            matches = [{**base_match, "$or": [{"country": c, "state": s, "role": r} for c, s, r in chunk]}
+                       for chunk in batched(keys, batch_size)]
+        try:
+            collection = self.mdb_client.get_collection("bigrams")
+            for match in matches:
+                pipeline = [
+                    {"$match": match},
+                    {"$sort": {"country": ASCENDING, "state": ASCENDING, "role": ASCENDING}},
+                    {"$project": projection},
+                ]
+                with collection.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True) as cursor:
+                    for document in cursor:
+                        key = (document.get("country"), document.get("state"), document.get("role"))
+                        yield key, {category: (document[category]["bigrams"], document[category]["scores"])
+                                    for category in categories}
+        except PyMongoError as e:
+            logging.exception("Error reading bigrams documents for export, country: %s", country)
+            raise DataUnavailableError("Error reading bigrams documents") from e
+
+    def get_bigram_content_hashes(self, country: Optional[str] = None) -> Dict[Tuple[str, str, str], Optional[str]]:
+        """
+        Reads the content digest of every bigrams document, without the documents themselves.
+
+        Not bound by the request deadline, since it reads the whole collection.
+
+        Args:
+            country (Optional[str]): Only read the documents of this country, all when None.
+
+        Returns:
+            Dict[Tuple[str, str, str], Optional[str]]: The CONTENT_HASH_FIELD of each (country, state, role),
+            None for documents loaded without one.
+        """
+        try:
+            collection = self.mdb_client.get_collection("bigrams")
+            cursor = collection.find({"country": country} if country is not None else {},
+                                     {"_id": 0, "country": 1, "state": 1, "role": 1, CONTENT_HASH_FIELD: 1},
+                                     batch_size=10000)
+            hashes = {}
+            for document in cursor:
+                key = (document.get("country"), document.get("state"), document.get("role"))
+                # Like find_one, the first document of a key wins
+                hashes.setdefault(key, document.get(CONTENT_HASH_FIELD))
+            return hashes
+        except PyMongoError as e:
+            logging.exception("Error reading bigrams content hashes, country: %s", country)
+            raise DataUnavailableError("Error reading bigrams content hashes") from e
+
+    def get_place_of_work_counts(self, country: Optional[str] = None) -> Dict[Tuple[str, str, str], Dict[str, int]]:
+        """
+        Counts the 'qualified' documents of every (country, state, role) per place of work, in one aggregation.
+
+        Not bound by the request deadline, since it groups the whole collection.
+
+        Args:
+            country (Optional[str]): Only count the documents of this country, all when None.
+
+        Returns:
+            Dict[Tuple[str, str, str], Dict[str, int]]: Counts per place of work of each key.
+        """
+        pipeline = [
+            {"$match": {"country": country} if country is not None else {}},
+            {"$group": {"_id": {"country": "$country", "state": "$state", "role": "$role",
+                                "place_of_work": "$place_of_work"},
+                        "count": {"$sum": 1}}},
+        ]
+        try:
+            collection = self.mdb_client.get_collection("qualified")
+            counts: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+            with collection.aggregate(pipeline, allowDiskUse=True) as cursor:
+                for document in cursor:
+                    group = document["_id"]
+                    key = (group.get("country"), group.get("state"), group.get("role"))
+                    counts.setdefault(key, {})[group.get("place_of_work")] = document["count"]
+            return counts
+        except PyMongoError as e:
+            logging.exception("Error counting places of work per key, country: %s", country)
+            raise DataUnavailableError("Error counting places of work per key") from e
+
+    def _bigram_columns_projection(self, categories: Sequence[str]) -> Dict:
+        """Builds the $project stage that turns each category into {bigrams: [...], scores: [...]}."""
+        projection = {"_id": 0}
+        for category in categories:
+            items = {"$ifNull": [f"${category}", []]}
+            if self.bigram_max_items:
+                # Requires MongoDB 5.2+ for $sortArray
+                items = {"$slice": [{"$sortArray": {"input": items, "sortBy": {"score": -1}}}, self.bigram_max_items]}
+            projection[category] = {
+                "$let": {
+                    "vars": {"items": items},
+                    "in": {
+                        "bigrams": {"$map": {"input": "$$items", "in": {"$ifNull": ["$$this.bigram", []]}}},
+                        "scores": {"$map": {"input": "$$items", "in": {"$ifNull": ["$$this.score", 0]}}},
+                    },
+                }
+            }
+        return projection
+
+    def get_top_bigram_tokens_by_country_state_role(
+            self, country: str, state: str, role: str, top_k: Dict[str, int]
+    ) -> Dict[str, Dict]:
+        """
+        Scores the bigram categories inside MongoDB with a single $facet aggregation
+        and returns only the top tokens of each.
+
+        Args:
+            country (str): The country to filter by.
+            state (str): The state to filter by.
+            role (str): The role to filter by.
+            top_k (Dict[str, int]): Number of tokens to return per category, e.g. {"tools": 5}.
+
+        Returns:
+            Dict[str, Dict]: Per category, {"total": sum of all token scores,
+            "items": [{"token": ..., "score": ...}, ...]} with the highest scores first.
+        """
+        result = {category: {"total": 0, "items": []} for category in top_k}
+        try:
+            with self._time_limit():
+                collection = self.mdb_client.get_collection("bigrams")
+                pipeline = top_tokens_pipeline(country, state, role, top_k)
+                facets = next(iter(collection.aggregate(pipeline)), None) or {}
+
+                for category in top_k:
+                    # A facet is empty when the document is missing or the category has no tokens
+                    if facets.get(category):
+                        result[category] = facets[category][0]
+                logging.info("Successfully aggregated top bigram tokens for country: %s, state: %s, role: %s",
+                             country, state, role)
+                return result
+
+        except Exception as e:
+            logging.exception("Error aggregating top bigram tokens for country: %s, state: %s, role: %s",
+                              country, state, role)
+            raise self._unavailable_error("Error aggregating top bigram tokens", e) from e
 
     def get_education_data_by_country_state_role(
             self, country: str, state: str, role: str
@@ -102,23 +421,23 @@ class QualifiedService:
             List[Dict]: A list containing education data. Returns an empty list if no data is found.
         """
         try:
-            self.mdb_client.change_database_and_collection(new_collection_name="bigrams")
-            query = {"country": country, "state": state, "role": role}
-            projection = {"education": 1, "_id": 0}
+            with self._time_limit():
+                query = {"country": country, "state": state, "role": role}
+                projection = {"education": 1, "_id": 0}
 
-            result = self.mdb_client.query_documents(query, projection)
-            document = next(result, None)
+                result = self.mdb_client.query_documents(query, projection, col_name="bigrams")
+                document = next(result, None)
 
-            if document:
-                logging.info("Successfully fetched education data for country: %s, state: %s, role: %s", country, state, role)
-                return document.get("education", [])
-            else:
-                logging.warning("No education data found for country: %s, state: %s, role: %s", country, state, role)
-                return []
+                if document:
+                    logging.info("Successfully fetched education data for country: %s, state: %s, role: %s", country, state, role)
+                    return document.get("education", [])
+                else:
+                    logging.warning("No education data found for country: %s, state: %s, role: %s", country, state, role)
+                    return []
 
         except Exception as e:
             logging.exception("Error querying education data for country: %s, state: %s, role: %s", country, state, role)
-            return []
+            raise self._unavailable_error("Error querying education data", e) from e
 
     def get_freq_grouped_by_state(self, country: str) -> List[Dict]:
         """
@@ -132,22 +451,55 @@ class QualifiedService:
             List[Dict]: A list of dictionaries containing state and count of records, excluding the state "ALL".
         """
         try:
-            self.mdb_client.change_database_and_collection(new_collection_name="qualified")
-            match_query = {"country": country, "state": {"$ne": "All"}}
-            pipeline = [
-                {"$match": match_query},
-                {"$group": {"_id": "$state", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
-            ]
-
-            results = self.mdb_client.collection.aggregate(pipeline)
-            grouped_data = [{"state": doc["_id"], "count": doc["count"]} for doc in results]
-            logging.info("Successfully fetched record count grouped by state for country: %s, excluding state: ALL", country)
-            return grouped_data
+            with self._time_limit():
+                collection = self.mdb_client.get_collection("qualified")
+                match_query = {"country": country, "state": {"$ne": "All"}}
+                pipeline = [
+                    {"$match": match_query},
+                    {"$group": {"_id": "$state", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}}
+                ]
+
+                results = collection.aggregate(pipeline)
+                grouped_data = [{"state": doc["_id"], "count": doc["count"]} for doc in results]
+                logging.info("Successfully fetched record count grouped by state for country: %s, excluding state: ALL", country)
+                return grouped_data
 
         except Exception as e:
             logging.exception("Error querying record count grouped by state for country: %s", country)
-            return []
+            raise self._unavailable_error("Error querying record count grouped by state", e) from e
+
+    def get_role_counts_by_state_and_place_of_work(self, country: str, role: str) -> List[Dict]:
+        """
+        Queries the 'qualified' collection to count the postings of a role grouped by state and
+        place of work, excluding the state "All", in a single aggregation.
+
+        Args:
+            country (str): The country to filter by.
+            role (str): The role to filter by.
+
+        Returns:
+            List[Dict]: Entries of the form {"state": ..., "place_of_work": ..., "count": ...}.
+        """
+        try:
+            with self._time_limit():
+                collection = self.mdb_client.get_collection("qualified")
+                pipeline = [
+                    {"$match": {"country": country, "role": role, "state": {"$ne": "All"}}},
+                    {"$group": {"_id": {"state": "$state", "place_of_work": "$place_of_work"}, "count": {"$sum": 1}}},
+                ]
+                grouped_data = [
+                    {"state": doc["_id"]["state"], "place_of_work": doc["_id"].get("place_of_work"), "count": doc["count"]}
+                    for doc in collection.aggregate(pipeline)
+                ]
+                logging.info("Successfully grouped postings by state and place of work for country: %s, role: %s",
+                             country, role)
+                return grouped_data
+
+        except Exception as e:
+            logging.exception("Error grouping postings by state and place of work for country: %s, role: %s",
+                              country, role)
+            raise self._unavailable_error("Error grouping postings by state and place of work", e) from e
 
     def get_roles_by_country_and_state(self, country: str) -> List[str]:
         """
@@ -160,18 +512,68 @@ class QualifiedService:
             List[str]: A list of distinct roles available in the given country.
         """
         try:
-            # Switch to the 'qualified' collection
-            self.mdb_client.change_database_and_collection(new_collection_name="bigrams")
+            with self._time_limit():
+                collection = self.mdb_client.get_collection("bigrams")
 
-            # Query to filter by country and state
-            query = {"country": country}
+                # Query to filter by country and state
+                query = {"country": country}
 
-            # Use the distinct method to get unique roles
-            roles = self.mdb_client.collection.distinct("role", query)
+                # Use the distinct method to get unique roles
+                roles = collection.distinct("role", query)
 
-            logging.info("Successfully fetched distinct roles for country: %s", country)
-            return roles
+                logging.info("Successfully fetched distinct roles for country: %s", country)
+                return roles
 
         except Exception as e:
             logging.exception("Error querying distinct roles for country: %s", country)
-            return []
+            raise self._unavailable_error("Error querying distinct roles", e) from e
+
+    def get_role_posting_counts(self, country: str) -> Dict[str, int]:
+        """
+        Queries the 'qualified' collection to count job postings per role for a specific country,
+        excluding the state "All".
+
+        Args:
+            country (str): The country to filter by.
+
+        Returns:
+            Dict[str, int]: The number of postings per role.
+        """
+        try:
+            with self._time_limit():
+                collection = self.mdb_client.get_collection("qualified")
+                pipeline = [
+                    {"$match": {"country": country, "state": {"$ne": "All"}}},
+                    {"$group": {"_id": "$role", "count": {"$sum": 1}}},
+                ]
+                counts = {doc["_id"]: doc["count"] for doc in collection.aggregate(pipeline)}
+                logging.info("Successfully counted postings per role for country: %s", country)
+                return counts
+
+        except Exception as e:
+            logging.exception("Error counting postings per role for country: %s", country)
+            raise self._unavailable_error("Error counting postings per role", e) from e
+
+    def get_data_version(self) -> str:
+        """
+        Returns an identifier that changes whenever the bigrams or qualified data is refreshed.
+
+        Uses the version stamp in the 'metadata' collection when the loader has written one, and
+        otherwise falls back to the document counts of both collections.
+
+        Returns:
+            str: The data version.
+        """
+        try:
+            with self._time_limit():
+                stamp = self.mdb_client.get_collection(METADATA_COLLECTION).find_one({"_id": DATA_VERSION_ID})
+                if stamp and stamp.get("version"):
+                    return str(stamp["version"])
+
+                bigrams_count = self.mdb_client.get_collection("bigrams").estimated_document_count()
+                qualified_count = self.mdb_client.get_collection("qualified").estimated_document_count()
+                return f"counts:{bigrams_count}:{qualified_count}"
+
+        except Exception as e:
+            logging.exception("Error reading the data version")
+            return ""
@@ -0,0 +1,108 @@
+from array import array
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from main.services.data_version import DataVersionWatcher
+from main.services.records import VOCABULARY
+from main.services.request_context import current_request
+from main.services.result_cache import MISSING, LocalLRUCache
+from main.utilities.metrics import REGISTRY
+
+RANKINGS_BUILT = REGISTRY.counter("rankings_built_total", "Sorted score arrays built from bigrams documents")
+
+
+class RankedScores:
+    """
+    The accumulated scores of one category of a bigrams document, sorted once.
+
+    Tokens are ordered like rank_scores orders them: by score, highest first, ties by token. Scores
+    are kept in that order with their prefix sums, so any page, the percentages of its entries and
+    the share of the total it covers are slices of O(page size).
+    """
+
+    def __init__(self, token_scores: Dict[str, float]):
+        """
+        Args:
+            token_scores (Dict[str, float]): Accumulated score per token.
+        """
+        # Summed in accumulation order, as rank_scores does, so the percentages round the same way
+        self.total = sum(token_scores.values())
+        percentages = [self._percentage(score) for score in token_scores.values()]
+        tokens = list(token_scores)
+        scores = list(token_scores.values())
+        order = sorted(range(len(tokens)), key=lambda i: (-scores[i], tokens[i]))
+        self.tokens: List[str] = [VOCABULARY.intern(tokens[i]) for i in order]
+        self.percentages = array("d", (percentages[i] for i in order))
+        # prefix[i] is the sum of the i highest scores
+        self.prefix = array("d", accumulate((scores[i] for i in order), initial=0.0))
+
+    def _percentage(self, score: float) -> float:
+        return round((score / self.total * 100), 2) if self.total > 0 else 0
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def columns(self, offset: int, limit: int) -> Tuple[List[str], Sequence[float]]:
+        """Returns the tokens and percentages of the entries ranked offset to offset + limit - 1."""
+        end = offset + limit
+        return self.tokens[offset:end], self.percentages[offset:end]
+
+    def page(self, offset: int, limit: int) -> List[Tuple[str, float]]:
+        """Returns (token, percentage) for the entries ranked offset to offset + limit - 1."""
+        return list(zip(*self.columns(offset, limit)))
+
+    def covered_percentage(self, end: int) -> float:
+        """Returns the share of the total score held by the first end entries."""
+        end = min(end, len(self.tokens))
+        return round(self.prefix[end] / self.total * 100, 2) if self.total > 0 else 0
+
+
+class RankingStore:
+    """
+    Per-process LRU cache of RankedScores keyed on (country, state, role, category).
+
+    Entries are keyed on the data version too, so rankings built from older data are never
+    returned and age out of the cache.
+    """
+
+    def __init__(self, max_entries: int = 1024, version_watcher: Optional[DataVersionWatcher] = None):
+        """
+        Args:
+            max_entries (int): Rankings kept before the least recently used are evicted.
+            version_watcher (DataVersionWatcher): Source of the current data version. Without one,
+                rankings are kept until evicted.
+        """
+        self.version_watcher = version_watcher
+        self._cache = LocalLRUCache(max_entries)
+
+    def get(self, country: str, state: str, role: str, categories: Tuple[str, ...],
+            build: Callable[[Tuple[str, ...]], Dict[str, RankedScores]]) -> Dict[str, RankedScores]:
+        """
+        Returns the rankings of some categories of a document, building the missing ones together.
+
+        Args:
+            country (str): The country of the document.
+            state (str): The state of the document.
+            role (str): The role of the document.
+            categories (Tuple[str, ...]): Categories needed.
+            build (Callable): Builds the RankedScores of the categories it is given, from one read.
+
+        Returns:
+            Dict[str, RankedScores]: Ranking per category.
+        """
+        version = self.version_watcher.current() if self.version_watcher is not None else ""
+        rankings = {}
+        for category in categories:
+            ranked = self._cache.get((version, country, state, role, category))
+            if ranked is not MISSING:
+                rankings[category] = ranked
+        missing = tuple(category for category in categories if category not in rankings)
+        if missing:
+            built = build(missing)
+            RANKINGS_BUILT.inc(len(built))
+            context = current_request()
+            # Rankings built from stale data may predate the version, so they are not kept for it
+            if context is None or not context.stale:
+                for category, ranked in built.items():
+                    self._cache.set((version, country, state, role, category), ranked)
+            rankings.update(built)
+        return rankings
@@ -0,0 +1,130 @@
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class Vocabulary:
+    """
+    Shared store of token strings, so that equal tokens of different results are one object.
+
+    "python" or "sql" show up in the results of thousands of keys; interned, every cached result
+    holds a pointer to the same string instead of its own copy.
+    """
+
+    def __init__(self, max_size: int = 1 << 20):
+        """
+        Args:
+            max_size (int): Tokens kept. Past it, new tokens are returned as they are.
+        """
+        self.max_size = max_size
+        self._tokens: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, token: str) -> str:
+        """Returns the shared copy of token, adding it when it is new."""
+        shared = self._tokens.get(token)
+        if shared is not None:
+            return shared
+        with self._lock:
+            if len(self._tokens) >= self.max_size:
+                return token
+            return self._tokens.setdefault(token, token)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+VOCABULARY = Vocabulary()
+
+
+class RankedTokens:
+    """
+    The top entries of a category, as parallel tuples of interned tokens and percentages.
+
+    Replaces a list of {key: token, "percentage": value} dicts inside the service: the dicts are
+    only built when the result is serialized, by to_json.
+    """
+
+    __slots__ = ("key", "tokens", "percentages")
+
+    def __init__(self, key: str, tokens: Sequence[str], percentages: Sequence[float]):
+        """
+        Args:
+            key (str): Name of the token field in the JSON output, e.g. "tool".
+            tokens (Sequence[str]): Tokens, highest first.
+            percentages (Sequence[float]): Percentage of each token, index aligned with tokens.
+        """
+        self.key = key
+        self.tokens: Tuple[str, ...] = tuple(VOCABULARY.intern(token) for token in tokens)
+        self.percentages: Tuple[float, ...] = tuple(percentages)
+
+    def to_json(self) -> List[Dict]:
+        """Returns the entries in the format of the API responses."""
+        key = self.key
+        return [{key: token, "percentage": percentage} for token, percentage in zip(self.tokens, self.percentages)]
+
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        return zip(self.tokens, self.percentages)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __eq__(self, other) -> bool:
+        return (type(other) is type(self) and self.key == other.key and self.tokens == other.tokens
+                and self.percentages == other.percentages)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.key!r}, {self.tokens!r}, {self.percentages!r})"
+
+    def __reduce__(self):
+        # Rebuilt through __init__, so results scored in a worker process are interned in this one
+        return type(self), (self.key, self.tokens, self.percentages)
+
+
+class RankedEducation(RankedTokens):
+    """Top education entries, serialized in the {"id", "label", "value"} format of the education charts."""
+
+    __slots__ = ()
+
+    def __init__(self, tokens: Sequence[str], percentages: Sequence[float], key: str = "education"):
+        super().__init__(key, tokens, percentages)
+
+    def to_json(self) -> List[Dict]:
+        data = []
+        for token, percentage in zip(self.tokens, self.percentages):
+            label = token.capitalize()
+            data.append({"id": label, "label": label, "value": percentage})
+        return data
+
+    def __reduce__(self):
+        return type(self), (self.tokens, self.percentages)
+
+
+def json_default(value: Any) -> List[Dict]:
+    """json.dumps hook that serializes result records in the format of the API responses."""
+    if isinstance(value, RankedTokens):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Tag of result records stored in the shared result cache
+RECORD_TAG = "$ranked"
+
+
+def encode_cached(value: Any) -> Dict:
+    """json.dumps hook storing result records in a form decode_cached turns back into records."""
+    if isinstance(value, RankedTokens):
+        return {RECORD_TAG: [value.key, list(value.tokens), list(value.percentages)]}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def decode_cached(document: Dict) -> Any:
+    """json.loads object_hook reversing encode_cached."""
+    record: Optional[list] = document.get(RECORD_TAG) if len(document) == 1 else None
+    if record is None:
+        return document
+    key, tokens, percentages = record
+    if key == "education":
+        return RankedEducation(tokens, percentages)
+    return RankedTokens(key, tokens, percentages)
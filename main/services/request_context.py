@@ -0,0 +1,57 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestContext:
+    """
+    Per-request state shared between the API layer and the services.
+
+    The object is set in a context variable by the API middleware. Endpoint threads receive a
+    copy of the context that still points to the same object, so services can record facts
+    about the response (such as serving stale data) that the middleware reads afterwards.
+    """
+
+    def __init__(self, endpoint: str = "", timeout_ms: Optional[float] = None):
+        """
+        Args:
+            endpoint (str): Path of the endpoint handling the request.
+            timeout_ms (Optional[float]): Time budget of the request. None means no deadline.
+        """
+        self.endpoint = endpoint
+        self.deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+        self.stale = False
+        self.max_staleness = 0.0
+        # Whether the info logs of this request are kept, decided by the log sampler on first use
+        self.log_sampled: Optional[bool] = None
+
+    def remaining_seconds(self) -> Optional[float]:
+        """Returns the time left before the deadline (negative once it has passed), or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def mark_stale(self, age: float) -> None:
+        """Records that part of the response is served from data that is age seconds old."""
+        self.stale = True
+        self.max_staleness = max(self.max_staleness, age)
+
+
+_current_request: ContextVar[Optional[RequestContext]] = ContextVar("current_request", default=None)
+
+
+def start_request(endpoint: str = "", timeout_ms: Optional[float] = None) -> RequestContext:
+    """Creates the context of a new request and makes it current."""
+    context = RequestContext(endpoint, timeout_ms)
+    _current_request.set(context)
+    return context
+
+
+def current_request() -> Optional[RequestContext]:
+    """Returns the context of the request being handled, or None outside of a request."""
+    return _current_request.get()
+
+
+def clear_request() -> None:
+    """Removes the current request context."""
+    _current_request.set(None)
@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Callable, Tuple
+from main.services.exceptions import DataUnavailableError
+from main.services.request_context import current_request
+
+
+class CircuitBreaker:
+    """
+    Stops calls to MongoDB after repeated failures, then lets a single trial call through
+    once reset_timeout has passed.
+
+    States: "closed" (calls allowed), "open" (calls rejected), "half-open" (one trial call in flight).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a trial call is allowed.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Returns whether a call may be made now."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logging.info("Circuit breaker closed after a successful trial call")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logging.warning("Circuit breaker opened after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+# Reads of whole bigrams documents or collections are too large to keep per worker: they only go
+# through the circuit breaker, and the result caches hold what is computed from them
+UNCACHED_METHODS = frozenset({
+    "get_bigram_details_by_country_state_role",
+    "get_bigram_columns_by_country_state_role",
+    "get_bigram_columns_raw_by_country_state_role",
+    "get_education_data_by_country_state_role",
+    "get_bigram_content_hashes",
+    "get_place_of_work_counts",
+})
+
+
+def _freeze(value):
+    """Turns dict and list arguments into tuples, so that any call's arguments can be a cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class ResilientQualifiedService:
+    """
+    Wraps a QualifiedService with stale-while-revalidate caching and a circuit breaker.
+
+    Every get_* call is cached by its arguments and the data version, except the document and
+    collection reads in UNCACHED_METHODS. A result younger than fresh_ttl is returned as is. An older one is returned straight away, marked stale on the request context, and
+    refreshed in the background. When MongoDB fails or the circuit is open, the last good
+    result (up to max_stale old) is served instead; DataUnavailableError is only raised
+    when there is none. Other attributes are passed through to the wrapped service.
+
+    The data version is the last one read through get_data_version: when it changes, the results
+    of the previous version are dropped.
+    """
+
+    def __init__(self, qualified_service, circuit_breaker: CircuitBreaker, refresh_executor: Executor,
+                 fresh_ttl: float = 60.0, max_stale: float = 86400.0, max_entries: int = 10000):
+        """
+        Args:
+            qualified_service (QualifiedService): The service to protect.
+            circuit_breaker (CircuitBreaker): Breaker shared by every call to the service.
+            refresh_executor (Executor): Runs background refreshes.
+            fresh_ttl (float): Seconds a result is served without refreshing it.
+            max_stale (float): Seconds a result may be served as a fallback.
+            max_entries (int): Maximum number of cached results (least recently used are evicted).
+        """
+        self.qualified_service = qualified_service
+        self.circuit_breaker = circuit_breaker
+        self.refresh_executor = refresh_executor
+        self.fresh_ttl = fresh_ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._version = ""
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.qualified_service, name)
+        if not name.startswith("get_") or not callable(attribute):
+            return attribute
+
+        if name in UNCACHED_METHODS:
+            def call(*args, **kwargs):
+                return self._call_uncached(name, attribute, args, kwargs)
+        else:
+            def call(*args, **kwargs):
+                return self._call(name, attribute, args, kwargs)
+        return call
+
+    def get_data_version(self) -> str:
+        """Reads the data version, never from cache since it is polled to detect refreshes."""
+        version = self.qualified_service.get_data_version()
+        # Keep the last known version when the read fails, as DataVersionWatcher does
+        if version and version != self._version:
+            with self._lock:
+                if self._version:
+                    logging.info("Dropping %d cached results of data version %s", len(self._entries), self._version)
+                self._entries.clear()
+                self._version = version
+        return version
+
+    def _call_uncached(self, name: str, method: Callable, args: tuple, kwargs: dict):
+        if not self.circuit_breaker.allow_request():
+            raise DataUnavailableError(f"Circuit open, cannot call {name}")
+        return self._invoke(method, args, kwargs)
+
+    def _call(self, name: str, method: Callable, args: tuple, kwargs: dict):
+        # A refresh started before a version change stores its result under the old version, where it is never read
+        key = (self._version, name, _freeze(args), _freeze(kwargs))
+        entry = self._get_entry(key)
+        age = time.monotonic() - entry.stored_at if entry else None
+
+        if entry is not None and age < self.fresh_ttl:
+            return entry.value
+        if entry is not None and age < self.max_stale:
+            self._mark_stale(age)
+            self._schedule_refresh(key, method, args, kwargs)
+            return entry.value
+
+        if not self.circuit_breaker.allow_request():
+            raise DataUnavailableError(f"Circuit open, no cached result for {name}")
+        return self._fetch(key, method, args, kwargs)
+
+    def _fetch(self, key: Tuple, method: Callable, args: tuple, kwargs: dict):
+        value = self._invoke(method, args, kwargs)
+        self._store(key, value)
+        return value
+
+    def _invoke(self, method: Callable, args: tuple, kwargs: dict):
+        try:
+            value = method(*args, **kwargs)
+        except Exception:
+            # Any failure (not only DataUnavailableError) must release a half-open trial call
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return value
+
+    def _schedule_refresh(self, key: Tuple, method: Callable, args: tuple, kwargs: dict) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if self.circuit_breaker.allow_request():
+                    self._fetch(key, method, args, kwargs)
+            except DataUnavailableError:
+                logging.warning("Background refresh of %s failed, serving stale data", key[1])
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.refresh_executor.submit(refresh)
+
+    def _get_entry(self, key: Tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: Tuple, value) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _mark_stale(age: float) -> None:
+        context = current_request()
+        if context is not None:
+            context.mark_stale(age)
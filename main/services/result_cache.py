@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from main.services.data_version import DataVersionWatcher
+from main.services.records import decode_cached, encode_cached
+from main.services.request_context import current_request
+from main.utilities.metrics import REGISTRY
+
+CACHE_HITS = REGISTRY.counter("result_cache_hits_total", "Processed results served from cache", ("tier",))
+CACHE_MISSES = REGISTRY.counter("result_cache_misses_total", "Processed results computed from MongoDB data")
+
+# Sentinel for a cache miss, since None can be a cached value
+MISSING = object()
+
+
+def default_shared_cache_path() -> str:
+    """Returns a path on a memory-backed filesystem when there is one, otherwise in the temp directory."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "tech_mastery_result_cache.sqlite")
+
+
+class LocalLRUCache:
+    """Per-process least-recently-used cache."""
+
+    def __init__(self, max_entries: int = 2048):
+        """
+        Args:
+            max_entries (int): Entries kept before the least recently used are evicted.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is not MISSING:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteSharedCache:
+    """
+    Cache shared by every worker process on a host, stored in one SQLite file.
+
+    Values are JSON. Each entry records the data version it was computed at; entries of other
+    versions are never returned and are purged when the version changes. When the table grows
+    past max_entries the least recently read entries are evicted. Any SQLite error is logged and
+    treated as a miss, so the cache can never fail a request.
+    """
+
+    # Reads refresh an entry's access time at most this often, to keep reads from writing
+    TOUCH_INTERVAL = 30.0
+    # Writes between two eviction passes
+    EVICT_EVERY = 64
+
+    def __init__(self, path: str, max_entries: int = 50000, max_value_bytes: int = 1 << 20):
+        """
+        Args:
+            path (str): SQLite database file, shared by the workers.
+            max_entries (int): Entries kept before the least recently read are evicted.
+            max_value_bytes (int): Larger values are not stored.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_value_bytes = max_value_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection().execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared between threads, so each thread opens its own
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Entries can be recomputed, so durability is traded for write speed
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, version: str):
+        try:
+            row = self._connection().execute(
+                "SELECT value, accessed FROM entries WHERE key = ? AND version = ?", (key, version)
+            ).fetchone()
+            if row is None:
+                return MISSING
+            now = time.time()
+            if now - row[1] > self.TOUCH_INTERVAL:
+                self._connection().execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(row[0], object_hook=decode_cached)
+        except sqlite3.Error as e:
+            logging.warning("Shared cache read failed: %s", e)
+            return MISSING
+
+    def set(self, key: str, version: str, value) -> None:
+        try:
+            payload = json.dumps(value, separators=(",", ":"), default=encode_cached)
+            if len(payload) > self.max_value_bytes:
+                return
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries (key, version, value, accessed) VALUES (?, ?, ?, ?)",
+                (key, version, payload, time.time()),
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self.evict()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logging.warning("Shared cache write failed: %s", e)
+
+    def evict(self) -> None:
+        """Deletes the least recently read entries above max_entries."""
+        connection = self._connection()
+        (count,) = connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def purge_other_versions(self, version: str) -> None:
+        """Deletes every entry computed at a data version other than version."""
+        try:
+            deleted = self._connection().execute("DELETE FROM entries WHERE version != ?", (version,)).rowcount
+            if deleted:
+                logging.info("Purged %d shared cache entries older than data version %s", deleted, version)
+        except sqlite3.Error as e:
+            logging.warning("Shared cache purge failed: %s", e)
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class TieredResultCache:
+    """
+    Two-tier cache of processed results, keyed by the current data version.
+
+    The per-process LRU is checked first, then the cache shared by the workers of the host,
+    and only then is the result computed.
+    """
+
+    def __init__(self, local: LocalLRUCache, shared: Optional[SQLiteSharedCache], version_watcher: DataVersionWatcher):
+        """
+        Args:
+            local (LocalLRUCache): Per-process tier.
+            shared (Optional[SQLiteSharedCache]): Host-wide tier, or None to use the local tier only.
+            version_watcher (DataVersionWatcher): Source of the current data version.
+        """
+        self.local = local
+        self.shared = shared
+        self.version_watcher = version_watcher
+        self._purged_version = None
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]):
+        version = self.version_watcher.current()
+        # "" means the version could not be read yet: the shared tier is left alone, since purging
+        # it would delete the entries every other worker is serving
+        shared = self.shared if version else None
+        if shared is not None and version != self._purged_version:
+            self._purged_version = version
+            shared.purge_other_versions(version)
+
+        value = self.local.get((version, key))
+        if value is not MISSING:
+            CACHE_HITS.inc(tier="local")
+            return value
+
+        if shared is not None:
+            value = shared.get(key, version)
+            if value is not MISSING:
+                CACHE_HITS.inc(tier="shared")
+                self.local.set((version, key), value)
+                return value
+
+        CACHE_MISSES.inc()
+        value = compute()
+        context = current_request()
+        # A result built from stale data is not kept, so it is recomputed once MongoDB recovers
+        if context is None or not context.stale:
+            self.local.set((version, key), value)
+            if shared is not None:
+                shared.set(key, version, value)
+        return value
+
+
+class CachingDataProcessor:
+    """
+    Wraps a DataProcessor so that every process_* result goes through a TieredResultCache.
+
+    Other attributes are passed through to the wrapped processor.
+    """
+
+    def __init__(self, data_processor, result_cache: TieredResultCache):
+        """
+        Args:
+            data_processor (DataProcessor): The processor whose results are cached.
+            result_cache (TieredResultCache): The cache.
+        """
+        self.data_processor = data_processor
+        self.result_cache = result_cache
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.data_processor, name)
+        if not name.startswith("process_") or not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            key = json.dumps([name, args, sorted(kwargs.items())], separators=(",", ":"))
+            return self.result_cache.get_or_compute(key, lambda: attribute(*args, **kwargs))
+        return call
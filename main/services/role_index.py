@@ -0,0 +1,143 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from main.services.data_version import DataVersionWatcher
+from main.services.qualified_service import QualifiedService
+from main.services.request_context import current_request
+
+
+class CountryRoles:
+    """
+    The roles of one country, sorted by name, with a sorted prefix index over every word start.
+
+    "Data Engineer" is indexed under "data engineer" and "engineer", so typing "eng" finds it.
+    """
+
+    def __init__(self, version: str, roles: List[str], counts: Dict[str, int]):
+        """
+        Args:
+            version (str): Data version the roles were loaded at.
+            roles (List[str]): Distinct role names.
+            counts (Dict[str, int]): Job postings per role.
+        """
+        self.version = version
+        self.roles = sorted(set(roles), key=lambda role: (role.lower(), role))
+        self.counts = {role: counts.get(role, 0) for role in self.roles}
+        self.role_set = frozenset(self.roles)
+
+        entries = []
+        for position, role in enumerate(self.roles):
+            words = role.lower().split()
+            for start in range(len(words)):
+                # Word position 0 means the prefix matches the start of the full role name
+                entries.append((" ".join(words[start:]), start, position))
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.key_entries = [(start, position) for _, start, position in entries]
+
+    def search(self, prefix: str, limit: int) -> List[Dict]:
+        """
+        Finds the roles that have a word starting with prefix.
+
+        Roles whose full name starts with the prefix rank first, then roles with more postings.
+
+        Args:
+            prefix (str): Case-insensitive prefix typed by the user.
+            limit (int): Maximum number of roles to return.
+
+        Returns:
+            List[Dict]: Matches of the form {"role": ..., "count": ...}.
+        """
+        prefix = " ".join(prefix.lower().split())
+        best_start = {}
+        index = bisect_left(self.keys, prefix)
+        while index < len(self.keys) and self.keys[index].startswith(prefix):
+            start, position = self.key_entries[index]
+            best_start[position] = min(start, best_start.get(position, start))
+            index += 1
+
+        ranked = heapq.nsmallest(
+            limit,
+            best_start,
+            key=lambda position: (best_start[position] > 0, -self.counts[self.roles[position]], position),
+        )
+        return [{"role": self.roles[position], "count": self.counts[self.roles[position]]} for position in ranked]
+
+
+class RoleIndex:
+    """
+    In-memory role index per country, rebuilt when the data version changes.
+
+    Replaces a `distinct` scan of the bigrams collection on every roles request.
+    """
+
+    def __init__(self, qualified_service: QualifiedService, version_watcher: DataVersionWatcher,
+                 empty_ttl: float = 30.0):
+        """
+        Args:
+            qualified_service (QualifiedService): Service used to load roles and posting counts.
+            version_watcher (DataVersionWatcher): Source of the current data version.
+            empty_ttl (float): Seconds an empty result is kept before the country is loaded again.
+        """
+        self.qualified_service = qualified_service
+        self.version_watcher = version_watcher
+        self.empty_ttl = empty_ttl
+        self._countries: Dict[str, CountryRoles] = {}
+        # Countries without roles, with the monotonic time their empty result expires
+        self._empty: Dict[str, Tuple[CountryRoles, float]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, country: str, version: str) -> Optional[CountryRoles]:
+        country_roles = self._countries.get(country)
+        if country_roles is not None and country_roles.version == version:
+            return country_roles
+        empty = self._empty.get(country)
+        if empty is not None and empty[0].version == version and time.monotonic() < empty[1]:
+            return empty[0]
+        return None
+
+    def get(self, country: str) -> CountryRoles:
+        """Returns the roles of a country, loading them if missing or built from an older data version."""
+        version = self.version_watcher.current()
+        country_roles = self._cached(country, version)
+        if country_roles is not None:
+            return country_roles
+
+        with self._lock:
+            country_roles = self._cached(country, version)
+            if country_roles is None:
+                roles = self.qualified_service.get_roles_by_country_and_state(country)
+                counts = self.qualified_service.get_role_posting_counts(country)
+                country_roles = CountryRoles(version, roles, counts)
+                context = current_request()
+                # Roles served stale may predate the version, so they are not kept for it
+                if context is None or not context.stale:
+                    if country_roles.roles:
+                        self._countries[country] = country_roles
+                        self._empty.pop(country, None)
+                    else:
+                        # An empty result may come from a partial load, so it is only kept briefly
+                        self._empty[country] = (country_roles, time.monotonic() + self.empty_ttl)
+                logging.info("Loaded %d roles for country: %s at data version: %s",
+                             len(country_roles.roles), country, version)
+        return country_roles
+
+    def roles(self, country: str) -> List[str]:
+        """Returns the roles of a country sorted by name."""
+        return self.get(country).roles
+
+    def has_role(self, country: str, role: str) -> bool:
+        """Returns whether the role exists for the country. Any role is accepted while the country has no roles."""
+        role_set = self.get(country).role_set
+        return not role_set or role in role_set
+
+    def search(self, country: str, prefix: str, limit: int = 10) -> List[Dict]:
+        """Returns up to limit roles of the country matching the prefix, best matches first."""
+        return self.get(country).search(prefix, limit)
+
+    def is_warm(self) -> bool:
+        """Returns whether at least one country has been loaded."""
+        return bool(self._countries)
@@ -0,0 +1,209 @@
+"""
+Role similarity over the skills, tools, libraries and languages of each (country, state, role).
+
+The index is built offline from the 'bigrams' documents and saved as a compact sparse matrix.
+Build it from a JSONL export, or from MongoDB when --bigrams is omitted:
+    python -m main.services.role_similarity --out data/role_vectors.npz [--bigrams data/bigrams.jsonl]
+"""
+import argparse
+import logging
+import math
+import os
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from scipy import sparse
+from main.services.data_processor import (
+    accumulate_language_scores, accumulate_library_scores, accumulate_skill_scores, accumulate_tool_scores,
+)
+from main.services.memory_service import document_columns
+
+# Categories making up a role's vector, tokenized like the /details/operations response
+VECTOR_CATEGORIES = {
+    "skills": accumulate_skill_scores,
+    "tools": accumulate_tool_scores,
+    "libraries": accumulate_library_scores,
+    "languages": accumulate_language_scores,
+}
+
+Key = Tuple[str, str, str]
+
+
+def role_features(document: Dict) -> Dict[str, float]:
+    """
+    Turns a 'bigrams' document into a unit-length feature vector keyed on "category:token".
+
+    Each category is normalized on its own before the whole vector is, so the categories weigh the
+    same whatever the scale of their scores.
+
+    Args:
+        document (Dict): A 'bigrams' document.
+
+    Returns:
+        Dict[str, float]: Feature weights. Empty when the document has no scored tokens.
+    """
+    features = {}
+    blocks = 0
+    for category, accumulate in VECTOR_CATEGORIES.items():
+        token_scores = accumulate(*document_columns(document, category))
+        norm = math.sqrt(sum(score * score for score in token_scores.values()))
+        if norm > 0:
+            blocks += 1
+            for token, score in token_scores.items():
+                features[f"{category}:{token}"] = score / norm
+    scale = math.sqrt(blocks)
+    return {feature: weight / scale for feature, weight in features.items()}
+
+
+class RoleSimilarityIndex:
+    """
+    Normalized role vectors stored as rows of a CSR matrix, grouped by (country, state).
+
+    Since the rows have unit length, the cosine similarity of a role with all the roles of its
+    state is a single sparse matrix-vector product.
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix, keys: List[Key], vocabulary: List[str], version: str = ""):
+        """
+        Args:
+            matrix (sparse.csr_matrix): One unit-length row per key.
+            keys (List[Key]): (country, state, role) of each row.
+            vocabulary (List[str]): Feature of each column.
+            version (str): Data version the index was built from.
+        """
+        self.matrix = matrix
+        self.keys = keys
+        self.vocabulary = vocabulary
+        self.version = version
+
+        rows_by_group: Dict[Tuple[str, str], List[int]] = {}
+        for row, (country, state, _) in enumerate(keys):
+            rows_by_group.setdefault((country, state), []).append(row)
+        self._groups = {}
+        for group, rows in rows_by_group.items():
+            roles = [keys[row][2] for row in rows]
+            self._groups[group] = (matrix[rows], roles, {role: position for position, role in enumerate(roles)})
+
+    @classmethod
+    def build(cls, documents: Iterable[Dict], version: str = "") -> "RoleSimilarityIndex":
+        """
+        Builds the index from 'bigrams' documents. Documents without scored tokens are left out.
+
+        Args:
+            documents (Iterable[Dict]): The 'bigrams' documents, read lazily.
+            version (str): Data version of the documents.
+
+        Returns:
+            RoleSimilarityIndex: The index.
+        """
+        vocabulary: Dict[str, int] = {}
+        keys, indptr, indices, data = [], [0], [], []
+        seen = set()
+        for document in documents:
+            key = (document.get("country"), document.get("state"), document.get("role"))
+            # Like find_one, the first document of a key wins
+            if None in key or key in seen:
+                continue
+            features = role_features(document)
+            if not features:
+                continue
+            seen.add(key)
+            keys.append(key)
+            for feature, weight in features.items():
+                indices.append(vocabulary.setdefault(feature, len(vocabulary)))
+                data.append(weight)
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(keys), len(vocabulary)),
+        )
+        matrix.sort_indices()
+        logging.info("Built role vectors for %d roles over %d features", len(keys), len(vocabulary))
+        return cls(matrix, keys, list(vocabulary), version)
+
+    def similar(self, country: str, state: str, role: str, limit: int = 10) -> List[Dict]:
+        """
+        Returns the roles of the same country and state most similar to a role.
+
+        Args:
+            country (str): The country to filter by.
+            state (str): The state to filter by.
+            role (str): The role to compare with.
+            limit (int): Maximum number of roles returned.
+
+        Returns:
+            List[Dict]: Entries of the form {"role": ..., "similarity": cosine}, most similar first.
+            Empty when the role is not in the index.
+        """
+        group = self._groups.get((country, state))
+        if group is None or role not in group[2]:
+            return []
+        vectors, roles, positions = group
+        position = positions[role]
+
+        similarities = vectors @ vectors[position].toarray().ravel()
+        similarities[position] = 0
+        candidates = np.flatnonzero(similarities > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-similarities[candidates], limit - 1)[:limit]]
+        ranked = sorted(candidates, key=lambda i: (-similarities[i], roles[i]))
+        return [{"role": roles[i], "similarity": round(float(similarities[i]), 4)} for i in ranked]
+
+    def save(self, path: str) -> None:
+        """Writes the index to a compressed .npz file."""
+        countries, states, roles = zip(*self.keys) if self.keys else ((), (), ())
+        np.savez_compressed(
+            path,
+            data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            countries=np.array(countries, dtype=str), states=np.array(states, dtype=str),
+            roles=np.array(roles, dtype=str), vocabulary=np.array(self.vocabulary, dtype=str),
+            version=np.array(self.version),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoleSimilarityIndex":
+        """Reads an index written by save."""
+        with np.load(path, allow_pickle=False) as f:
+            matrix = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+            keys = list(zip(f["countries"].tolist(), f["states"].tolist(), f["roles"].tolist()))
+            index = cls(matrix, keys, f["vocabulary"].tolist(), str(f["version"]))
+        logging.info("Loaded role vectors for %d roles (data version %s) from %s", len(keys), index.version, path)
+        return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Path of the .npz index")
+    parser.add_argument("--bigrams", help="JSONL export of the 'bigrams' collection; MongoDB is read when omitted")
+    parser.add_argument("--version", default="",
+                        help="Data version of the JSONL export, checked by the API to reload the index after a refresh")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.bigrams:
+        from main.utilities.jsonl import iter_jsonl
+        index = RoleSimilarityIndex.build(iter_jsonl(args.bigrams), version=args.version)
+    else:
+        from dotenv import load_dotenv
+        from main.mongodb.MongoHelper import MongoDBClient
+        from main.services.qualified_service import QualifiedService
+        from main.utilities.config import load_config
+
+        load_dotenv()
+        mongo_config = load_config()["mongo"]
+        mdb_client = MongoDBClient(os.getenv("MONGO_URI"), mongo_config["database_name"], "bigrams",
+                                   mongo_config["test_mode"])
+        try:
+            projection = {"_id": 0, "country": 1, "state": 1, "role": 1, **{c: 1 for c in VECTOR_CATEGORIES}}
+            cursor = mdb_client.get_collection("bigrams").find({}, projection, batch_size=500)
+            index = RoleSimilarityIndex.build(cursor, version=QualifiedService(mdb_client).get_data_version())
+        finally:
+            mdb_client.close_connection()
+
+    index.save(args.out)
+    print(f"Wrote {len(index.keys)} role vectors over {len(index.vocabulary)} features to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
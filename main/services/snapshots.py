@@ -0,0 +1,432 @@
+"""
+Precomputed snapshots of the processed results, updated with deltas between data versions.
+
+A snapshot holds the /details/operations, /details/education and /details/workplace results of
+every (country, state, role). It is written as a chain of gzipped NDJSON files in one directory:
+a full file, followed by deltas that only hold the keys that changed since the previous file. A
+key changed when the content hash of its bigrams document (stamped by the bulk loader) or its
+place of work counts differ from the fingerprints recorded in manifest.json, so a rebuild only
+scores the changed keys and its delta grows with the amount that changed, not with the dataset.
+
+Workers with snapshots.enabled load the newest full file once and then apply each new delta to
+their snapshot in place. Uses the data source configured in config.local.yaml:
+    python -m main.services.snapshots [--dir data/snapshots] [--full] [--prune] [--batch-size N]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from main.services.data_processor import (
+    TOP_K, accumulate_education_scores, place_of_work_percentages, rank_education_scores, score_bigram_columns,
+)
+from main.services.exceptions import DataUnavailableError
+from main.services.qualified_service import BIGRAM_CATEGORIES
+from main.services.records import decode_cached, encode_cached
+from main.utilities.metrics import REGISTRY
+
+Key = Tuple[str, str, str]
+
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_FILE = re.compile(r"^snapshot-(\d{6})\.jsonl\.gz$")
+
+# Results served from a snapshot, by endpoint field
+SNAPSHOT_FIELDS = {
+    "process_bigram_data": "operations",
+    "process_education_data": "education",
+    "process_place_of_work_data": "workplace",
+}
+
+SNAPSHOT_KEYS = REGISTRY.gauge("snapshot_keys", "Keys held by the result snapshot")
+SNAPSHOT_LOOKUPS = REGISTRY.counter("snapshot_lookups_total", "Results looked up in the snapshot", ("outcome",))
+
+EMPTY_COLUMNS = {category: ([], []) for category in (*BIGRAM_CATEGORIES, "education")}
+
+
+def snapshot_file_name(sequence: int) -> str:
+    return f"snapshot-{sequence:06d}.jsonl.gz"
+
+
+def key_id(key: Key) -> str:
+    """Returns the manifest form of a key."""
+    return "\t".join(key)
+
+
+def key_fingerprint(content_hash: Optional[str], place_of_work_counts: Optional[Dict[str, int]]) -> str:
+    """
+    Returns a digest of the source data of a key, which changes when any of its results would.
+
+    Args:
+        content_hash (Optional[str]): Content hash of the bigrams document, "" when the key has none.
+        place_of_work_counts (Optional[Dict[str, int]]): Counts of the 'qualified' documents of the key.
+
+    Returns:
+        str: The fingerprint.
+    """
+    counts = json.dumps(sorted((str(place), count) for place, count in (place_of_work_counts or {}).items()),
+                        separators=(",", ":"))
+    return hashlib.sha1(f"{content_hash}|{counts}".encode("utf-8")).hexdigest()
+
+
+def read_header(path: str) -> Dict:
+    """Returns the first line of a snapshot file, decompressing only the start of the file."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.loads(f.readline())
+
+
+def list_snapshot_files(directory: str) -> List[Tuple[int, str]]:
+    """Returns (sequence, path) of the snapshot files of a directory, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    files = []
+    for name in os.listdir(directory):
+        match = SNAPSHOT_FILE.match(name)
+        if match:
+            files.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(files)
+
+
+class BuildReport:
+    """What a snapshot build changed."""
+
+    def __init__(self):
+        self.path = None
+        self.full = False
+        self.version = None
+        self.keys = 0
+        self.changed = 0
+        self.deleted = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def __str__(self) -> str:
+        if self.path is None:
+            return f"Snapshot up to date: {self.keys} keys, data version {self.version}, {self.seconds:.2f} s"
+        kind = "full snapshot" if self.full else "delta"
+        return (f"Wrote {kind} {self.path}: {self.changed} keys updated, {self.deleted} deleted of {self.keys}, "
+                f"{self.bytes / 1e6:.2f} MB in {self.seconds:.2f} s, data version {self.version}")
+
+
+class SnapshotBuilder:
+    """Writes full snapshots and deltas of the processed results to a directory."""
+
+    def __init__(self, qualified_service, directory: str, batch_size: int = 1000):
+        """
+        Args:
+            qualified_service (QualifiedBackend): The data source.
+            directory (str): Directory of the snapshot files and manifest.
+            batch_size (int): Bigrams documents read per query.
+        """
+        self.qualified_service = qualified_service
+        self.directory = directory
+        self.batch_size = batch_size
+
+    def read_manifest(self) -> Dict:
+        """Returns the manifest of the last build, empty when there is none."""
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def build(self, full: bool = False) -> BuildReport:
+        """
+        Writes a delta holding the keys that changed since the last build, or a full snapshot.
+
+        A full snapshot is written when full is set or when there is no previous build. Nothing is
+        written when no key changed.
+
+        Args:
+            full (bool): Rewrite every key, starting a new chain.
+
+        Returns:
+            BuildReport: The file written and the keys it holds.
+
+        Raises:
+            DataUnavailableError: If the data version cannot be read.
+        """
+        start = time.perf_counter()
+        report = BuildReport()
+        manifest = self.read_manifest()
+        report.full = full or not manifest
+        previous = {} if report.full else manifest["fingerprints"]
+
+        report.version = self.qualified_service.get_data_version()
+        if not report.version:
+            # Files are chained by version, so one written at an unknown version could not be followed
+            raise DataUnavailableError("Could not read the data version, no snapshot written")
+        content_hashes = self.qualified_service.get_bigram_content_hashes()
+        place_of_work_counts = self.qualified_service.get_place_of_work_counts()
+
+        fingerprints: Dict[str, Optional[str]] = {}
+        changed: List[Key] = []
+        for key in sorted(key for key in content_hashes.keys() | place_of_work_counts.keys() if None not in key):
+            # Documents loaded without a content hash cannot be compared and are always rebuilt
+            content_hash = content_hashes.get(key, "")
+            fingerprint = None if content_hash is None else key_fingerprint(content_hash, place_of_work_counts.get(key))
+            fingerprints[key_id(key)] = fingerprint
+            if fingerprint is None or previous.get(key_id(key)) != fingerprint:
+                changed.append(key)
+        deleted = [tuple(identifier.split("\t")) for identifier in previous if identifier not in fingerprints]
+        report.keys, report.changed, report.deleted = len(fingerprints), len(changed), len(deleted)
+
+        if not report.full and not changed and not deleted:
+            report.seconds = time.perf_counter() - start
+            logging.info("%s", report)
+            return report
+
+        sequence = manifest.get("sequence", 0) + 1
+        header = {
+            "sequence": sequence,
+            "full": report.full,
+            "base": None if report.full else manifest["version"],
+            "version": report.version,
+            "keys": report.keys,
+            "changed": report.changed,
+            "deleted": report.deleted,
+        }
+        lines = self._lines(header, changed, deleted, fingerprints, content_hashes, place_of_work_counts)
+        report.path = os.path.join(self.directory, snapshot_file_name(sequence))
+        report.bytes = self._write(report.path, lines)
+        self._write_manifest({"sequence": sequence, "version": report.version, "fingerprints": fingerprints})
+        report.seconds = time.perf_counter() - start
+        logging.info("%s", report)
+        return report
+
+    def _lines(self, header: Dict, changed: Sequence[Key], deleted: Sequence[Key], fingerprints: Dict,
+               content_hashes: Dict, place_of_work_counts: Dict) -> Iterator[Dict]:
+        yield header
+        with_bigrams = [key for key in changed if key in content_hashes]
+        read = set()
+        for key, columns in self.qualified_service.iter_bigram_columns(batch_size=self.batch_size, keys=with_bigrams):
+            read.add(key)
+            yield self._result(key, columns, fingerprints, place_of_work_counts)
+        for key in changed:
+            if key not in read:
+                yield self._result(key, EMPTY_COLUMNS, fingerprints, place_of_work_counts)
+        for key in deleted:
+            yield {"key": list(key), "deleted": True}
+
+    @staticmethod
+    def _result(key: Key, columns: Dict, fingerprints: Dict, place_of_work_counts: Dict) -> Dict:
+        # Scored as iter_results and process_place_of_work_data do
+        return {
+            "key": list(key),
+            "fingerprint": fingerprints[key_id(key)],
+            "operations": score_bigram_columns(columns),
+            "education": rank_education_scores(accumulate_education_scores(*columns["education"]), TOP_K["education"]),
+            "workplace": place_of_work_percentages(place_of_work_counts.get(key, {})),
+        }
+
+    def _write(self, path: str, lines: Iterator[Dict]) -> int:
+        """Writes lines to path through a temporary file, so readers never see a partial file."""
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = path + ".tmp"
+        with gzip.open(temporary, "wt", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, separators=(",", ":"), default=encode_cached) + "\n")
+        os.replace(temporary, path)
+        return os.path.getsize(path)
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+
+    def prune(self) -> int:
+        """Deletes the files older than the newest full snapshot, which no worker needs any more."""
+        files = list_snapshot_files(self.directory)
+        full = [sequence for sequence, path in files if read_header(path).get("full")]
+        if not full:
+            return 0
+        removed = 0
+        for sequence, path in files:
+            if sequence < full[-1]:
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+class ResultSnapshot:
+    """
+    The results of every key at one data version, updated in place by deltas.
+
+    Reads are dict lookups. A delta replaces the results of its keys one at a time while the
+    snapshot is being read, so the keys of a delta become visible as they are applied.
+    """
+
+    def __init__(self):
+        self.version = ""
+        self.sequence = 0
+        self._results: Dict[Key, Dict] = {}
+
+    def get(self, key: Key) -> Optional[Dict]:
+        """Returns the "operations", "education" and "workplace" results of a key, or None."""
+        return self._results.get(key)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def apply(self, path: str) -> int:
+        """
+        Applies a snapshot file: a full file replaces every result, a delta updates its keys.
+
+        Args:
+            path (str): The file, as written by SnapshotBuilder.
+
+        Returns:
+            int: Keys updated or deleted.
+
+        Raises:
+            ValueError: If the file is a delta of another version than the current one.
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            full = bool(header.get("full"))
+            if not full and (not self.version or header["base"] != self.version):
+                raise ValueError(f"{path} updates version {header['base']}, the snapshot is at {self.version!r}")
+            # A full file is read into a new dict and swapped in, a delta is applied to the live one
+            results = {} if full else self._results
+            applied = 0
+            for line in f:
+                document = json.loads(line, object_hook=decode_cached)
+                key = tuple(document["key"])
+                if document.get("deleted"):
+                    results.pop(key, None)
+                else:
+                    results[key] = {field: document[field] for field in SNAPSHOT_FIELDS.values()}
+                applied += 1
+        self._results = results
+        self.version, self.sequence = header["version"], header["sequence"]
+        SNAPSHOT_KEYS.set(len(results))
+        logging.info("Applied %s: %d keys, snapshot at version %s", path, applied, self.version)
+        return applied
+
+
+class SnapshotStore:
+    """
+    Keeps a worker's ResultSnapshot up to date with the files of the snapshot directory.
+
+    Checks the directory at most once per refresh interval. New deltas are applied in place; a
+    full load only happens on the first check, or when the chain was restarted by a full rebuild.
+    """
+
+    def __init__(self, directory: str, refresh_interval: float = 30.0):
+        """
+        Args:
+            directory (str): Directory written by SnapshotBuilder.
+            refresh_interval (float): Seconds between two checks of the directory.
+        """
+        self.directory = directory
+        self.refresh_interval = refresh_interval
+        self.snapshot = ResultSnapshot()
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+
+    def get(self, key: Key) -> Optional[Dict]:
+        """Returns the snapshot results of a key, or None when the snapshot does not hold it."""
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.refresh_interval:
+                    try:
+                        self.sync()
+                    except Exception as e:
+                        # Keep serving the current snapshot
+                        logging.exception("Error updating the result snapshot from %s: %s", self.directory, e)
+                    self._checked_at = time.monotonic()
+        return self.snapshot.get(key)
+
+    def sync(self) -> int:
+        """
+        Applies the files written since the current snapshot.
+
+        Returns:
+            int: Files applied.
+        """
+        files = [(sequence, path) for sequence, path in list_snapshot_files(self.directory)
+                 if sequence > self.snapshot.sequence]
+        headers = [(path, read_header(path)) for _, path in files]
+        # A full file starts a new chain, which replaces the current snapshot whatever its version
+        full = [index for index, (_, header) in enumerate(headers) if header.get("full")]
+        if full:
+            headers = headers[full[-1]:]
+        elif not self.snapshot.version:
+            return 0
+        applied = 0
+        for path, header in headers:
+            if not header.get("full") and header["base"] != self.snapshot.version:
+                logging.warning("Skipping %s, which does not follow version %s", path, self.snapshot.version)
+                continue
+            self.snapshot.apply(path)
+            applied += 1
+        return applied
+
+
+class SnapshotDataProcessor:
+    """
+    Wraps a DataProcessor so that the results held by a snapshot are served from it.
+
+    process_bigram_data, process_education_data and process_place_of_work_data are looked up in
+    the snapshot first; keys it does not hold, and every other attribute, go to the wrapped processor.
+    """
+
+    def __init__(self, data_processor, store: SnapshotStore):
+        """
+        Args:
+            data_processor (DataProcessor): The processor used for the keys missing from the snapshot.
+            store (SnapshotStore): The snapshot.
+        """
+        self.data_processor = data_processor
+        self.store = store
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.data_processor, name)
+        field = SNAPSHOT_FIELDS.get(name)
+        if field is None:
+            return attribute
+
+        def call(country: str, state: str, role: str):
+            result = self.store.get((country, state, role))
+            if result is None:
+                SNAPSHOT_LOOKUPS.inc(outcome="miss")
+                return attribute(country, state, role)
+            SNAPSHOT_LOOKUPS.inc(outcome="hit")
+            return result[field]
+        return call
+
+
+def main() -> None:
+    # Imported here: app_context imports this module to serve the snapshots
+    from main.api.app_context import AppServices
+    from main.utilities.config import load_config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="Snapshot directory, snapshots.directory of the configuration by default")
+    parser.add_argument("--full", action="store_true", help="Write every key, starting a new chain of deltas")
+    parser.add_argument("--prune", action="store_true", help="Delete the files older than the newest full snapshot")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Bigrams documents read per query")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_dotenv()
+    config = load_config()
+    services = AppServices(config)
+    directory = args.dir or config.get("snapshots", {}).get("directory") or "data/snapshots"
+    try:
+        builder = SnapshotBuilder(services.qualified_service, directory, batch_size=args.batch_size)
+        print(builder.build(full=args.full))
+        if args.prune:
+            print(f"Deleted {builder.prune()} old snapshot files")
+    finally:
+        services.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Word lists shared by the Python (DataProcessor) and MongoDB (bigram_pipeline) token rules."""
+
+# 1-grams that carry no meaning on their own, per category
+IGNORED_TOOL_1GRAMS = frozenset({"like"})  # Add more words to ignore as needed
+IGNORED_LANGUAGE_1GRAMS = frozenset({"data", "server"})  # Add any other 1-grams you want to ignore
+IGNORED_EDUCATION_1GRAMS = frozenset({"degree", "jobrelated"})
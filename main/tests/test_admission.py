@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+from fastapi.middleware.cors import CORSMiddleware
+from main.api.admission import REJECTED, AdmissionControlMiddleware, ConcurrencyLimiter
+from main.api.tech_mastery_api import create_app
+
+
+class TestConcurrencyLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_full_queue_is_rejected_immediately(self):
+        limiter = ConcurrencyLimiter("heavy", max_concurrent=1, max_queue=1, queue_timeout=5)
+        self.assertEqual(await limiter.acquire(), "")
+
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        self.assertEqual(await limiter.acquire(), "queue_full")
+
+        limiter.release()
+        self.assertEqual(await queued, "")
+        limiter.release()
+
+    async def test_waiting_too_long_is_rejected(self):
+        limiter = ConcurrencyLimiter("heavy", max_concurrent=1, max_queue=4, queue_timeout=0.01)
+        await limiter.acquire()
+        self.assertEqual(await limiter.acquire(), "queue_timeout")
+
+
+class TestAdmissionControlMiddleware(unittest.IsolatedAsyncioTestCase):
+    async def test_rejections_get_503_with_retry_after(self):
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+
+        middleware = AdmissionControlMiddleware.from_config(app, {
+            "retry_after_seconds": 2,
+            "classes": {"heavy": {"max_concurrent": 1, "max_queue": 0, "queue_timeout_ms": 10}},
+            "endpoints": {"/details/country": "heavy"},
+        })
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "path": "/details/country"}
+        before = REJECTED.value(endpoint_class="heavy", reason="queue_full")
+        running = asyncio.create_task(middleware(scope, None, send))
+        await asyncio.sleep(0)
+        await middleware(scope, None, send)
+
+        self.assertEqual(sent[0]["status"], 503)
+        self.assertIn((b"retry-after", b"2"), sent[0]["headers"])
+        self.assertEqual(REJECTED.value(endpoint_class="heavy", reason="queue_full"), before + 1)
+        release.set()
+        await running
+
+    def test_cors_wraps_admission_control(self):
+        # Starlette lists middleware outermost first; CORS must also answer admission rejections
+        app = create_app({"admission": {"enabled": True, "classes": {}, "endpoints": {}}})
+        classes = [middleware.cls for middleware in app.user_middleware]
+        self.assertIs(classes[0], CORSMiddleware)
+        self.assertLess(classes.index(CORSMiddleware), classes.index(AdmissionControlMiddleware.from_config))
+
+
+if __name__ == '__main__':
+    unittest.main()
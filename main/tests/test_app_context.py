@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+from main.api.app_context import AppServices
+
+CONFIG = {
+    "mongo": {
+        "database_name": "linkedindb_prod",
+        "collection_qualified": "qualified",
+        "test_mode": True,
+        "max_pool_size": 100,
+    }
+}
+
+
+class TestAppServices(unittest.TestCase):
+    @patch("main.api.app_context.MongoDBClient")
+    def test_nothing_is_built_until_first_use(self, mock_client_class):
+        services = AppServices(CONFIG)
+        mock_client_class.assert_not_called()
+
+        processor = services.data_processor
+
+        mock_client_class.assert_called_once()
+        self.assertIs(processor, services.data_processor)
+        self.assertIs(processor.qualified_service.mdb_client, mock_client_class.return_value)
+
+    @patch("main.api.app_context.MongoDBClient")
+    def test_close_only_closes_a_created_client(self, mock_client_class):
+        services = AppServices(CONFIG)
+        services.close()
+        mock_client_class.return_value.close_connection.assert_not_called()
+
+        services.mongo_client
+        services.close()
+        mock_client_class.return_value.close_connection.assert_called_once()
+
+    @patch("main.api.app_context.MongoDBClient")
+    def test_unwritable_shared_cache_falls_back_to_the_local_tier(self, mock_client_class):
+        config = dict(CONFIG, cache={"enabled": True, "shared_enabled": True,
+                                     "shared_path": "/nonexistent/directory/cache.sqlite"})
+        processor = AppServices(config).data_processor
+
+        self.assertIsNone(processor.result_cache.shared)
+        self.assertIsNotNone(processor.result_cache.local)
+
+    @patch("main.api.app_context.MongoDBClient")
+    def test_create_app_does_not_connect(self, mock_client_class):
+        from main.api.tech_mastery_api import create_app
+
+        app = create_app(CONFIG)
+        self.assertIs(app.state.config, CONFIG)
+        mock_client_class.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
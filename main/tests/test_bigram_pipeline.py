@@ -0,0 +1,113 @@
+import random
+import unittest
+from collections import Counter
+from main.services.bigram_pipeline import TOKEN_EXPRESSIONS, top_tokens_pipeline
+from main.services.data_processor import (
+    accumulate_education_scores, accumulate_language_scores, accumulate_library_scores, accumulate_skill_scores,
+    accumulate_tool_scores,
+)
+
+ACCUMULATORS = {
+    "skills": accumulate_skill_scores,
+    "tools": accumulate_tool_scores,
+    "libraries": accumulate_library_scores,
+    "languages": accumulate_language_scores,
+    "education": accumulate_education_scores,
+}
+
+WORDS = ["power", "bi", "Microsoft", "excel", "google", "Cloud", "like", "data", "server", "net", "NET", "spring",
+         "boot", "apache", "kafka", "framework", "js", "React", "python", "degree", "jobrelated", "Bachelor"]
+
+MISSING = object()
+
+
+def evaluate(expression, variables):
+    """Evaluates the subset of the MongoDB expression language used by bigram_pipeline."""
+    if isinstance(expression, str) and expression.startswith("$$"):
+        return variables[expression[2:]]
+    if isinstance(expression, list):
+        return [evaluate(item, variables) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+
+    (operator, args), = expression.items()
+    value = lambda e: evaluate(e, variables)
+    if operator == "$let":
+        scope = dict(variables, **{name: value(e) for name, e in args["vars"].items()})
+        return evaluate(args["in"], scope)
+    if operator in ("$map", "$filter"):
+        items = value(args["input"])
+        name = args.get("as", "this")
+        if operator == "$map":
+            return [evaluate(args["in"], dict(variables, **{name: item})) for item in items]
+        return [item for item in items if evaluate(args["cond"], dict(variables, **{name: item}))]
+    if operator == "$reduce":
+        accumulated = value(args["initialValue"])
+        for item in value(args["input"]):
+            accumulated = evaluate(args["in"], dict(variables, value=accumulated, this=item))
+        return accumulated
+    if operator == "$switch":
+        for branch in args["branches"]:
+            if value(branch["case"]):
+                return value(branch["then"])
+        return value(args["default"])
+    if operator == "$cond":
+        return value(args[1]) if value(args[0]) else value(args[2])
+    if operator == "$ifNull":
+        first = value(args[0])
+        return value(args[1]) if first is None or first is MISSING else first
+    if operator == "$and":
+        return all(value(arg) for arg in args)
+    if operator == "$not":
+        return not value(args[0])
+
+    values = [value(arg) for arg in args] if isinstance(args, list) else [value(args)]
+    if operator == "$toLower":
+        return "" if values[0] is None or values[0] is MISSING else values[0].lower()
+    if operator == "$concat":
+        return None if any(v is None or v is MISSING for v in values) else "".join(values)
+    if operator == "$arrayElemAt":
+        array, index = values
+        return array[index] if index < len(array) else MISSING
+    if operator == "$in":
+        return values[0] in values[1]
+    if operator == "$eq":
+        return values[0] == values[1]
+    if operator == "$ne":
+        return values[0] != values[1]
+    if operator == "$size":
+        return len(values[0])
+    if operator == "$max":
+        return max(values)
+    if operator == "$isArray":
+        return isinstance(values[0], list)
+    if operator == "$slice":
+        array, position, n = values
+        return array[position:position + n]
+    raise NotImplementedError(operator)
+
+
+class TestBigramPipeline(unittest.TestCase):
+    def test_token_expressions_match_python_rules(self):
+        rng = random.Random(7)
+        bigrams = [rng.sample(WORDS, 2) for _ in range(2000)] + [["data", "data"], ["js", "JS"], []]
+        for category, build_expression in TOKEN_EXPRESSIONS.items():
+            expression = build_expression()
+            for bigram in bigrams:
+                expected = ACCUMULATORS[category]([bigram], [1])
+                tokens = evaluate(expression, {"b": bigram})
+                self.assertEqual(Counter(tokens), Counter(expected), f"{category} {bigram}")
+
+    def test_pipeline_returns_one_facet_per_category(self):
+        pipeline = top_tokens_pipeline("United States", "NY", "Data Analyst", {"tools": 5, "education": 3})
+
+        self.assertEqual(pipeline[0], {"$match": {"country": "United States", "state": "NY", "role": "Data Analyst"}})
+        facets = pipeline[-1]["$facet"]
+        self.assertEqual(set(facets), {"tools", "education"})
+        self.assertEqual(facets["education"][-1]["$project"]["items"], {"$slice": ["$items", 3]})
+        # Same order as top_tokens in the Python strategy: score, highest first, ties by token
+        self.assertIn({"$sort": {"score": -1, "_id": 1}}, facets["tools"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from pymongo import UpdateOne
+from main.mongodb.MongoHelper import MongoDBClient
+from main.mongodb.bulk_loader import BulkLoader, SHADOW_SUFFIX
+from main.utilities.jsonl import content_hash
+
+
+def bigrams_documents(count):
+    return [{"country": "United States", "state": "CA", "role": f"role {i}", "tools": []} for i in range(count)]
+
+
+class TestBulkUpsertDocuments(unittest.TestCase):
+    @patch("main.mongodb.MongoHelper.MongoClient")
+    def test_builds_unordered_upserts_keyed_on_the_key_fields(self, mock_client):
+        client = MongoDBClient("mongodb://localhost", "db", "bigrams", test_mode=False)
+        collection = client.db["bigrams"]
+
+        client.bulk_upsert_documents([{"_id": 1, "country": "Canada", "state": "ON", "role": "r", "tools": []}],
+                                     ("country", "state", "role"), col_name="bigrams")
+
+        operations, = collection.bulk_write.call_args.args
+        self.assertEqual(collection.bulk_write.call_args.kwargs, {"ordered": False})
+        self.assertEqual(operations, [UpdateOne({"country": "Canada", "state": "ON", "role": "r"},
+                                                {"$set": {"country": "Canada", "state": "ON", "role": "r", "tools": []}},
+                                                upsert=True)])
+
+    @patch("main.mongodb.MongoHelper.MongoClient")
+    def test_nothing_to_write(self, mock_client):
+        client = MongoDBClient("mongodb://localhost", "db", "bigrams", test_mode=False)
+        self.assertIsNone(client.bulk_upsert_documents([], ("_id",)))
+        client.db["bigrams"].bulk_write.assert_not_called()
+
+
+class TestBulkLoader(unittest.TestCase):
+    def setUp(self):
+        self.mdb_client = MagicMock()
+        self.collections = {}
+        self.mdb_client.get_collection.side_effect = lambda name: self.collections.setdefault(name, MagicMock())
+        self.mdb_client.bulk_upsert_documents.side_effect = \
+            lambda docs, key_fields, col_name: MagicMock(upserted_count=len(docs), modified_count=0)
+
+    def test_streams_documents_in_batches_and_bumps_the_version(self):
+        report = BulkLoader(self.mdb_client, batch_size=2).load(iter(bigrams_documents(5)), "bigrams")
+
+        calls = self.mdb_client.bulk_upsert_documents.call_args_list
+        self.assertEqual([len(call.args[0]) for call in calls], [2, 2, 1])
+        self.assertTrue(all(call.args[1] == ("country", "state", "role") for call in calls))
+        self.assertTrue(all(call.kwargs["col_name"] == "bigrams" for call in calls))
+        self.assertEqual((report.documents, report.batches, report.upserted), (5, 3, 5))
+
+        metadata = self.collections["metadata"]
+        self.assertEqual(metadata.update_one.call_args.args[0], {"_id": "data_version"})
+        self.assertEqual(metadata.update_one.call_args.args[1]["$set"]["version"], report.version)
+
+    def test_documents_missing_a_key_field_are_skipped(self):
+        documents = bigrams_documents(2) + [{"country": "Canada", "tools": []}]
+        report = BulkLoader(self.mdb_client).load(documents, "bigrams")
+        self.assertEqual((report.documents, report.skipped), (2, 1))
+
+    def test_bigrams_documents_are_stamped_with_a_content_hash(self):
+        documents = bigrams_documents(2)
+        BulkLoader(self.mdb_client).load([dict(document) for document in documents], "bigrams")
+        loaded, = self.mdb_client.bulk_upsert_documents.call_args.args[0][:1]
+
+        reordered = dict(reversed(list(documents[0].items())))
+        self.assertEqual(loaded["content_hash"], content_hash(reordered))
+        self.assertNotEqual(loaded["content_hash"], content_hash(documents[1]))
+
+    def test_shadow_load_swaps_the_collection_in_with_a_rename(self):
+        self.collections["bigrams"] = MagicMock()
+        self.collections["bigrams"].index_information.return_value = {
+            "_id_": {"key": [("_id", 1)]},
+            "lookup": {"key": [("country", 1), ("state", 1), ("role", 1)], "unique": True},
+        }
+        shadow = self.collections.setdefault("bigrams" + SHADOW_SUFFIX, MagicMock())
+        shadow.index_information.return_value = {"lookup": {"key": [("country", 1), ("state", 1), ("role", 1)]}}
+
+        BulkLoader(self.mdb_client).load(bigrams_documents(3), "bigrams", shadow=True)
+
+        shadow.drop.assert_called_once()
+        shadow.create_index.assert_called_once_with([("country", 1), ("state", 1), ("role", 1)],
+                                                    name="lookup", unique=True)
+        self.assertEqual(self.mdb_client.bulk_upsert_documents.call_args.kwargs["col_name"], "bigrams" + SHADOW_SUFFIX)
+        shadow.rename.assert_called_once_with("bigrams", dropTarget=True)
+
+    def test_empty_shadow_load_keeps_the_live_collection(self):
+        with self.assertRaises(ValueError):
+            BulkLoader(self.mdb_client).load([], "qualified", shadow=True)
+        self.collections["qualified" + SHADOW_SUFFIX].rename.assert_not_called()
+        self.assertNotIn("metadata", self.collections)
+
+
+if __name__ == '__main__':
+    unittest.main()
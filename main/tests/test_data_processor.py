@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock
+from main.services.data_processor import DataProcessor
+from main.services.qualified_service import QualifiedService
+
+
+class TestDataProcessor(unittest.TestCase):
+    def setUp(self):
+        # Create a mock instance of QualifiedService
+        self.mock_service = MagicMock(spec=QualifiedService)
+
+    def test_process_bigram_data_reads_the_document_once(self):
+        self.mock_service.get_bigram_columns_by_country_state_role.return_value = {
+            "skills": ([["data", "analysis"]], [3.0]),
+            "tools": ([["power", "bi"], ["microsoft", "excel"]], [3.0, 1.0]),
+            "libraries": ([["react", "js"]], [2.0]),
+            "languages": ([["python", "sql"], ["net", "data"]], [1.0, 2.0]),
+        }
+        data_processor = DataProcessor(self.mock_service)
+
+        result = data_processor.process_bigram_data("United States", "NY", "Data Analyst")
+
+        self.mock_service.get_bigram_columns_by_country_state_role.assert_called_once()
+        self.assertEqual(result["skills"].to_json(), [{"skill": "data analysis", "percentage": 100.0}])
+        # Each word of a non-special bigram counts, so "excel" scores alongside "microsoft excel"; ties rank by token
+        self.assertEqual(result["tools"].to_json(), [{"tool": "powerbi", "percentage": 60.0},
+                                           {"tool": "excel", "percentage": 20.0},
+                                           {"tool": "microsoft excel", "percentage": 20.0}])
+        self.assertEqual(result["libraries"].to_json(), [{"library": "react.js", "percentage": 100.0}])
+        self.assertEqual(result["languages"].to_json()[0], {"language": ".net", "percentage": 50.0})
+
+    def test_aggregation_strategy_uses_totals_from_mongodb(self):
+        self.mock_service.get_top_bigram_tokens_by_country_state_role.return_value = {
+            "education": {"total": 10.0, "items": [{"token": "bachelor", "score": 6.0},
+                                                   {"token": "master", "score": 3.0}]}
+        }
+        data_processor = DataProcessor(self.mock_service, bigram_strategy="aggregation")
+
+        result = data_processor.process_education_data("United States", "NY", "Data Analyst")
+
+        self.mock_service.get_bigram_columns_by_country_state_role.assert_not_called()
+        self.assertEqual(result.to_json(), [{"id": "Bachelor", "label": "Bachelor", "value": 60.0},
+                                           {"id": "Master", "label": "Master", "value": 30.0}])
+
+    def test_process_role_state_map(self):
+        self.mock_service.get_role_counts_by_state_and_place_of_work.return_value = [
+            {"state": "NY", "place_of_work": "Remote", "count": 2},
+            {"state": "CA", "place_of_work": "Hybrid", "count": 5},
+            {"state": "NY", "place_of_work": "Hybrid", "count": 1},
+        ]
+        data_processor = DataProcessor(self.mock_service)
+
+        result = data_processor.process_role_state_map("United States", "Data Analyst")
+
+        self.mock_service.get_role_counts_by_state_and_place_of_work.assert_called_once_with(
+            "United States", "Data Analyst")
+        self.assertEqual([(entry["state"], entry["count"], entry["percentage"]) for entry in result],
+                         [("CA", 5, 62.5), ("NY", 3, 37.5)])
+        # Same balanced split as /details/workplace: 1 is added to each place of work
+        self.assertEqual(result[1]["workplace"], [{"id": "Hybrid", "label": "Hybrid", "value": 33.33},
+                                                  {"id": "On-Site", "label": "On-Site", "value": 16.67},
+                                                  {"id": "Remote", "label": "Remote", "value": 50.0}])
+
+    def test_unknown_strategy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            DataProcessor(self.mock_service, bigram_strategy="spark")
+
+
+if __name__ == '__main__':
+    unittest.main()
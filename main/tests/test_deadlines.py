@@ -0,0 +1,48 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+from pymongo.errors import ExecutionTimeout
+from main.mongodb.MongoHelper import MongoDBClient
+from main.services.exceptions import DeadlineExceededError
+from main.services.qualified_service import DEADLINE_EXCEEDED, QualifiedService
+from main.services.request_context import clear_request, start_request
+
+
+class TestDeadlines(unittest.TestCase):
+    def setUp(self):
+        # Create a mock instance of MongoDBClient
+        self.mock_mdb_client = MagicMock(spec=MongoDBClient)
+        self.qualified_service = QualifiedService(self.mock_mdb_client)
+
+    def tearDown(self):
+        clear_request()
+
+    def test_expired_deadline_fails_before_querying(self):
+        start_request("/details/country", timeout_ms=1)
+        time.sleep(0.005)
+
+        with self.assertRaises(DeadlineExceededError):
+            self.qualified_service.get_freq_grouped_by_state("United States")
+        self.mock_mdb_client.get_collection.return_value.aggregate.assert_not_called()
+
+    def test_server_timeout_is_reported_as_deadline_exceeded(self):
+        start_request("/details/workplace", timeout_ms=2000)
+        self.mock_mdb_client.get_collection.return_value.aggregate.side_effect = ExecutionTimeout("operation exceeded time limit", 50)
+        before = DEADLINE_EXCEEDED.value(endpoint="/details/workplace")
+
+        with self.assertRaises(DeadlineExceededError):
+            self.qualified_service.get_place_of_work_count_grouped_by_role_and_state(
+                "United States", "NY", "Data Analyst")
+        self.assertEqual(DEADLINE_EXCEEDED.value(endpoint="/details/workplace"), before + 1)
+
+    def test_queries_run_normally_within_the_deadline(self):
+        start_request("/details/country", timeout_ms=2000)
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = [{"_id": "NY", "count": 10}]
+
+        result = self.qualified_service.get_freq_grouped_by_state("United States")
+
+        self.assertEqual(result, [{"state": "NY", "count": 10}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import random
+import unittest
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.data_processor import DataProcessor
+from main.services.exceptions import DataUnavailableError
+from main.services.export import with_completion_line
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.records import json_default
+from main.utilities.jsonl import ndjson_chunks
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        documents = [make_bigrams_document(country, state, f"role {i}", 30, rng)
+                     for country, state in (("United States", "NY"), ("Canada", "ON"), ("United States", "CA"))
+                     for i in range(3)]
+        self.processor = DataProcessor(InMemoryQualifiedService([], documents))
+
+    def test_results_match_the_details_endpoints(self):
+        results = list(self.processor.iter_results())
+        self.assertEqual(len(results), 9)
+        keys = [(result["country"], result["state"], result["role"]) for result in results]
+        self.assertEqual(keys, sorted(keys))
+        for result in results:
+            key = (result["country"], result["state"], result["role"])
+            for category, entries in self.processor.process_bigram_data(*key).items():
+                self.assertEqual(result[category], entries)
+            self.assertEqual(result["education"], self.processor.process_education_data(*key))
+
+    def test_country_filter(self):
+        self.assertEqual({result["country"] for result in self.processor.iter_results("Canada")}, {"Canada"})
+
+    def test_ndjson_chunks(self):
+        chunks = list(ndjson_chunks(self.processor.iter_results(), documents_per_chunk=4, default=json_default))
+        self.assertEqual(len(chunks), 3)
+        lines = b"".join(chunks).decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [json.loads(json.dumps(result, default=json_default)) for result in self.processor.iter_results()])
+        self.assertEqual(list(ndjson_chunks([])), [])
+
+    def test_export_ends_with_a_completion_line(self):
+        lines = b"".join(with_completion_line(ndjson_chunks(self.processor.iter_results(), documents_per_chunk=4,
+                                                            default=json_default))).splitlines()
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(json.loads(lines[-1]), {"complete": True, "count": 9})
+
+    def test_failure_after_the_first_chunk_is_reported_in_the_last_line(self):
+        def results():
+            yield from self.processor.iter_results("Canada")
+            raise DataUnavailableError("Error reading bigrams documents")
+
+        lines = b"".join(with_completion_line(ndjson_chunks(results(), documents_per_chunk=2,
+                                                            default=json_default))).splitlines()
+        # The second chunk was being filled when the read failed, so only the first one was sent
+        self.assertEqual(json.loads(lines[-1]), {"complete": False, "error": "DataUnavailableError", "count": 2})
+        self.assertEqual(len(lines), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+from pymongo.errors import ServerSelectionTimeoutError
+from main.api.health import ReadinessChecker
+from main.mongodb.pool_monitor import PoolStatsListener
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPoolStatsListener(unittest.TestCase):
+    def test_checkouts_waits_and_failures(self):
+        listener = PoolStatsListener(max_pool_size=10)
+        for _ in range(3):
+            listener.connection_check_out_started(MagicMock())
+        listener.connection_checked_out(MagicMock(duration=0.02))
+        listener.connection_checked_out(MagicMock(duration=0.005))
+        listener.connection_check_out_failed(MagicMock(reason="timeout"))
+        listener.connection_checked_in(MagicMock())
+
+        self.assertEqual(listener.snapshot(), {"checked_out": 1, "waiting": 0, "max_pool_size": 10,
+                                               "checkout_failures": 1, "max_wait_ms": 20.0})
+        # The longest wait is measured between two snapshots
+        self.assertEqual(listener.snapshot()["max_wait_ms"], 0.0)
+
+
+class TestReadinessChecker(unittest.TestCase):
+    def setUp(self):
+        self.services = MagicMock()
+        self.services.config = {"services": {"backend": "mongo"}}
+        self.services.mongo_client.ping.return_value = 0.01
+        self.services.pool_stats = PoolStatsListener(max_pool_size=10)
+        self.services.cache_state.return_value = {"role_index_warm": False, "result_cache_entries": 0}
+        self.clock = FakeClock()
+        self.checker = ReadinessChecker(self.services, {"cache_seconds": 2, "max_ping_ms": 100}, clock=self.clock)
+
+    def check(self):
+        return asyncio.run(self.checker.check())
+
+    def test_ready_when_every_check_passes(self):
+        result = self.check()
+        self.assertTrue(result["ready"])
+        self.assertEqual(result["checks"]["mongo"], {"ok": True, "ping_ms": 10.0})
+        self.assertEqual(result["checks"]["threadpool"]["waiting"], 0)
+
+    def test_slow_or_failing_ping_is_not_ready(self):
+        self.services.mongo_client.ping.return_value = 0.5
+        self.assertFalse(self.check()["ready"])
+
+        self.clock.now += 5
+        self.services.mongo_client.ping.side_effect = ServerSelectionTimeoutError("no servers")
+        result = self.check()
+        self.assertFalse(result["ready"])
+        self.assertEqual(result["checks"]["mongo"], {"ok": False, "error": "ServerSelectionTimeoutError"})
+
+    def test_pool_waiters_and_cold_caches(self):
+        for _ in range(9):
+            self.services.pool_stats.connection_check_out_started(MagicMock())
+        self.assertFalse(self.check()["checks"]["pool"]["ok"])
+
+        checker = ReadinessChecker(self.services, {"require_warm": True, "max_pool_waiting": 20})
+        self.assertFalse(asyncio.run(checker.check())["ready"])
+        self.services.cache_state.return_value = {"role_index_warm": True, "result_cache_entries": 3}
+        checker.cache_seconds = 0
+        self.assertTrue(asyncio.run(checker.check())["ready"])
+
+    def test_results_are_reused_within_the_interval(self):
+        self.check()
+        self.clock.now += 1
+        self.check()
+        self.assertEqual(self.services.mongo_client.ping.call_count, 1)
+        self.clock.now += 2
+        self.check()
+        self.assertEqual(self.services.mongo_client.ping.call_count, 2)
+
+    def test_memory_backend_does_not_ping(self):
+        self.services.config = {"services": {"backend": "memory"}}
+        self.services.pool_stats = None
+        self.assertTrue(self.check()["ready"])
+        self.services.mongo_client.ping.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
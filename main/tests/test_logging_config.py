@@ -0,0 +1,91 @@
+import logging
+import unittest
+from unittest.mock import MagicMock
+from main.services.request_context import clear_request, start_request
+from main.utilities.logging_config import DeferredQueueHandler, RequestLogSampler, configure_logging, stop_logging
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_record(level, msg="message %s", args=("arg",)):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+class TestRequestLogSampler(unittest.TestCase):
+    def tearDown(self):
+        clear_request()
+
+    def test_records_outside_a_request_always_pass(self):
+        sampler = RequestLogSampler(0.0)
+        self.assertTrue(sampler.filter(make_record(logging.INFO)))
+
+    def test_warnings_always_pass(self):
+        start_request("/details/operations")
+        sampler = RequestLogSampler(0.0)
+        self.assertTrue(sampler.filter(make_record(logging.WARNING)))
+        self.assertFalse(sampler.filter(make_record(logging.INFO)))
+
+    def test_decision_is_taken_once_per_request(self):
+        rng = MagicMock()
+        rng.random.side_effect = [0.05, 0.5]
+        sampler = RequestLogSampler(0.1, rng=rng)
+
+        start_request("/details/operations")
+        self.assertTrue(sampler.filter(make_record(logging.INFO)))
+        self.assertTrue(sampler.filter(make_record(logging.DEBUG)))
+
+        start_request("/details/education")
+        self.assertFalse(sampler.filter(make_record(logging.INFO)))
+        self.assertFalse(sampler.filter(make_record(logging.INFO)))
+        self.assertEqual(rng.random.call_count, 2)
+
+
+class TestConfigureLogging(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved_handlers = root.handlers[:]
+        self.saved_level = root.level
+
+    def tearDown(self):
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.saved_level)
+
+    def test_empty_section_leaves_logging_alone(self):
+        self.assertIsNone(configure_logging({}))
+        self.assertEqual(logging.getLogger().handlers, self.saved_handlers)
+
+    def test_records_reach_the_handlers_through_the_queue(self):
+        handler = RecordingHandler()
+        listener = configure_logging({"level": "warning"}, handlers=[handler])
+        root = logging.getLogger()
+        self.assertEqual(len(root.handlers), 1)
+        self.assertIsInstance(root.handlers[0], DeferredQueueHandler)
+
+        logging.info("dropped by level")
+        logging.warning("kept: %s", "usa")
+        stop_logging(listener)
+
+        self.assertEqual([record.getMessage() for record in handler.records], ["kept: usa"])
+        self.assertEqual(root.handlers, [])
+
+    def test_messages_are_not_formatted_on_the_calling_thread(self):
+        handler = DeferredQueueHandler(MagicMock())
+        record = make_record(logging.INFO)
+        self.assertIs(handler.prepare(record), record)
+        self.assertEqual(record.msg, "message %s")
+        self.assertEqual(record.args, ("arg",))
+
+
+if __name__ == '__main__':
+    unittest.main()
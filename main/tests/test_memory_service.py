@@ -0,0 +1,155 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from main.api.app_context import AppServices
+from main.benchmarks.synthetic import make_bigrams_document
+from main.benchmarks.verify_bigram_aggregation import normalise
+from main.services.data_processor import DataProcessor
+from main.services.memory_service import InMemoryQualifiedService
+
+
+QUALIFIED = [
+    {"country": "United States", "state": "CA", "role": "data engineer", "place_of_work": "Remote"},
+    {"country": "United States", "state": "CA", "role": "data engineer", "place_of_work": "Hybrid"},
+    {"country": "United States", "state": "CA", "role": "data engineer", "place_of_work": "Hybrid"},
+    {"country": "United States", "state": "NY", "role": "data analyst", "place_of_work": "On-Site"},
+    {"country": "United States", "state": "All", "role": "data engineer", "place_of_work": "Remote"},
+    {"country": "Canada", "state": "ON", "role": "data engineer", "place_of_work": "Remote"},
+]
+
+BIGRAMS = [
+    {
+        "country": "United States", "state": "CA", "role": "data engineer",
+        "tools": [{"bigram": ["power", "bi"], "score": 3}, {"bigram": ["microsoft", "excel"], "score": 1}],
+        "skills": [{"bigram": ["data", "analysis"], "score": 2}],
+        "education": [{"bigram": ["bachelor", "degree"], "score": 4}],
+    },
+    {"country": "United States", "state": "NY", "role": "data analyst"},
+    {"country": "Canada", "state": "ON", "role": "data engineer"},
+]
+
+
+class TestInMemoryQualifiedService(unittest.TestCase):
+    def setUp(self):
+        self.service = InMemoryQualifiedService(QUALIFIED, BIGRAMS)
+
+    def test_place_of_work_counts_are_sorted_ascending(self):
+        self.assertEqual(
+            self.service.get_place_of_work_count_grouped_by_role_and_state("United States", "CA", "data engineer"),
+            [{"_id": "Remote", "count": 1}, {"_id": "Hybrid", "count": 2}])
+        self.assertEqual(self.service.get_place_of_work_count_grouped_by_role_and_state("Canada", "QC", "x"), [])
+
+    def test_state_and_role_counts_exclude_all(self):
+        self.assertEqual(self.service.get_freq_grouped_by_state("United States"),
+                         [{"state": "CA", "count": 3}, {"state": "NY", "count": 1}])
+        self.assertEqual(self.service.get_role_posting_counts("United States"),
+                         {"data engineer": 3, "data analyst": 1})
+
+    def test_role_counts_by_state_and_place_of_work(self):
+        self.assertEqual(
+            sorted(self.service.get_role_counts_by_state_and_place_of_work("United States", "data engineer"),
+                   key=lambda entry: entry["place_of_work"]),
+            [{"state": "CA", "place_of_work": "Hybrid", "count": 2}, {"state": "CA", "place_of_work": "Remote", "count": 1}])
+
+    def test_roles_come_from_the_bigrams_documents(self):
+        self.assertEqual(self.service.get_roles_by_country_and_state("United States"), ["data analyst", "data engineer"])
+        self.assertEqual(self.service.get_roles_by_country_and_state("Mexico"), [])
+
+    def test_columns_and_missing_keys(self):
+        columns = self.service.get_bigram_columns_by_country_state_role("United States", "CA", "data engineer")
+        self.assertEqual(columns["tools"], ([["power", "bi"], ["microsoft", "excel"]], [3, 1]))
+        self.assertEqual(columns["languages"], ([], []))
+        self.assertEqual(self.service.get_bigram_columns_by_country_state_role("Canada", "BC", "x", ("education",)),
+                         {"education": ([], [])})
+
+    def test_bigram_max_items_keeps_the_highest_scores(self):
+        service = InMemoryQualifiedService(QUALIFIED, BIGRAMS, bigram_max_items=1)
+        columns = service.get_bigram_columns_by_country_state_role("United States", "CA", "data engineer", ("tools",))
+        self.assertEqual(columns["tools"], ([["power", "bi"]], [3]))
+
+    def test_top_tokens(self):
+        top = self.service.get_top_bigram_tokens_by_country_state_role(
+            "United States", "CA", "data engineer", {"tools": 2, "languages": 5})
+        self.assertEqual(top["tools"], {"total": 5, "items": [{"token": "powerbi", "score": 3},
+                                                             {"token": "excel", "score": 1}]})
+        self.assertEqual(top["languages"], {"total": 0, "items": []})
+
+    def test_both_strategies_give_the_same_results(self):
+        rng = random.Random(7)
+        documents = [make_bigrams_document("United States", "CA", f"role {i}", 50, rng) for i in range(5)]
+        service = InMemoryQualifiedService([], documents)
+        python, aggregation = DataProcessor(service, "python"), DataProcessor(service, "aggregation")
+        for i in range(5):
+            args = ("United States", "CA", f"role {i}")
+            self.assertEqual(python.process_bigram_data(*args), aggregation.process_bigram_data(*args))
+            self.assertEqual(python.process_education_data(*args), aggregation.process_education_data(*args))
+
+    def test_verification_script_compares_both_strategies(self):
+        rng = random.Random(11)
+        service = InMemoryQualifiedService([], [make_bigrams_document("United States", "CA", "role", 50, rng)])
+        args = ("United States", "CA", "role")
+        results = [(processor.process_bigram_data(*args), processor.process_education_data(*args))
+                   for processor in (DataProcessor(service, "python"), DataProcessor(service, "aggregation"))]
+        (python_data, python_education), (aggregation_data, aggregation_education) = results
+        for category in python_data:
+            self.assertEqual(normalise(python_data[category]), normalise(aggregation_data[category]))
+            self.assertIn("percentage", normalise(python_data[category])[0])
+        self.assertEqual(normalise(python_education), normalise(aggregation_education))
+
+    def test_both_strategies_break_ties_at_the_cut_off_the_same_way(self):
+        # Every score ties and the tokens are accumulated in reverse order, so only the tie-break decides the top 5
+        skills = ["zookeeper", "yarn", "xml", "webpack", "vue", "unix", "terraform"]
+        document = {
+            "country": "United States", "state": "CA", "role": "tied",
+            "skills": [{"bigram": [skill, "ops"], "score": 1} for skill in skills],
+            "education": [{"bigram": [level, "degree"], "score": 2}
+                          for level in ("master", "doctorate", "bachelor", "associate")],
+        }
+        service = InMemoryQualifiedService([], [document])
+        python, aggregation = DataProcessor(service, "python"), DataProcessor(service, "aggregation")
+        args = ("United States", "CA", "tied")
+
+        python_data = python.process_bigram_data(*args)
+        self.assertEqual(python_data, aggregation.process_bigram_data(*args))
+        self.assertEqual(python_data["skills"].tokens, tuple(f"{skill} ops" for skill in sorted(skills)[:5]))
+        education = python.process_education_data(*args)
+        self.assertEqual(education, aggregation.process_education_data(*args))
+        self.assertEqual(education.tokens, ("associate", "bachelor", "doctorate"))
+
+    def test_loads_mongoexport_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            qualified_path = os.path.join(tmp, "qualified.jsonl")
+            bigrams_path = os.path.join(tmp, "bigrams.jsonl")
+            with open(qualified_path, "w") as f:
+                for document in QUALIFIED:
+                    f.write(json.dumps({"_id": {"$oid": "0123456789abcdef01234567"}, **document}) + "\n")
+                f.write("\n")
+            with open(bigrams_path, "w") as f:
+                f.write("\n".join(json.dumps(document) for document in BIGRAMS))
+
+            service = InMemoryQualifiedService.from_jsonl(qualified_path, bigrams_path)
+        self.assertEqual(service.get_data_version(), "memory:3:6")
+        self.assertEqual(service.get_role_posting_counts("Canada"), {"data engineer": 1})
+
+    def test_app_services_use_the_memory_backend_without_mongo(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, documents in (("qualified", QUALIFIED), ("bigrams", BIGRAMS)):
+                with open(os.path.join(tmp, f"{name}.jsonl"), "w") as f:
+                    f.write("\n".join(json.dumps(document) for document in documents))
+            services = AppServices({
+                "mongo": {},
+                "services": {"backend": "memory",
+                             "memory_qualified_path": os.path.join(tmp, "qualified.jsonl"),
+                             "memory_bigrams_path": os.path.join(tmp, "bigrams.jsonl")},
+                "resilience": {"enabled": True},
+            })
+            self.assertIsInstance(services.qualified_service, InMemoryQualifiedService)
+            self.assertEqual(services.role_index.roles("Canada"), ["data engineer"])
+            self.assertIsNone(services._mongo_client)
+            services.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
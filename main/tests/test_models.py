@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from pydantic import ValidationError
+from main.api.models import FullRequestData, RankedRequestData, RolesRequestData, SimilarRolesRequest
+from main.api.tech_mastery_api import check_role, get_workplace
+from main.services.exceptions import DeadlineExceededError
+from main.services.role_index import RoleIndex
+
+
+class TestRequestValidation(unittest.TestCase):
+    def test_states_are_checked_against_the_country(self):
+        self.assertEqual(FullRequestData(country="United States", state="NY", role="Data Analyst").state, "NY")
+        self.assertEqual(FullRequestData(country="Canada", state="All", role="Data Analyst").state, "All")
+        for model in (FullRequestData, RankedRequestData, SimilarRolesRequest, RolesRequestData):
+            with self.assertRaises(ValidationError) as raised:
+                model(country="Canada", state="NY", role="Data Analyst")
+            error, = raised.exception.errors()
+            self.assertEqual(error["loc"], ("state",))
+            self.assertIn("Invalid province for Canada", error["msg"])
+
+    def test_invalid_country_reports_only_the_country(self):
+        with self.assertRaises(ValidationError) as raised:
+            FullRequestData(country="Mexico", state="NY", role="Data Analyst")
+        self.assertEqual([error["loc"] for error in raised.exception.errors()], [("country",)])
+
+
+class TestCheckRole(unittest.TestCase):
+    def setUp(self):
+        self.service = MagicMock()
+        self.service.get_roles_by_country_and_state.return_value = ["Data Analyst"]
+        self.service.get_role_posting_counts.return_value = {"Data Analyst": 3}
+        version_watcher = MagicMock()
+        version_watcher.current.return_value = "v1"
+        self.role_index = RoleIndex(self.service, version_watcher)
+        self.data_processor = MagicMock()
+        self.data_processor.process_place_of_work_data.return_value = [{"place_of_work": "Remote"}]
+
+    def get_workplace(self, role):
+        request_data = FullRequestData(country="Canada", state="ON", role=role)
+        return get_workplace(request_data, credentials=None, data_processor=self.data_processor,
+                             role_index=self.role_index)
+
+    def test_unknown_roles_are_rejected_with_422(self):
+        self.assertEqual(self.get_workplace("Data Analyst"), {"workplace": [{"place_of_work": "Remote"}]})
+        with self.assertRaises(HTTPException) as raised:
+            self.get_workplace("Astronaut")
+        self.assertEqual(raised.exception.status_code, 422)
+        self.assertEqual(raised.exception.detail[0]["loc"], ["body", "role"])
+        self.data_processor.process_place_of_work_data.assert_called_once()
+
+    def test_failed_roles_load_lets_the_request_through(self):
+        self.service.get_roles_by_country_and_state.side_effect = DeadlineExceededError("distinct timed out")
+        self.assertEqual(self.get_workplace("Astronaut"), {"workplace": [{"place_of_work": "Remote"}]})
+        self.data_processor.process_place_of_work_data.assert_called_once_with(
+            country="Canada", state="ON", role="Astronaut")
+
+    def test_roles_are_not_checked_when_the_country_has_none(self):
+        self.service.get_roles_by_country_and_state.return_value = []
+        check_role(self.role_index, "Canada", "Astronaut")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import multiprocessing
+import random
+import unittest
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.data_processor import DataProcessor, score_bigram_document
+from main.services.exceptions import DeadlineExceededError
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.offload import ScoringOffloader
+from main.services.request_context import clear_request, start_request
+
+
+def byte_length(raw):
+    return len(raw)
+
+
+class PendingExecutor:
+    """Accepts work that never completes."""
+
+    def submit(self, fn, *args):
+        return Future()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class BrokenExecutor(PendingExecutor):
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+
+class TestScoringOffloader(unittest.TestCase):
+    def tearDown(self):
+        clear_request()
+
+    def test_small_documents_stay_inline(self):
+        factory = MagicMock()
+        offloader = ScoringOffloader(factory, min_bytes=10)
+        self.assertEqual(offloader.run(byte_length, b"small"), 5)
+        self.assertIsNone(offloader.run(lambda raw: raw, None))
+        factory.assert_not_called()
+
+    def test_large_documents_go_to_the_pool(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.submit = MagicMock(wraps=executor.submit)
+        offloader = ScoringOffloader(lambda: executor, min_bytes=10)
+        self.assertEqual(offloader.run(byte_length, b"x" * 20), 20)
+        executor.submit.assert_called_once_with(byte_length, b"x" * 20)
+        offloader.close()
+
+    def test_deadline_while_waiting_for_the_pool(self):
+        offloader = ScoringOffloader(PendingExecutor, min_bytes=1)
+        start_request("/details/operations", timeout_ms=20)
+        with self.assertRaises(DeadlineExceededError):
+            offloader.run(byte_length, b"large")
+
+    def test_broken_pool_falls_back_inline_and_is_recreated(self):
+        factory = MagicMock(side_effect=BrokenExecutor)
+        offloader = ScoringOffloader(factory, min_bytes=1)
+        self.assertEqual(offloader.run(byte_length, b"large"), 5)
+        self.assertEqual(offloader.run(byte_length, b"large"), 5)
+        self.assertEqual(factory.call_count, 2)
+
+    def test_data_processor_results_match_inline_scoring(self):
+        rng = random.Random(3)
+        service = InMemoryQualifiedService([], [make_bigrams_document("United States", "All", "engineer", 300, rng)])
+        offloader = ScoringOffloader(lambda: ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")),
+                                     min_bytes=1)
+        try:
+            offloaded = DataProcessor(service, offloader=offloader)
+            inline = DataProcessor(service)
+            args = ("United States", "All", "engineer")
+            self.assertEqual(offloaded.process_bigram_data(*args), inline.process_bigram_data(*args))
+            self.assertEqual(offloaded.process_education_data(*args), inline.process_education_data(*args))
+            self.assertEqual(score_bigram_document(None)["tools"].to_json(), [])
+        finally:
+            offloader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
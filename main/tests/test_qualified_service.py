@@ -1,5 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
+import bson
+from bson.raw_bson import RawBSONDocument
 from main.services.qualified_service import QualifiedService
 from main.mongodb.MongoHelper import MongoDBClient
 
@@ -9,15 +11,12 @@ class TestQualifiedService(unittest.TestCase):
         # Create a mock instance of MongoDBClient
         self.mock_mdb_client = MagicMock(spec=MongoDBClient)
 
-        # Mock the collection attribute of MongoDBClient
-        self.mock_mdb_client.collection = MagicMock()
-
         # Initialize QualifiedService with the mock MongoDB client
         self.qualified_service = QualifiedService(self.mock_mdb_client)
 
     def test_get_place_of_work_count_grouped_by_role_and_state(self):
         # Setup mock response
-        self.mock_mdb_client.collection.aggregate.return_value = [
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = [
             {"_id": "On-site", "count": 5},
             {"_id": "Remote", "count": 3}
         ]
@@ -42,7 +41,7 @@ class TestQualifiedService(unittest.TestCase):
         }])
 
         # Call the method
-        result = self.qualified_service.get_bigram_data_by_country_state_role(
+        result = self.qualified_service.get_bigram_details_by_country_state_role(
             "United States", "NY", "Data Analyst"
         )
 
@@ -72,7 +71,7 @@ class TestQualifiedService(unittest.TestCase):
 
     def test_get_freq_grouped_by_state(self):
         # Setup mock response
-        self.mock_mdb_client.collection.aggregate.return_value = [
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = [
             {"_id": "NY", "count": 10},
             {"_id": "CA", "count": 8}
         ]
@@ -85,6 +84,103 @@ class TestQualifiedService(unittest.TestCase):
         self.assertEqual(result[0]["state"], "NY")
         self.assertEqual(result[0]["count"], 10)
 
+    def test_reads_never_switch_the_shared_collection(self):
+        # Requests run in threadpool threads, so no read may change the client's current collection
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = []
+        self.mock_mdb_client.query_documents.return_value = iter([])
+        self.qualified_service.get_place_of_work_count_grouped_by_role_and_state("Canada", "ON", "Data Analyst")
+        self.qualified_service.get_bigram_details_by_country_state_role("Canada", "ON", "Data Analyst")
+        self.qualified_service.get_education_data_by_country_state_role("Canada", "ON", "Data Analyst")
+        self.qualified_service.get_freq_grouped_by_state("Canada")
+        self.qualified_service.get_roles_by_country_and_state("Canada")
+
+        self.mock_mdb_client.change_database_and_collection.assert_not_called()
+        self.assertEqual(self.mock_mdb_client.query_documents.call_args.kwargs["col_name"], "bigrams")
+        self.mock_mdb_client.get_collection.assert_called_with("bigrams")
+
+    def test_get_bigram_columns_by_country_state_role(self):
+        # Setup mock response in the column form produced by the $project stage
+        raw_document = RawBSONDocument(bson.encode({
+            "tools": {"bigrams": [["power", "bi"], ["microsoft", "excel"]], "scores": [2.0, 1.5]},
+            "education": {"bigrams": [], "scores": []}
+        }))
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = iter([raw_document])
+
+        # Call the method
+        result = self.qualified_service.get_bigram_columns_by_country_state_role(
+            "United States", "NY", "Data Analyst", categories=("tools", "education")
+        )
+
+        # Assert the result
+        self.assertEqual(result["tools"], ([["power", "bi"], ["microsoft", "excel"]], [2.0, 1.5]))
+        self.assertEqual(result["education"], ([], []))
+        pipeline = self.mock_mdb_client.get_collection.return_value.aggregate.call_args[0][0]
+        self.assertEqual(set(pipeline[-1]["$project"]), {"_id", "tools", "education"})
+
+    def test_get_bigram_columns_slices_server_side_when_limited(self):
+        self.qualified_service.bigram_max_items = 50
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = iter([])
+
+        result = self.qualified_service.get_bigram_columns_by_country_state_role(
+            "United States", "NY", "Data Analyst", categories=("skills",)
+        )
+
+        self.assertEqual(result, {"skills": ([], [])})
+        pipeline = self.mock_mdb_client.get_collection.return_value.aggregate.call_args[0][0]
+        items = pipeline[-1]["$project"]["skills"]["$let"]["vars"]["items"]
+        self.assertEqual(items["$slice"][1], 50)
+
+    def test_get_role_counts_by_state_and_place_of_work(self):
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = iter([
+            {"_id": {"state": "NY", "place_of_work": "Remote"}, "count": 4},
+            {"_id": {"state": "CA"}, "count": 1},
+        ])
+
+        result = self.qualified_service.get_role_counts_by_state_and_place_of_work("United States", "Data Analyst")
+
+        self.assertEqual(result, [{"state": "NY", "place_of_work": "Remote", "count": 4},
+                                  {"state": "CA", "place_of_work": None, "count": 1}])
+        self.mock_mdb_client.get_collection.assert_called_with("qualified")
+        pipeline = self.mock_mdb_client.get_collection.return_value.aggregate.call_args[0][0]
+        self.assertEqual(pipeline[0]["$match"], {"country": "United States", "role": "Data Analyst", "state": {"$ne": "All"}})
+        self.assertEqual(len(pipeline), 2)
+
+    def test_iter_bigram_columns_reads_one_cursor(self):
+        columns = {"bigrams": [["data", "analysis"]], "scores": [2.0]}
+        cursor = MagicMock()
+        cursor.__enter__.return_value = iter([
+            {"country": "Canada", "state": "ON", "role": "Data Analyst", "skills": columns, "education": columns},
+        ])
+        self.mock_mdb_client.get_collection.return_value.aggregate.return_value = cursor
+
+        result = list(self.qualified_service.iter_bigram_columns("Canada", categories=("skills", "education"),
+                                                                 batch_size=500))
+
+        self.assertEqual(result, [(("Canada", "ON", "Data Analyst"),
+                                   {"skills": ([["data", "analysis"]], [2.0]),
+                                    "education": ([["data", "analysis"]], [2.0])})])
+        aggregate = self.mock_mdb_client.get_collection.return_value.aggregate
+        aggregate.assert_called_once()
+        self.assertEqual(aggregate.call_args[1]["batchSize"], 500)
+        self.assertEqual(aggregate.call_args[0][0][0]["$match"], {"country": "Canada"})
+        cursor.__exit__.assert_called_once()
+
+    def test_iter_bigram_columns_reads_selected_keys_in_batches(self):
+        cursor = MagicMock()
+        cursor.__enter__.side_effect = lambda: iter([])
+        aggregate = self.mock_mdb_client.get_collection.return_value.aggregate
+        aggregate.return_value = cursor
+        keys = [("Canada", "ON", f"role {i}") for i in range(3)]
+
+        list(self.qualified_service.iter_bigram_columns(batch_size=2, keys=keys))
+
+        matches = [call[0][0][0]["$match"] for call in aggregate.call_args_list]
+        self.assertEqual(matches, [
+            {"$or": [{"country": "Canada", "state": "ON", "role": "role 0"},
+                     {"country": "Canada", "state": "ON", "role": "role 1"}]},
+            {"$or": [{"country": "Canada", "state": "ON", "role": "role 2"}]},
+        ])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,94 @@
+import random
+import unittest
+from unittest.mock import MagicMock
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.data_processor import DataProcessor, rank_scores
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.rankings import RankedScores, RankingStore
+from main.services.request_context import clear_request, current_request, start_request
+
+
+class TestRankedScores(unittest.TestCase):
+    def test_order_matches_rank_scores(self):
+        rng = random.Random(1)
+        # Small integer scores give many ties on the rounded percentage
+        token_scores = {f"token {i}": rng.randrange(1, 20) for i in range(300)}
+        ranked = RankedScores(token_scores)
+        expected = rank_scores(token_scores, "token", len(token_scores)).to_json()
+        self.assertEqual([{"token": token, "percentage": percentage} for token, percentage in ranked.page(0, 300)],
+                         expected)
+
+    def test_pages_and_covered_percentage(self):
+        ranked = RankedScores({"a": 1, "b": 4, "c": 3, "d": 2})
+        self.assertEqual(len(ranked), 4)
+        self.assertEqual(ranked.page(1, 2), [("c", 30.0), ("d", 20.0)])
+        self.assertEqual(ranked.page(3, 10), [("a", 10.0)])
+        self.assertEqual(ranked.page(10, 5), [])
+        self.assertEqual(ranked.covered_percentage(2), 70.0)
+        self.assertEqual(ranked.covered_percentage(50), 100.0)
+
+    def test_zero_total(self):
+        ranked = RankedScores({"a": 0, "b": 0})
+        self.assertEqual(ranked.page(0, 5), [("a", 0), ("b", 0)])
+        self.assertEqual(ranked.covered_percentage(1), 0)
+        self.assertEqual(RankedScores({}).page(0, 5), [])
+
+
+class TestRankingStore(unittest.TestCase):
+    def test_rankings_are_built_once_per_data_version(self):
+        watcher = MagicMock()
+        watcher.current.return_value = "v1"
+        store = RankingStore(version_watcher=watcher)
+        build = MagicMock(side_effect=lambda categories: {c: RankedScores({c: 1}) for c in categories})
+
+        store.get("United States", "CA", "engineer", ("skills", "tools"), build)
+        store.get("United States", "CA", "engineer", ("tools", "education"), build)
+        self.assertEqual([call.args[0] for call in build.call_args_list], [("skills", "tools"), ("education",)])
+
+        watcher.current.return_value = "v2"
+        store.get("United States", "CA", "engineer", ("tools",), build)
+        self.assertEqual(build.call_args.args[0], ("tools",))
+
+    def test_rankings_built_from_stale_data_are_not_kept(self):
+        store = RankingStore()
+        build = MagicMock(side_effect=lambda categories: {c: RankedScores({c: 1}) for c in categories})
+        start_request("/details/operations")
+        self.addCleanup(clear_request)
+        current_request().mark_stale(120)
+
+        store.get("United States", "CA", "engineer", ("tools",), build)
+        store.get("United States", "CA", "engineer", ("tools",), build)
+        self.assertEqual(build.call_count, 2)
+
+
+class TestRankedProcessing(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(2)
+        self.service = InMemoryQualifiedService([], [make_bigrams_document("United States", "CA", "engineer", 200, rng)])
+        self.service.get_bigram_columns_by_country_state_role = MagicMock(
+            wraps=self.service.get_bigram_columns_by_country_state_role)
+        self.processor = DataProcessor(self.service)
+        self.args = ("United States", "CA", "engineer")
+
+    def test_first_page_matches_the_top_entries(self):
+        ranked = self.processor.process_ranked_bigram_data(*self.args, offset=0)
+        top = self.processor.process_bigram_data(*self.args)
+        for category, entries in top.items():
+            self.assertEqual(ranked[category], entries)
+        education = self.processor.process_ranked_education_data(*self.args)
+        self.assertEqual(education["education"], self.processor.process_education_data(*self.args))
+
+    def test_pages_are_slices_of_the_full_ranking(self):
+        full = self.processor.process_ranked_bigram_data(*self.args, top_k=1000)
+        page = self.processor.process_ranked_bigram_data(*self.args, top_k=20, offset=20)
+        self.assertEqual(page["skills"].to_json(), full["skills"].to_json()[20:40])
+        self.assertEqual(page["page"]["offset"], 20)
+        self.assertEqual(page["page"]["total"]["skills"], len(full["skills"]))
+        self.assertLess(page["page"]["covered_percentage"]["tools"], full["page"]["covered_percentage"]["tools"])
+        self.assertAlmostEqual(full["page"]["covered_percentage"]["tools"], 100.0)
+        # Both pages are served from one read of the document
+        self.assertEqual(self.service.get_bigram_columns_by_country_state_role.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
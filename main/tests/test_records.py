@@ -0,0 +1,39 @@
+import json
+import pickle
+import unittest
+from main.services.data_processor import rank_education_scores, rank_scores
+from main.services.records import RankedEducation, RankedTokens, Vocabulary, json_default
+
+
+class TestResultRecords(unittest.TestCase):
+    def test_json_formats(self):
+        tools = rank_scores({"docker": 1.0, "powerbi": 3.0}, "tool", 5)
+        self.assertEqual(tools.to_json(), [{"tool": "powerbi", "percentage": 75.0},
+                                           {"tool": "docker", "percentage": 25.0}])
+        education = rank_education_scores({"bachelor": 3.0, "master": 1.0}, 1)
+        self.assertEqual(json.loads(json.dumps({"education": education}, default=json_default)),
+                         {"education": [{"id": "Bachelor", "label": "Bachelor", "value": 75.0}]})
+
+    def test_tokens_are_shared_across_results(self):
+        # Built at run time, so the two strings start out as different objects
+        first = RankedTokens("skill", [" ".join(["data", "analysis"])], [100.0])
+        second = RankedTokens("skill", [" ".join(["data", "analysis"])], [50.0])
+        self.assertIs(first.tokens[0], second.tokens[0])
+        # Records scored in a worker process are interned again when unpickled
+        self.assertIs(pickle.loads(pickle.dumps(first)).tokens[0], first.tokens[0])
+        self.assertEqual(pickle.loads(pickle.dumps(RankedEducation(["phd"], [1.0]))), RankedEducation(["phd"], [1.0]))
+
+    def test_records_have_no_instance_dict(self):
+        self.assertFalse(hasattr(RankedTokens("tool", [], []), "__dict__"))
+        self.assertFalse(hasattr(RankedEducation([], []), "__dict__"))
+
+    def test_vocabulary_size_limit(self):
+        vocabulary = Vocabulary(max_size=1)
+        token = vocabulary.intern("sql")
+        self.assertIs(vocabulary.intern("".join(["s", "ql"])), token)
+        self.assertEqual(vocabulary.intern("python"), "python")
+        self.assertEqual(len(vocabulary), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
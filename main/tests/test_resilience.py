@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import MagicMock
+from main.services.data_processor import DataProcessor
+from main.services.data_version import DataVersionWatcher
+from main.services.exceptions import DataUnavailableError
+from main.services.qualified_service import QualifiedService
+from main.services.request_context import clear_request, current_request, start_request
+from main.services.resilience import CircuitBreaker, ResilientQualifiedService
+from main.services.role_index import RoleIndex
+
+
+class ImmediateExecutor:
+    """Runs background refreshes inline so tests can observe them."""
+
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_allows_one_trial(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+
+        # With a zero reset timeout the open circuit is immediately half-open
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_open_circuit_rejects_calls(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow_request())
+
+
+class TestResilientQualifiedService(unittest.TestCase):
+    def setUp(self):
+        # Create a mock instance of QualifiedService
+        self.mock_service = MagicMock(spec=QualifiedService)
+        self.mock_service.get_freq_grouped_by_state.return_value = [{"state": "NY", "count": 10}]
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        start_request("/details/country")
+
+    def tearDown(self):
+        clear_request()
+
+    def make_service(self, fresh_ttl):
+        return ResilientQualifiedService(self.mock_service, self.breaker, ImmediateExecutor(),
+                                         fresh_ttl=fresh_ttl, max_stale=3600)
+
+    def test_fresh_results_are_served_from_cache(self):
+        service = self.make_service(fresh_ttl=60)
+        service.get_freq_grouped_by_state("United States")
+        result = service.get_freq_grouped_by_state("United States")
+
+        self.assertEqual(result, [{"state": "NY", "count": 10}])
+        self.assertEqual(self.mock_service.get_freq_grouped_by_state.call_count, 1)
+        self.assertFalse(current_request().stale)
+
+    def test_stale_result_is_served_when_mongo_fails(self):
+        service = self.make_service(fresh_ttl=0)
+        service.get_freq_grouped_by_state("United States")
+        self.mock_service.get_freq_grouped_by_state.side_effect = DataUnavailableError("down")
+
+        result = service.get_freq_grouped_by_state("United States")
+
+        self.assertEqual(result, [{"state": "NY", "count": 10}])
+        self.assertTrue(current_request().stale)
+
+    def test_open_circuit_fails_fast_without_cached_result(self):
+        service = self.make_service(fresh_ttl=0)
+        self.mock_service.get_freq_grouped_by_state.side_effect = DataUnavailableError("down")
+        for _ in range(2):
+            with self.assertRaises(DataUnavailableError):
+                service.get_freq_grouped_by_state("Canada")
+
+        with self.assertRaises(DataUnavailableError):
+            service.get_freq_grouped_by_state("Canada")
+        self.assertEqual(self.mock_service.get_freq_grouped_by_state.call_count, 2)
+
+    def test_data_version_is_never_cached(self):
+        service = self.make_service(fresh_ttl=60)
+        self.mock_service.get_data_version.return_value = "v1"
+        service.get_data_version()
+        service.get_data_version()
+        self.assertEqual(self.mock_service.get_data_version.call_count, 2)
+
+    def test_aggregation_strategy_through_the_wrapper(self):
+        # top_k is passed as a dict, which must still make a usable cache key
+        self.mock_service.get_top_bigram_tokens_by_country_state_role.side_effect = lambda c, s, r, top_k: {
+            category: {"total": 4, "items": [{"token": "python", "score": 3}, {"token": "sql", "score": 1}]}
+            for category in top_k
+        }
+        processor = DataProcessor(self.make_service(fresh_ttl=60), bigram_strategy="aggregation")
+
+        for _ in range(2):
+            operations = processor.process_bigram_data("United States", "NY", "Data Analyst")
+            education = processor.process_education_data("United States", "NY", "Data Analyst")
+
+        self.assertEqual(operations["tools"].percentages, (75.0, 25.0))
+        self.assertEqual(education.tokens, ("python", "sql"))
+        self.assertEqual(self.mock_service.get_top_bigram_tokens_by_country_state_role.call_count, 2)
+
+    def test_results_of_an_older_data_version_are_not_served(self):
+        # The reported case: a role index must see the roles of the new data as soon as the version changes
+        self.mock_service.get_data_version.return_value = "v1"
+        self.mock_service.get_roles_by_country_and_state.return_value = ["Old Role"]
+        self.mock_service.get_role_posting_counts.return_value = {}
+        service = self.make_service(fresh_ttl=60)
+        role_index = RoleIndex(service, DataVersionWatcher(service, refresh_interval=0))
+        self.assertEqual(role_index.roles("Canada"), ["Old Role"])
+
+        self.mock_service.get_data_version.return_value = "v2"
+        self.mock_service.get_roles_by_country_and_state.return_value = ["Old Role", "New Role"]
+        self.assertTrue(role_index.has_role("Canada", "New Role"))
+        self.assertEqual(self.mock_service.get_roles_by_country_and_state.call_count, 2)
+
+    def test_document_reads_are_not_cached_but_use_the_breaker(self):
+        service = self.make_service(fresh_ttl=60)
+        self.mock_service.get_bigram_columns_raw_by_country_state_role.return_value = b"document"
+        for _ in range(2):
+            self.assertEqual(service.get_bigram_columns_raw_by_country_state_role("Canada", "ON", "r"), b"document")
+        self.assertEqual(self.mock_service.get_bigram_columns_raw_by_country_state_role.call_count, 2)
+        self.assertEqual(len(service._entries), 0)
+
+        self.mock_service.get_bigram_columns_raw_by_country_state_role.side_effect = DataUnavailableError("down")
+        for _ in range(2):
+            with self.assertRaises(DataUnavailableError):
+                service.get_bigram_columns_raw_by_country_state_role("Canada", "ON", "r")
+        with self.assertRaises(DataUnavailableError):
+            service.get_bigram_columns_raw_by_country_state_role("Canada", "ON", "r")
+        self.assertEqual(self.mock_service.get_bigram_columns_raw_by_country_state_role.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from main.services.data_processor import DataProcessor
+from main.services.data_version import DataVersionWatcher
+from main.services.records import RankedEducation, RankedTokens
+from main.services.request_context import clear_request, start_request
+from main.services.result_cache import (
+    MISSING, CachingDataProcessor, LocalLRUCache, SQLiteSharedCache, TieredResultCache,
+)
+
+
+class TestLocalLRUCache(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocalLRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIs(cache.get("b"), MISSING)
+
+
+class TestSQLiteSharedCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_entries_are_visible_to_other_workers_at_the_same_version(self):
+        SQLiteSharedCache(self.path).set("key", "v1", {"skills": [{"skill": "sql", "percentage": 100.0}]})
+        other_worker = SQLiteSharedCache(self.path)
+
+        self.assertEqual(other_worker.get("key", "v1"), {"skills": [{"skill": "sql", "percentage": 100.0}]})
+        self.assertIs(other_worker.get("key", "v2"), MISSING)
+
+    def test_result_records_round_trip(self):
+        value = {"skills": RankedTokens("skill", ["sql"], [100.0]), "education": RankedEducation(["master"], [40.0])}
+        SQLiteSharedCache(self.path).set("key", "v1", value)
+
+        self.assertEqual(SQLiteSharedCache(self.path).get("key", "v1"), value)
+
+    def test_size_limit_and_version_purge(self):
+        cache = SQLiteSharedCache(self.path, max_entries=3)
+        for index in range(5):
+            cache.set(f"key{index}", "v1", index)
+        cache.evict()
+        self.assertEqual(len(cache), 3)
+
+        cache.set("new", "v2", 1)
+        cache.purge_other_versions("v2")
+        self.assertEqual(len(cache), 1)
+
+
+class TestCachingDataProcessor(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.version_watcher = MagicMock(spec=DataVersionWatcher)
+        self.version_watcher.current.return_value = "v1"
+        self.mock_processor = MagicMock(spec=DataProcessor)
+        self.mock_processor.process_state_frequency_data.return_value = [{"state": "NY", "percentage": 100.0}]
+
+    def tearDown(self):
+        clear_request()
+        self.directory.cleanup()
+
+    def make_processor(self):
+        shared = SQLiteSharedCache(os.path.join(self.directory.name, "cache.sqlite"))
+        return CachingDataProcessor(self.mock_processor, TieredResultCache(LocalLRUCache(), shared, self.version_watcher))
+
+    def test_second_worker_is_served_from_the_shared_tier(self):
+        self.make_processor().process_state_frequency_data("United States")
+        result = self.make_processor().process_state_frequency_data("United States")
+
+        self.assertEqual(result, [{"state": "NY", "percentage": 100.0}])
+        self.assertEqual(self.mock_processor.process_state_frequency_data.call_count, 1)
+
+    def test_data_version_change_recomputes(self):
+        processor = self.make_processor()
+        processor.process_state_frequency_data("United States")
+        self.version_watcher.current.return_value = "v2"
+        processor.process_state_frequency_data("United States")
+
+        self.assertEqual(self.mock_processor.process_state_frequency_data.call_count, 2)
+
+    def test_results_built_from_stale_data_are_not_cached(self):
+        processor = self.make_processor()
+        start_request("/details/country").mark_stale(120)
+        processor.process_state_frequency_data("Canada")
+        clear_request()
+        processor.process_state_frequency_data("Canada")
+
+        self.assertEqual(self.mock_processor.process_state_frequency_data.call_count, 2)
+
+    def test_unknown_data_version_leaves_the_shared_tier_alone(self):
+        first = self.make_processor()
+        first.process_state_frequency_data("United States")
+
+        # A worker that cannot read the version yet must not purge the other workers' entries
+        self.version_watcher.current.return_value = ""
+        self.make_processor().process_state_frequency_data("United States")
+        self.assertEqual(len(first.result_cache.shared), 1)
+        self.assertEqual(self.mock_processor.process_state_frequency_data.call_count, 2)
+
+        self.version_watcher.current.return_value = "v1"
+        self.make_processor().process_state_frequency_data("United States")
+        self.assertEqual(self.mock_processor.process_state_frequency_data.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
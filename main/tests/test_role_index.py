@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from main.services.data_version import DataVersionWatcher
+from main.services.qualified_service import QualifiedService
+from main.services.request_context import clear_request, current_request, start_request
+from main.services.role_index import RoleIndex
+
+
+class TestRoleIndex(unittest.TestCase):
+    def setUp(self):
+        # Create a mock instance of QualifiedService
+        self.mock_service = MagicMock(spec=QualifiedService)
+        self.mock_service.get_data_version.return_value = "v1"
+        self.mock_service.get_roles_by_country_and_state.return_value = [
+            "Software Engineer", "Data Engineer", "Data Analyst", "Data Scientist", "Engineering Manager"
+        ]
+        self.mock_service.get_role_posting_counts.return_value = {
+            "Software Engineer": 40, "Data Engineer": 25, "Data Analyst": 30, "Engineering Manager": 5
+        }
+        self.version_watcher = DataVersionWatcher(self.mock_service, refresh_interval=0)
+        self.role_index = RoleIndex(self.mock_service, self.version_watcher)
+
+    def test_roles_are_sorted_by_name(self):
+        self.assertEqual(self.role_index.roles("United States"), [
+            "Data Analyst", "Data Engineer", "Data Scientist", "Engineering Manager", "Software Engineer"
+        ])
+
+    def test_search_ranks_full_name_prefix_then_postings(self):
+        matches = self.role_index.search("United States", "eng")
+
+        self.assertEqual([match["role"] for match in matches],
+                         ["Engineering Manager", "Software Engineer", "Data Engineer"])
+        self.assertEqual(matches[1], {"role": "Software Engineer", "count": 40})
+
+    def test_search_is_case_insensitive_and_limited(self):
+        matches = self.role_index.search("United States", "DATA", limit=2)
+
+        self.assertEqual(matches, [{"role": "Data Analyst", "count": 30}, {"role": "Data Engineer", "count": 25}])
+        self.assertEqual(self.role_index.search("United States", "data sc"), [{"role": "Data Scientist", "count": 0}])
+        self.assertEqual(self.role_index.search("United States", "nurse"), [])
+
+    def test_index_is_rebuilt_only_when_the_data_version_changes(self):
+        self.role_index.roles("United States")
+        self.role_index.roles("United States")
+        self.assertEqual(self.mock_service.get_roles_by_country_and_state.call_count, 1)
+
+        self.mock_service.get_data_version.return_value = "v2"
+        self.mock_service.get_roles_by_country_and_state.return_value = ["Data Engineer"]
+
+        self.assertEqual(self.role_index.roles("United States"), ["Data Engineer"])
+        self.assertFalse(self.role_index.has_role("United States", "Data Analyst"))
+
+    @patch("main.services.role_index.time.monotonic")
+    def test_empty_results_are_kept_for_the_empty_ttl(self, monotonic):
+        monotonic.return_value = 100.0
+        self.mock_service.get_roles_by_country_and_state.return_value = []
+        for _ in range(5):
+            self.assertEqual(self.role_index.roles("Canada"), [])
+            self.assertTrue(self.role_index.has_role("Canada", "Astronaut"))
+        self.assertEqual(self.mock_service.get_roles_by_country_and_state.call_count, 1)
+        self.assertFalse(self.role_index.is_warm())
+
+        monotonic.return_value = 131.0
+        self.mock_service.get_roles_by_country_and_state.return_value = ["Data Analyst"]
+        self.assertFalse(self.role_index.has_role("Canada", "Astronaut"))
+        self.assertEqual(self.mock_service.get_roles_by_country_and_state.call_count, 2)
+
+    def test_roles_served_stale_are_not_kept(self):
+        start_request("/details/roles")
+        self.addCleanup(clear_request)
+        current_request().mark_stale(120)
+        self.role_index.roles("United States")
+        self.role_index.roles("United States")
+        self.assertEqual(self.mock_service.get_roles_by_country_and_state.call_count, 2)
+        self.assertFalse(self.role_index.is_warm())
+
+
+if __name__ == '__main__':
+    unittest.main()
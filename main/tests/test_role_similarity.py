@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from main.api.app_context import AppServices
+from main.services.exceptions import DataUnavailableError
+from main.services.request_context import clear_request, current_request, start_request
+from main.services.role_similarity import RoleSimilarityIndex, role_features
+
+
+def bigrams_document(role, state="CA", skills=(), tools=()):
+    return {
+        "country": "United States", "state": state, "role": role,
+        "skills": [{"bigram": list(bigram), "score": score} for bigram, score in skills],
+        "tools": [{"bigram": list(bigram), "score": score} for bigram, score in tools],
+    }
+
+
+DOCUMENTS = [
+    bigrams_document("data engineer", skills=[(("data", "pipelines"), 3)], tools=[(("apache", "spark"), 4)]),
+    bigrams_document("data scientist", skills=[(("data", "pipelines"), 3)], tools=[(("apache", "spark"), 2)]),
+    bigrams_document("analytics engineer", skills=[(("data", "pipelines"), 1)], tools=[(("dbt", "cloud"), 5)]),
+    bigrams_document("nurse", skills=[(("patient", "care"), 5)]),
+    bigrams_document("data engineer twin", skills=[(("data", "pipelines"), 6)], tools=[(("apache", "spark"), 8)]),
+    bigrams_document("data engineer", state="NY", skills=[(("data", "pipelines"), 3)]),
+    bigrams_document("empty role"),
+]
+
+
+class TestRoleSimilarityIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RoleSimilarityIndex.build(DOCUMENTS, version="v1")
+
+    def test_features_have_unit_length(self):
+        features = role_features(DOCUMENTS[0])
+        self.assertAlmostEqual(sum(weight * weight for weight in features.values()), 1.0)
+        self.assertEqual(set(features), {"skills:data pipelines", "tools:apache", "tools:spark"})
+
+    def test_documents_without_tokens_are_left_out(self):
+        self.assertEqual(len(self.index.keys), 6)
+        self.assertEqual(self.index.similar("United States", "CA", "empty role"), [])
+
+    def test_most_similar_roles_of_the_same_state_come_first(self):
+        similar = self.index.similar("United States", "CA", "data engineer", limit=3)
+        self.assertEqual([entry["role"] for entry in similar], ["data engineer twin", "data scientist", "analytics engineer"])
+        self.assertAlmostEqual(similar[0]["similarity"], 1.0, places=4)
+        # Roles sharing nothing and the role itself are not returned
+        self.assertNotIn("nurse", [entry["role"] for entry in self.index.similar("United States", "CA", "data engineer")])
+        self.assertNotIn("data engineer", [entry["role"] for entry in self.index.similar("United States", "CA", "data engineer")])
+
+    def test_limit_and_unknown_keys(self):
+        self.assertEqual(len(self.index.similar("United States", "CA", "data engineer", limit=1)), 1)
+        self.assertEqual(self.index.similar("United States", "NY", "data engineer"), [])
+        self.assertEqual(self.index.similar("Canada", "ON", "data engineer"), [])
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "role_vectors.npz")
+            self.index.save(path)
+            loaded = RoleSimilarityIndex.load(path)
+        self.assertEqual(loaded.version, "v1")
+        self.assertEqual(loaded.keys, self.index.keys)
+        self.assertEqual(loaded.similar("United States", "CA", "data scientist"),
+                         self.index.similar("United States", "CA", "data scientist"))
+
+    def test_app_services_report_a_missing_index_as_unavailable(self):
+        services = AppServices({"similarity": {"index_path": "/nonexistent/role_vectors.npz"}})
+        with self.assertRaises(DataUnavailableError):
+            services.role_similarity
+
+    def test_app_services_reload_the_index_after_a_data_refresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "role_vectors.npz")
+            self.index.save(path)
+            services = AppServices({"similarity": {"index_path": path}})
+            services._version_watcher = MagicMock()
+            services._version_watcher.current.return_value = "v1"
+            loaded = services.role_similarity
+            self.assertEqual(loaded.version, "v1")
+            self.assertIs(services.role_similarity, loaded)
+
+            # Until the file is rebuilt, the old index is served marked stale
+            services._version_watcher.current.return_value = "v2"
+            start_request("/details/roles/similar")
+            self.addCleanup(clear_request)
+            self.assertIs(services.role_similarity, loaded)
+            self.assertTrue(current_request().stale)
+
+            RoleSimilarityIndex.build(DOCUMENTS[:3], version="v2").save(path)
+            os.utime(path, (0, os.stat(path).st_mtime + 1))
+            start_request("/details/roles/similar")
+            self.assertEqual(services.role_similarity.version, "v2")
+            self.assertEqual(len(services.role_similarity.keys), 3)
+            self.assertFalse(current_request().stale)
+
+
+if __name__ == '__main__':
+    unittest.main()
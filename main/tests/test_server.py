@@ -0,0 +1,45 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from main.api.server import compute_worker_count, compute_pool_size, current_worker_count, main, WORKERS_ENV_VAR
+from main.utilities.logging_config import DeferredQueueHandler
+
+
+class TestServerSizing(unittest.TestCase):
+    def test_explicit_worker_count_wins(self):
+        self.assertEqual(compute_worker_count({"workers": 3, "max_workers": 2}, cpu_count=16), 3)
+
+    def test_worker_count_from_cpu_count_is_capped(self):
+        self.assertEqual(compute_worker_count({"workers": 0, "max_workers": 8}, cpu_count=16), 8)
+        self.assertEqual(compute_worker_count({"workers": 0, "max_workers": 8}, cpu_count=2), 2)
+
+    def test_pool_size_is_split_across_workers(self):
+        self.assertEqual(compute_pool_size({"max_pool_size": 100, "worker_pool_floor": 5}, 4), 25)
+        # The floor keeps a usable pool when the budget is spread thin
+        self.assertEqual(compute_pool_size({"max_pool_size": 10, "worker_pool_floor": 5}, 8), 5)
+
+    def test_current_worker_count_defaults_to_one(self):
+        with patch.dict("os.environ", {WORKERS_ENV_VAR: "not-a-number"}):
+            self.assertEqual(current_worker_count(), 1)
+        with patch.dict("os.environ", {WORKERS_ENV_VAR: "4"}):
+            self.assertEqual(current_worker_count(), 4)
+
+    def test_main_logs_the_worker_and_pool_counts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = os.path.join(tmp, "api.log")
+            config = {"server": {"workers": 4}, "mongo": {"max_pool_size": 100},
+                      "logging": {"level": "INFO", "log_file": log_file, "log_to_console": False}}
+            with patch("main.api.server.load_config", return_value=config), \
+                    patch("main.api.server.uvicorn.run") as run, patch.dict("os.environ"):
+                main()
+            with open(log_file) as f:
+                self.assertIn("4 worker(s), each with a MongoDB pool of up to 25 connections", f.read())
+        self.assertEqual(run.call_args.kwargs["workers"], 4)
+        # Workers configure logging again, so the launcher's queue handler is gone before they start
+        self.assertFalse(any(isinstance(handler, DeferredQueueHandler) for handler in logging.getLogger().handlers))
+
+
+if __name__ == '__main__':
+    unittest.main()
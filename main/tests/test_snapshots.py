@@ -0,0 +1,157 @@
+import copy
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from main.benchmarks.synthetic import make_bigrams_document
+from main.services.data_processor import DataProcessor
+from main.services.exceptions import DataUnavailableError
+from main.services.memory_service import InMemoryQualifiedService
+from main.services.snapshots import (
+    ResultSnapshot, SnapshotBuilder, SnapshotDataProcessor, SnapshotStore, list_snapshot_files, read_header,
+)
+
+
+def make_service(bigrams, qualified, version):
+    return InMemoryQualifiedService(qualified, bigrams, version=version)
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.bigrams = [make_bigrams_document("United States", state, f"role {i}", 20, rng)
+                        for state in ("NY", "CA") for i in range(4)]
+        self.qualified = [{"country": "United States", "state": "NY", "role": f"role {i}", "place_of_work": place}
+                          for i in range(4) for place in ("Remote", "Hybrid", "Remote")]
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def build(self, bigrams, qualified, version, full=False):
+        return SnapshotBuilder(make_service(bigrams, qualified, version), self.directory).build(full=full)
+
+    def assert_matches(self, snapshot, bigrams, qualified):
+        processor = DataProcessor(make_service(bigrams, qualified, "check"))
+        keys = {(doc["country"], doc["state"], doc["role"]) for doc in bigrams + qualified}
+        self.assertEqual(len(snapshot), len(keys))
+        for key in keys:
+            result = snapshot.get(key)
+            self.assertEqual(result["operations"], processor.process_bigram_data(*key))
+            self.assertEqual(result["education"], processor.process_education_data(*key))
+            self.assertEqual(result["workplace"], processor.process_place_of_work_data(*key))
+
+    def test_first_build_is_a_full_snapshot(self):
+        report = self.build(self.bigrams, self.qualified, "v1")
+        self.assertTrue(report.full)
+        self.assertEqual((report.keys, report.changed), (8, 8))
+        self.assertTrue(read_header(report.path)["full"])
+
+        snapshot = ResultSnapshot()
+        snapshot.apply(report.path)
+        self.assertEqual(snapshot.version, "v1")
+        self.assert_matches(snapshot, self.bigrams, self.qualified)
+
+    def test_delta_only_holds_changed_keys_and_updates_in_place(self):
+        self.build(self.bigrams, self.qualified, "v1")
+        snapshot = ResultSnapshot()
+        snapshot.apply(list_snapshot_files(self.directory)[0][1])
+        unchanged = snapshot.get(("United States", "CA", "role 1"))
+
+        bigrams = copy.deepcopy(self.bigrams)
+        bigrams[0]["tools"][0]["score"] += 50
+        del bigrams[-1]
+        qualified = self.qualified + [{"country": "United States", "state": "NY", "role": "role 2",
+                                       "place_of_work": "On-Site"}]
+        report = self.build(bigrams, qualified, "v2")
+        self.assertFalse(report.full)
+        self.assertEqual((report.changed, report.deleted), (2, 1))
+        self.assertEqual((read_header(report.path)["full"], read_header(report.path)["base"]), (False, "v1"))
+
+        self.assertEqual(snapshot.apply(report.path), 3)
+        self.assertEqual(snapshot.version, "v2")
+        self.assert_matches(snapshot, bigrams, qualified)
+        self.assertIs(snapshot.get(("United States", "CA", "role 1")), unchanged)
+
+    def test_nothing_written_when_nothing_changed(self):
+        self.build(self.bigrams, self.qualified, "v1")
+        report = self.build(self.bigrams, self.qualified, "v2")
+        self.assertIsNone(report.path)
+        self.assertEqual(len(list_snapshot_files(self.directory)), 1)
+
+    def test_delta_of_another_version_is_rejected(self):
+        self.build(self.bigrams, self.qualified, "v1")
+        bigrams = copy.deepcopy(self.bigrams)
+        bigrams[0]["tools"][0]["score"] += 50
+        report = self.build(bigrams, self.qualified, "v2")
+        with self.assertRaises(ValueError):
+            ResultSnapshot().apply(report.path)
+
+    def test_build_without_a_data_version_writes_nothing(self):
+        self.build(self.bigrams, self.qualified, "v1")
+        bigrams = copy.deepcopy(self.bigrams)
+        bigrams[0]["tools"][0]["score"] += 50
+        service = make_service(bigrams, self.qualified, "v2")
+        # A failed version read
+        service.version = ""
+        with self.assertRaises(DataUnavailableError):
+            SnapshotBuilder(service, self.directory).build()
+        self.assertEqual(len(list_snapshot_files(self.directory)), 1)
+
+        report = self.build(bigrams, self.qualified, "v2")
+        self.assertEqual((report.full, report.changed), (False, 1))
+        builder = SnapshotBuilder(make_service(bigrams, self.qualified, "v2"), self.directory)
+        self.assertEqual(builder.prune(), 0)
+
+    def test_store_follows_the_chain_and_restarts_on_full_builds(self):
+        store = SnapshotStore(self.directory, refresh_interval=0)
+        self.assertIsNone(store.get(("United States", "NY", "role 0")))
+
+        self.build(self.bigrams, self.qualified, "v1")
+        self.assertIsNotNone(store.get(("United States", "NY", "role 0")))
+        bigrams = copy.deepcopy(self.bigrams)
+        bigrams[0]["tools"][0]["score"] += 50
+        self.build(bigrams, self.qualified, "v2")
+        store.get(("United States", "NY", "role 0"))
+        self.assertEqual((store.snapshot.version, store.snapshot.sequence), ("v2", 2))
+
+        self.build(bigrams, self.qualified, "v3", full=True)
+        bigrams[1]["skills"][0]["score"] += 50
+        self.build(bigrams, self.qualified, "v4")
+        self.assertEqual(store.sync(), 2)
+        self.assertEqual(store.snapshot.version, "v4")
+        self.assert_matches(store.snapshot, bigrams, self.qualified)
+
+        builder = SnapshotBuilder(make_service(bigrams, self.qualified, "v4"), self.directory)
+        self.assertEqual(builder.prune(), 2)
+        self.assertEqual([sequence for sequence, _ in list_snapshot_files(self.directory)], [3, 4])
+
+    def test_processor_serves_snapshot_results_and_falls_back(self):
+        store = MagicMock()
+        store.get.side_effect = lambda key: {"workplace": ["cached"]} if key[2] == "role 0" else None
+        data_processor = MagicMock()
+        processor = SnapshotDataProcessor(data_processor, store)
+
+        self.assertEqual(processor.process_place_of_work_data("United States", "NY", "role 0"), ["cached"])
+        processor.process_place_of_work_data(country="United States", state="NY", role="role 9")
+        data_processor.process_place_of_work_data.assert_called_once_with("United States", "NY", "role 9")
+        self.assertIs(processor.fetch_distinct_roles, data_processor.fetch_distinct_roles)
+
+    def test_documents_without_a_content_hash_are_always_rebuilt(self):
+        service = MagicMock()
+        service.get_data_version.return_value = "v1"
+        service.get_bigram_content_hashes.return_value = {("Canada", "ON", "r"): None, ("Canada", "QC", "r"): "abc"}
+        service.get_place_of_work_counts.return_value = {}
+        service.iter_bigram_columns.return_value = iter([])
+        builder = SnapshotBuilder(service, self.directory)
+        builder.build()
+
+        service.iter_bigram_columns.return_value = iter([])
+        report = builder.build()
+        self.assertEqual((report.changed, report.keys), (1, 2))
+        self.assertEqual(service.iter_bigram_columns.call_args.kwargs["keys"], [("Canada", "ON", "r")])
+        self.assertTrue(os.path.exists(report.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import yaml
+
+DEFAULT_CONFIG_PATH = "main/utilities/config.local.yaml"
+
+
+def load_config(path: str = DEFAULT_CONFIG_PATH) -> dict:
+    """
+    Loads the YAML configuration file.
+
+    Args:
+        path (str): Path to the configuration file.
+
+    Returns:
+        dict: The parsed configuration.
+    """
+    try:
+        with open(path, "r") as file:
+            return yaml.safe_load(file)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"The configuration file '{path}' was not found.")
+    except yaml.YAMLError as e:
+        raise RuntimeError(f"Error parsing the YAML configuration file: {e}")
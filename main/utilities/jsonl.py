@@ -0,0 +1,69 @@
+import hashlib
+import json
+from itertools import islice
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Optional
+from bson import json_util
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """
+    Reads a JSONL file, one document per line, such as the output of mongoexport.
+
+    MongoDB extended JSON (e.g. {"$oid": ...}) is decoded, and blank lines are skipped.
+
+    Args:
+        path (str): Path of the file.
+
+    Yields:
+        Dict: The documents.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json_util.loads(line)
+
+
+def batched(documents: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    """Splits an iterable of documents into lists of at most batch_size, without reading ahead."""
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def ndjson_chunks(documents: Iterable[Dict], documents_per_chunk: int = 100,
+                  default: Optional[Callable[[Any], Any]] = None) -> Iterator[bytes]:
+    """
+    Serializes documents as newline-delimited JSON, a few lines per chunk.
+
+    Grouping lines keeps the number of writes to a response or file low while memory stays
+    bounded by one chunk.
+
+    Args:
+        documents (Iterable[Dict]): JSON-serializable documents, read lazily.
+        documents_per_chunk (int): Lines per chunk.
+        default (Callable): json.dumps hook serializing the objects json cannot, e.g. result records.
+
+    Yields:
+        bytes: UTF-8 encoded lines, each ending with a newline.
+    """
+    for batch in batched(documents, documents_per_chunk):
+        yield "".join(json.dumps(document, separators=(",", ":"), default=default) + "\n" for document in batch).encode("utf-8")
+
+
+def content_hash(document: Dict, exclude: Collection[str] = ("_id",)) -> str:
+    """
+    Returns a digest of a document's content, independent of the order of its fields.
+
+    Args:
+        document (Dict): The document, which may hold BSON types such as ObjectId.
+        exclude (Collection[str]): Top-level fields left out of the digest.
+
+    Returns:
+        str: Hex SHA-1 of the document in canonical extended JSON.
+    """
+    canonical = json_util.dumps({field: value for field, value in document.items() if field not in exclude},
+                                sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,119 @@
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+from main.services.request_context import current_request
+
+
+DEFAULT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queues log records without formatting them.
+
+    The stock QueueHandler formats the message in the calling thread so the record can be pickled.
+    The queue never leaves the process here, so formatting is left to the listener thread and a
+    request only pays for creating the record and putting it on the queue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class RequestLogSampler(logging.Filter):
+    """
+    Keeps a fraction of the INFO and DEBUG records emitted while handling a request.
+
+    The decision is taken once per request and stored on its context, so a sampled request keeps
+    all of its log lines. Warnings and errors, and records emitted outside a request, always pass.
+    """
+
+    def __init__(self, sample_rate: float, rng: random.Random = None):
+        """
+        Args:
+            sample_rate (float): Fraction of requests whose info logs are kept, between 0 and 1.
+            rng (random.Random): Source of randomness. Defaults to the module-level generator.
+        """
+        super().__init__()
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        self._random = rng.random if rng is not None else random.random
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or self.sample_rate >= 1.0:
+            return True
+        context = current_request()
+        if context is None:
+            return True
+        if context.log_sampled is None:
+            context.log_sampled = self._random() < self.sample_rate
+        return context.log_sampled
+
+
+def build_handlers(logging_config: dict) -> List[logging.Handler]:
+    """
+    Creates the file and console handlers described by the logging section of the configuration.
+
+    Args:
+        logging_config (dict): The 'logging' section of the configuration.
+
+    Returns:
+        List[logging.Handler]: The handlers the listener thread writes to.
+    """
+    formatter = logging.Formatter(logging_config.get("format") or DEFAULT_FORMAT)
+    handlers = []
+    if logging_config.get("log_file"):
+        handlers.append(logging.FileHandler(logging_config["log_file"], delay=True))
+    if logging_config.get("log_to_console", True):
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def configure_logging(logging_config: dict, handlers: List[logging.Handler] = None) -> Optional[QueueListener]:
+    """
+    Routes the root logger through an in-memory queue drained by a background thread.
+
+    The root logger keeps a single DeferredQueueHandler, so file and console I/O, as well as
+    message formatting, happen on the listener thread instead of the request thread.
+
+    Args:
+        logging_config (dict): The 'logging' section of the configuration. Nothing is changed when empty.
+        handlers (List[logging.Handler]): Handlers to write to. Built from logging_config when not provided.
+
+    Returns:
+        Optional[QueueListener]: The started listener, to be passed to stop_logging on shutdown.
+    """
+    if not logging_config:
+        return None
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestLogSampler(logging_config.get("request_sample_rate", 1.0)))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(str(logging_config.get("level", "INFO")).upper())
+
+    listener = QueueListener(log_queue, *(handlers if handlers is not None else build_handlers(logging_config)),
+                             respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: Optional[QueueListener]) -> None:
+    """Flushes the queued records, stops the listener thread and detaches the queue from the root logger."""
+    if listener is None:
+        return
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, DeferredQueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        handler.close()
@@ -0,0 +1,90 @@
+import threading
+from typing import Dict, Sequence, Tuple
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(label, "")) for label in self.label_names)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            if key:
+                labels = ",".join(f'{name}="{label}"' for name, label in zip(self.label_names, key))
+                lines.append(f"{self.name}{{{labels}}} {value:g}")
+            else:
+                lines.append(f"{self.name} {value:g}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. a number of rejected requests."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, e.g. a queue depth."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics rendered in the Prometheus text format.
+
+    Each worker process keeps its own values, so a scrape reports the worker that answered it.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, description: str, label_names: Sequence[str]):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(name, description, label_names)
+            return self._metrics[name]
+
+    def counter(self, name: str, description: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, description, label_names)
+
+    def gauge(self, name: str, description: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, description, label_names)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()